@@ -1,34 +1,19 @@
+import hashlib
 import os
-import joblib
-import pandas as pd
-from flask import Flask, request, jsonify, send_from_directory
-from flask_cors import CORS
-from dotenv import load_dotenv
+from functools import lru_cache
 
-# Supabase is optional – app still runs if SDK or env is missing
-try:
-    from supabase import create_client
-except ImportError:
-    create_client = None
+import numpy as np
+from flask import Blueprint, Flask, Response, request, jsonify, send_from_directory
+from flask_cors import CORS
 
-# ======================
-# Load environment
-# ======================
-load_dotenv()
+from modules.src.imputation import load_imputer
+from modules.src.manifest import artifact_version, read_manifest
+from prediction_store import PredictionStore
+from request_schema import RequestSchema
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
-app = Flask(__name__, static_folder="static", static_url_path="")
-CORS(app)
-
-IS_VERCEL = os.getenv("VERCEL") == "1"
-
-# ======================
-# Supabase (optional)
-# ======================
-supabase = None
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_KEY")
+bp = Blueprint("main", __name__)
 
 KEY_MAP = {
     "planet radius (pl_rade)": "pl_rade",
@@ -47,21 +32,76 @@ KEY_MAP = {
 }
 
 
-if create_client and SUPABASE_URL and SUPABASE_KEY:
+# Largest columnar batch accepted by /predict
+MAX_BATCH_ROWS = int(os.getenv("MAX_BATCH_ROWS", 1000))
+
+# Features a row must give (or let derive) before the rest is imputed
+MIN_REAL_FEATURES = int(os.getenv("MIN_REAL_FEATURES", 6))
+
+# Seconds between background syncs of the local predictions mirror
+SUPABASE_SYNC_INTERVAL = float(os.getenv("SUPABASE_SYNC_INTERVAL", 60))
+
+# Rendered /ranking body, reused while the mirror file's version is unchanged
+_ranking_cache = {"version": None, "etag": None, "body": None}
+
+
+def is_vercel():
+    return os.getenv("VERCEL") == "1"
+
+
+@lru_cache(maxsize=None)
+def get_supabase():
+    """
+    Create the Supabase client on first use.
+    Supabase is optional – app still runs if SDK or env is missing.
+    """
+    url = os.getenv("SUPABASE_URL")
+    key = os.getenv("SUPABASE_KEY")
+
+    try:
+        from supabase import create_client
+    except ImportError:
+        create_client = None
+
+    if not (create_client and url and key):
+        print("⚠️ Supabase not configured or supabase-py not installed")
+        return None
+
     try:
-        supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+        client = create_client(url, key)
         print("✅ Supabase connected")
+        return client
     except Exception as e:
         print("⚠️ Supabase init failed:", e)
-        supabase = None
-else:
-    print("⚠️ Supabase not configured or supabase-py not installed")
+        return None
+
+
+@lru_cache(maxsize=None)
+def get_prediction_store():
+    """
+    Local SQLite mirror of the Supabase predictions table (see
+    prediction_store.py). Vercel only allows writes under /tmp and has no
+    long-lived process to run the sync thread, so there the mirror is
+    local-only.
+    """
+    if is_vercel():
+        return PredictionStore(os.getenv("PREDICTIONS_DB", "/tmp/predictions.db"))
+
+    store = PredictionStore(
+        os.getenv("PREDICTIONS_DB", os.path.join(BASE_DIR, "predictions.db")),
+        remote=get_supabase()
+    )
+    store.start_background_sync(SUPABASE_SYNC_INTERVAL)
+    return store
+
 
 # ======================
 # Model globals
 # ======================
 model = None
 feature_cols = None
+imputer = None
+schema = None
 
 
 def load_model():
@@ -69,27 +109,39 @@ def load_model():
     Lazy-load model and feature list.
     Safe in serverless environments.
     """
-    global model, feature_cols
+    global model, feature_cols, imputer, schema
 
     if model is not None:
         return
 
     model_path = os.path.join(BASE_DIR, "habitability_model.pkl")
     features_path = os.path.join(BASE_DIR, "model_features.pkl")
+    imputer_path = os.path.join(BASE_DIR, "imputer.json")
 
     if not os.path.exists(model_path):
         raise RuntimeError("habitability_model.pkl missing in project root")
 
-    if not os.path.exists(features_path):
+    # Feature order comes from the model's manifest when it has one
+    manifest = read_manifest(model_path)
+
+    if manifest is None and not os.path.exists(features_path):
         raise RuntimeError("model_features.pkl missing in project root")
 
+    import joblib
+
     loaded_model = joblib.load(model_path)
-    loaded_features = joblib.load(features_path)
+    loaded_features = manifest["features"] if manifest else joblib.load(features_path)
+
+    # Optional (python modules/src/imputation.py root): without it,
+    # missing features are rejected as before
+    if os.path.exists(imputer_path):
+        imputer = load_imputer(imputer_path)
 
+    schema = RequestSchema(loaded_features, KEY_MAP, imputer)
     model = loaded_model
     feature_cols = list(loaded_features)
 
-    print("✅ Model loaded:", type(model).__name__)
+    print("✅ Model loaded:", type(model).__name__, f"({model_version()})")
     print("📋 Features:", feature_cols)
     print("🔍 Has predict_proba:", hasattr(model, "predict_proba"))
 
@@ -98,13 +150,13 @@ def load_model():
 # Routes
 # ======================
 
-@app.route("/")
+@bp.route("/")
 def home():
     # Serve your front-end (static/index.html)
     return send_from_directory("static", "index.html")
 
 
-@app.route("/health")
+@bp.route("/health")
 def health():
     ok = True
     msg = "ok"
@@ -120,7 +172,7 @@ def health():
         "model_loaded": ok
     }), 200 if ok else 500
 
-@app.route("/predict", methods=["POST"])
+@bp.route("/predict", methods=["POST"])
 def predict():
     try:
         load_model()
@@ -130,49 +182,47 @@ def predict():
             "details": str(e)
         }), 500
 
-    data = request.get_json()
-    if not data:
+    data = request.get_json(silent=True)
+    if not data or not isinstance(data, dict):
         return jsonify({"error": "No input data"}), 400
 
-    # Normalize + map frontend keys → model keys
-    normalized = {}
-    for k, v in data.items():
-        key = str(k).lower().strip()
-        mapped_key = KEY_MAP.get(key, key)
-        normalized[mapped_key] = v
-
-    # Build feature vector in training order
-    values = []
-    missing = []
-
-    for col in feature_cols:
-        if col not in normalized:
-            missing.append(col)
-            values.append(0.0)
-        else:
-            try:
-                values.append(float(normalized[col]))
-            except:
-                missing.append(col)
-                values.append(0.0)
+    # Columnar batch: every feature sent as a list
+    batch = any(isinstance(v, list) for v in data.values())
+
+    if batch:
+        X, extras, errors = schema.parse_batch(data)
+        if X is not None and len(X) > MAX_BATCH_ROWS:
+            return jsonify({
+                "error": f"Batch too large (max {MAX_BATCH_ROWS} rows)"
+            }), 413
+    else:
+        row, extras, errors = schema.parse(data)
+        X = row[None, :]
+        extras = {k: [v] for k, v in extras.items()}
+
+    if not errors:
+        # Derive density / luminosity / insolation / T_eq, then fill the
+        # remaining gaps from the medians fitted at training time
+        imputed = schema.complete(X, extras.get("st_spectype"))
+        errors = (
+            schema.sparse_errors(X, imputed, MIN_REAL_FEATURES, batch=batch)
+            + schema.missing_errors(X, batch=batch)
+        )
 
-    if missing:
+    if errors:
+        bad = {e["column"] for e in errors}
         return jsonify({
             "error": "Missing or invalid required features",
-            "missing_features": missing
+            "missing_features": [c for c in feature_cols if c in bad],
+            "errors": errors
         }), 400
 
-    X = pd.DataFrame([values], columns=feature_cols)
-
-    # Prediction (drop feature names)
+    # Prediction (no feature names, training column order)
     try:
-        X_input = X.values
-
         if hasattr(model, "predict_proba"):
-            proba = model.predict_proba(X_input)
-            score = float(proba[0][1])
+            scores = model.predict_proba(X)[:, 1]
         else:
-            score = float(model.predict(X_input)[0])
+            scores = model.predict(X)
 
     except Exception as e:
         return jsonify({
@@ -180,47 +230,94 @@ def predict():
             "details": str(e)
         }), 500
 
-    label = "Habitable" if score >= 0.7 else "Not Habitable"
-    confidence = "High" if score >= 0.7 or score <= 0.3 else "Medium"
-
-    if supabase and not IS_VERCEL:
-        try:
-            pl_name = normalized.get("pl_name", "Unknown")
-            supabase.table("predictions").insert({
-                "pl_name": pl_name,
-                "prediction_type": "habitability",
-                "prediction_value": label,
-                "confidence_score": round(score, 4)
-            }).execute()
-        except Exception as e:
-            print("⚠️ Supabase insert failed:", e)
+    names = extras.get("pl_name") or ["Unknown"] * len(X)
+    results, records = [], []
+
+    for i, score in enumerate(scores):
+        score = float(score)
+        label = "Habitable" if score >= 0.7 else "Not Habitable"
+        confidence = "High" if score >= 0.7 or score <= 0.3 else "Medium"
+
+        records.append({
+            "pl_name": names[i],
+            "prediction_type": "habitability",
+            "prediction_value": label,
+            "confidence_score": round(score, 4)
+        })
+
+        results.append({
+            "label": label,
+            "score": round(score, 4),
+            "confidence": confidence,
+            "imputed_features": [feature_cols[c] for c in np.flatnonzero(imputed[i])]
+        })
+
+    if not is_vercel():
+        # One local transaction for the whole batch; the sync thread
+        # pushes it to Supabase off the request path
+        get_prediction_store().record_many(records)
+
+    if batch:
+        for name, result in zip(names, results):
+            result["pl_name"] = name
+        return jsonify({"predictions": results}), 200
+
+    return jsonify(results[0]), 200
+
+def model_version():
+    """
+    Cheap identifier of the model artifact on disk: its manifest version,
+    else size + mtime (no hashing).
+    """
+    try:
+        return artifact_version(os.path.join(BASE_DIR, "habitability_model.pkl"))
+    except OSError:
+        return "none"
 
-    return jsonify({
-        "label": label,
-        "score": round(score, 4),
-        "confidence": confidence
-    }), 200
 
-@app.route("/ranking", methods=["GET"])
+@bp.route("/ranking", methods=["GET"])
 def ranking():
-    if not supabase:
-        return jsonify({"rankings": []}), 200
+    # Served from the local mirror: no Supabase round trip on the read path
+    store = get_prediction_store()
 
-    try:
-        response = (
-            supabase
-            .table("predictions")
-            .select("*")
-            .order("confidence_score", desc=True)
-            .limit(100)
-            .execute()
-        )
-        return jsonify({"rankings": response.data or []}), 200
-    except Exception as e:
-        return jsonify({
-            "rankings": [],
-            "error": str(e)
-        }), 200
+    # Read from the file, not the process: writes by other workers count
+    version = store.version()
+    cache = _ranking_cache
+    if cache["body"] is None or cache["version"] != version:
+        body = jsonify({"rankings": store.top(100)}).get_data()
+        digest = hashlib.sha1(body + model_version().encode()).hexdigest()[:16]
+        cache.update(version=version, etag=f"p{version}-{digest}", body=body)
+
+    if request.if_none_match.contains(cache["etag"]):
+        resp = Response(status=304)
+    else:
+        resp = Response(cache["body"], mimetype="application/json")
+
+    resp.set_etag(cache["etag"])
+    resp.headers["Cache-Control"] = "no-cache"
+    return resp
+
+
+# ======================
+# App factory
+# ======================
+
+def create_app():
+    """
+    Build the Flask app. Heavy work is deferred: the model is loaded on the
+    first request that needs it, Supabase on the first request that uses it.
+    """
+    from dotenv import load_dotenv
+
+    load_dotenv()
+
+    app = Flask(__name__, static_folder="static", static_url_path="")
+    CORS(app)
+    app.register_blueprint(bp)
+    return app
+
+
+app = create_app()
 
 
 # Local dev only – Vercel/Render will import `app`
@@ -0,0 +1,169 @@
+"""
+Admission control: per-route-class concurrency limits and load shedding.
+
+Every API request is assigned a class: "expensive" for the O(catalog)
+endpoints (/rank, /rank/export), "cheap" for the rest. Each class has a
+Gate with a number of slots (requests running at once) and a queue depth
+(requests allowed to wait for a slot, at most ADMISSION_QUEUE_TIMEOUT
+seconds). A request arriving at a full queue, or timing out in it, is
+answered at once with 503 and a Retry-After header instead of piling up
+behind the others, so a burst of /rank calls holds a bounded number of
+worker threads and /predict keeps its own slots.
+
+Limits are per process: with gunicorn's threaded workers (gunicorn.conf.py)
+each worker admits its own requests. GET /admission reports the current
+in-flight / waiting counts and the admitted / shed totals of the process
+for autoscaling. /health, /admission and /debug/* are never gated.
+"""
+
+import math
+import threading
+import time
+
+from flask import jsonify, request
+
+from config import ADMISSION_CONTROL, ADMISSION_LIMITS, ADMISSION_QUEUE_TIMEOUT
+
+# Endpoint -> class; unlisted API endpoints are "cheap"
+ROUTE_CLASSES = {
+    "api.rank": "expensive",
+    "api.rank_export": "expensive"
+}
+EXEMPT = {"api.health", "admission", "static"}
+
+
+class Gate:
+    """
+    A counting gate with a bounded wait queue.
+
+    acquire() takes a slot (waiting in line if needed) and returns True, or
+    returns False when the queue is full or the wait times out. Service
+    times are tracked as an exponential moving average for Retry-After.
+    """
+
+    def __init__(self, name, limit, queue_depth, timeout=ADMISSION_QUEUE_TIMEOUT):
+        self.name = name
+        self.limit = limit
+        self.queue_depth = queue_depth
+        self.timeout = timeout
+        self.in_flight = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.shed = 0
+        self.service_seconds = 0.0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        with self._cond:
+            if self.in_flight < self.limit and not self.waiting:
+                self.in_flight += 1
+                self.admitted += 1
+                return True
+            if self.waiting >= self.queue_depth:
+                self.shed += 1
+                return False
+
+            self.waiting += 1
+            deadline = time.monotonic() + self.timeout
+            try:
+                while self.in_flight >= self.limit:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.shed += 1
+                        return False
+                    self._cond.wait(remaining)
+                self.in_flight += 1
+                self.admitted += 1
+                return True
+            finally:
+                self.waiting -= 1
+
+    def release(self, seconds=None):
+        with self._cond:
+            self.in_flight -= 1
+            if seconds is not None:
+                self.service_seconds += 0.2 * (seconds - self.service_seconds)
+            self._cond.notify()
+
+    def retry_after(self):
+        # Time for the current line to drain through the slots, >= 1 s
+        backlog = self.in_flight + self.waiting + 1
+        return max(1, math.ceil(self.service_seconds * backlog / self.limit))
+
+    def stats(self):
+        return {
+            "limit": self.limit,
+            "queue_depth": self.queue_depth,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "admitted": self.admitted,
+            "shed": self.shed,
+            "service_ms": round(self.service_seconds * 1e3, 3)
+        }
+
+
+gates = {name: Gate(name, limit, depth) for name, (limit, depth) in ADMISSION_LIMITS.items()}
+
+
+def route_class(endpoint):
+    if endpoint is None or endpoint in EXEMPT or endpoint.startswith("debug."):
+        return None
+    return ROUTE_CLASSES.get(endpoint, "cheap")
+
+
+def _admit():
+    name = route_class(request.endpoint)
+    if name is None:
+        return None
+
+    gate = gates[name]
+    if not gate.acquire():
+        resp = jsonify({
+            "status": "error",
+            "message": f"Server busy ({name} requests), retry later",
+            "data": None
+        })
+        resp.status_code = 503
+        resp.headers["Retry-After"] = str(gate.retry_after())
+        return resp
+
+    request.environ["admission.gate"] = (gate, time.perf_counter())
+    return None
+
+
+def _release(exc=None):
+    held = request.environ.pop("admission.gate", None)
+    if held is not None:
+        gate, start = held
+        gate.release(time.perf_counter() - start)
+
+
+def _release_streamed(resp):
+    # A streamed body (/rank/export) is produced after the request context
+    # is torn down: keep the slot until the response is closed
+    if resp.is_streamed and "admission.gate" in request.environ:
+        gate, start = request.environ.pop("admission.gate")
+        resp.call_on_close(lambda: gate.release(time.perf_counter() - start))
+    return resp
+
+
+def admission_stats():
+    return jsonify({
+        "status": "success",
+        "message": "Admission control" + ("" if ADMISSION_CONTROL else " (disabled)"),
+        "data": {name: gate.stats() for name, gate in gates.items()}
+    })
+
+
+def init_app(app):
+    """
+    Install the gates on a Flask app (no-op with ADMISSION_CONTROL=0 apart
+    from the /admission endpoint).
+    """
+    app.add_url_rule("/admission", "admission", admission_stats, methods=["GET"])
+    if not ADMISSION_CONTROL:
+        return
+
+    app.before_request(_admit)
+    app.after_request(_release_streamed)
+    app.teardown_request(_release)
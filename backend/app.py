@@ -1,79 +1,48 @@
-from flask import Flask, request, jsonify
+from flask import Blueprint, Flask, Response, request, jsonify
 from flask_cors import CORS
-import pandas as pd
-import sqlite3
-import joblib
+from functools import lru_cache
+import numpy as np
 import os
-
-app = Flask(__name__)
-CORS(app)
+import time
 
 # CONFIGURATION
 # -------------------------------------------------
 
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-
-DB_PATH = os.path.join(BASE_DIR, "database", "exoplanets.db")
-MODELS_DIR = os.path.join(BASE_DIR, "model")
-
-MODEL_FEATURES = [
-    "st_teff",
-    "st_rad",
-    "st_mass",
-    "st_met",
-    "st_luminosity",
-    "pl_orbper",
-    "pl_orbeccen",
-    "pl_insol"
-]
-
-# -------------------------------------------------
-# LOAD MODELS
-# -------------------------------------------------
-
-reg_model = joblib.load(os.path.join(MODELS_DIR, "xgboost_reg.pkl"))
-cls_model = joblib.load(os.path.join(MODELS_DIR, "xgboost_classifier.pkl"))
-
-# -------------------------------------------------
-# FLASK APP
-# -------------------------------------------------
-
-
-app.config["DEBUG"] = True
-
-# -------------------------------------------------
-# DATABASE
-# -------------------------------------------------
-
-def get_db():
-    os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
-    return sqlite3.connect(DB_PATH)
-
-def init_db():
-    conn = get_db()
-    cur = conn.cursor()
-
-    cur.execute("""
-    CREATE TABLE IF NOT EXISTS planets (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        planet_name TEXT,
-        st_teff REAL,
-        st_rad REAL,
-        st_mass REAL,
-        st_met REAL,
-        st_luminosity REAL,
-        pl_orbper REAL,
-        pl_orbeccen REAL,
-        pl_insol REAL,
-        source TEXT
-    )
-    """)
-
-    conn.commit()
-    conn.close()
-
-# Initialize DB on startup
-init_db()
+import admission
+from config import (
+    DEBUG, ENSEMBLE_SERVING, MIN_REAL_FEATURES, MODEL_FEATURES, MODEL_FILES, PLANET_STORE,
+    SCORE_OFFSET, SHADOW_MODE
+)
+from db import ensure_scores, get_db, insert_planet, query_planets
+from export import MIMETYPES, STREAMS
+from http_cache import conditional
+from models import get_imputer, get_model, loaded_models, model_path, model_version, predict_models
+from modules.src.feature_derive import derive_record
+from modules.src.imputation import impute_record
+from modules.src.rules import SCORE_RULES, compile_score
+from profiling import debug, profiled
+import shadow
+from similarity import get_index, on_planet_inserted
+from store import get_store, record_insert
+
+api = Blueprint("api", __name__)
+
+# module2's Habitability Score Index, served next to the model score
+HSI_TERMS = SCORE_RULES["habitability_score"]
+
+
+@lru_cache(maxsize=None)
+def physics_score(columns):
+    """
+    HSI over the terms whose inputs a request really has (pl_rade is only
+    known when the client sends it), weights rescaled to the full total:
+    with every input it equals module2's index.
+    """
+    total = sum(t["weight"] for t in HSI_TERMS.values())
+    used = sum(HSI_TERMS[c]["weight"] for c in columns)
+    return compile_score({
+        c: {**HSI_TERMS[c], "weight": HSI_TERMS[c]["weight"] * total / used} for c in columns
+    })
 
 # -------------------------------------------------
 # HELPER RESPONSE
@@ -90,25 +59,65 @@ def response(status, message, data=None):
 # ROUTES
 # -------------------------------------------------
 
-@app.route("/", methods=["GET"])
+@api.route("/", methods=["GET"])
 def home():
     return response(
         "success",
         "Exoplanet Habitability Prediction API",
         {
             "required_features": MODEL_FEATURES,
-            "endpoints": ["/add_planet", "/predict", "/rank"]
+            "endpoints": ["/add_planet", "/predict", "/rank", "/planets", "/similar"]
         }
     )
 
+# ---------------- HEALTH ----------------
+
+@api.route("/health", methods=["GET"])
+def health():
+    # Cheap readiness check: artifacts must exist, nothing is deserialized
+    try:
+        for name in MODEL_FILES:
+            model_path(name)
+    except RuntimeError as e:
+        return response("error", str(e)), 500
+
+    return response(
+        "success",
+        "ok",
+        {"models_loaded": loaded_models()}
+    )
+
+def complete_features(data):
+    """
+    Derive omitted physical features, then fill whatever is still missing
+    from the fitted medians. Returns (data, imputed feature names).
+
+    Raises ValueError when fewer than MIN_REAL_FEATURES model features were
+    given or derived: such a row would be mostly medians.
+    """
+    data = derive_record(data)
+
+    real = [f for f in MODEL_FEATURES if data.get(f) is not None]
+    if len(real) < MIN_REAL_FEATURES:
+        raise ValueError(
+            f"At least {MIN_REAL_FEATURES} of {MODEL_FEATURES} are required "
+            f"(got {len(real)}: {real})"
+        )
+
+    imputer = get_imputer()
+    if imputer is None:
+        return data, []
+    return impute_record(data, imputer)
+
 # ---------------- ADD PLANET ----------------
 
-@app.route("/add_planet", methods=["POST"])
-@app.route("/add_planet/", methods=["POST"])
+@api.route("/add_planet", methods=["POST"])
+@api.route("/add_planet/", methods=["POST"])
 def add_planet():
     data = request.get_json()
 
     try:
+        data, _ = complete_features(data)
         planet_name = data.get("planet_name", "Unknown")
 
         conn = get_db()
@@ -129,19 +138,13 @@ def add_planet():
                 {"planet_saved": False}
             )
 
-        row = {
-            "planet_name": planet_name,
-            **{f: data[f] for f in MODEL_FEATURES},
-            "source": "user"
-        }
+        X = np.array([[float(data[f]) for f in MODEL_FEATURES]])
+        proba = float(get_model("classifier").predict_proba(X)[0][1])
 
-        pd.DataFrame([row]).to_sql(
-            "planets",
-            conn,
-            if_exists="append",
-            index=False
-        )
+        insert_planet(conn, planet_name, data, "user", proba)
+        record_insert(conn, planet_name, data, "user", proba)
         conn.close()
+        on_planet_inserted(planet_name, data, proba)
 
         return response(
             "success",
@@ -154,22 +157,51 @@ def add_planet():
 
 # ---------------- PREDICT ----------------
 
-@app.route("/predict", methods=["POST"])
-@app.route("/predict/", methods=["POST"])
+@api.route("/predict", methods=["POST"])
+@api.route("/predict/", methods=["POST"])
+@profiled
 def predict():
     data = request.get_json()
 
     try:
+        data, imputed = complete_features(data)
         planet_name = data.get("planet_name", "Unknown")
 
-        # Prepare model input
-        input_df = pd.DataFrame([data])[MODEL_FEATURES]
-
-        # Prediction
-        proba = float(cls_model.predict_proba(input_df)[0][1])
-        probax = proba - 0.1225  # dummy operation
+        # Prepare model input (training column order)
+        X = np.array([[float(data[f]) for f in MODEL_FEATURES]])
+
+        # Prediction: classifier (+ regressor) over the same packed row.
+        # Loaded first, so a lazy load is not part of the measured latency
+        get_model("classifier")
+        if ENSEMBLE_SERVING:
+            get_model("regressor")
+        start = time.perf_counter()
+        ensemble = None
+        if ENSEMBLE_SERVING:
+            scores = predict_models(X)
+            proba = float(scores["classifier"][0])
+            ensemble = round(float(scores["regressor"][0]), 4)
+        else:
+            proba = float(get_model("classifier").predict_proba(X)[0][1])
+        probax = proba - SCORE_OFFSET
         habitability = int(proba >= 0.5)
 
+        # Rule-based HSI over the given or derived inputs (never imputed ones)
+        physics = None
+        terms = tuple(c for c in HSI_TERMS if data.get(c) is not None and c not in imputed)
+        if terms:
+            physics = physics_score(terms)({c: float(data[c]) for c in terms})
+            physics = round(physics, 4) if np.isfinite(physics) else None
+
+        if SHADOW_MODE:
+            # Off the request path: enqueue only, scored by shadow.py's worker.
+            # The shadow gets the row before imputation (every raw request
+            # field plus derived ones), so a missing input is reported
+            # instead of being scored at our medians
+            primary_ms = (time.perf_counter() - start) * 1e3
+            given = {k: v for k, v in data.items() if k not in imputed}
+            shadow.submit(planet_name, given, model_version("classifier"), proba, primary_ms)
+
         conn = get_db()
         cur = conn.cursor()
 
@@ -182,21 +214,14 @@ def predict():
 
         # Insert only if new
         if not exists:
-            row = {
-                "planet_name": planet_name,
-                **{f: data[f] for f in MODEL_FEATURES},
-                "source": "prediction"
-            }
-
-            pd.DataFrame([row]).to_sql(
-                "planets",
-                conn,
-                if_exists="append",
-                index=False
-            )
+            insert_planet(conn, planet_name, data, "prediction", proba)
+            record_insert(conn, planet_name, data, "prediction", proba)
 
         conn.close()
 
+        if not exists:
+            on_planet_inserted(planet_name, data, proba)
+
         return response(
             "success",
             "Prediction generated" + (" (planet already exists)" if exists else " and planet saved"),
@@ -204,7 +229,11 @@ def predict():
                 "habitability": habitability,
                 "habitability_score": round(probax, 4),
                 "confidence": round(proba, 4),
-                "planet_saved": not exists
+                "ensemble_score": ensemble,
+                "physics_score": physics,
+                "physics_score_terms": list(terms),
+                "planet_saved": not exists,
+                "imputed_features": imputed
             }
         )
 
@@ -213,11 +242,19 @@ def predict():
 
 # ---------------- RANK ----------------
 
-@app.route("/rank", methods=["GET"])
-@app.route("/rank/", methods=["GET"])
+@api.route("/rank", methods=["GET"])
+@api.route("/rank/", methods=["GET"])
+@profiled
+@conditional
 def rank():
     top_n = int(request.args.get("top", 10))
 
+    if PLANET_STORE:
+        return rank_from_store(top_n)
+
+    # pandas is only needed here; keep it off the import path
+    import pandas as pd
+
     conn = get_db()
     df = pd.read_sql("SELECT * FROM planets", conn)
     conn.close()
@@ -238,8 +275,9 @@ def rank():
 
     X = df[MODEL_FEATURES]
 
+    cls_model = get_model("classifier")
     proba = cls_model.predict_proba(X)[:, 1]
-    probax = proba - 0.1225
+    probax = proba - SCORE_OFFSET
 
     df["habitability_score"] = probax
     df["confidence"] = proba
@@ -278,19 +316,202 @@ def rank():
     )
 
 
+def rank_from_store(top_n):
+    """
+    /rank over the array store: stored confidences (kept current by the
+    inserts above and rescore.py), no DataFrame and no per-request scoring.
+    """
+    conn = get_db()
+    store = get_store(conn)
+    conn.close()
+
+    stats = store.stats()
+    if not stats["total_count"]:
+        return response("success", "No planets available", {**stats, "average_score": 0, "data": []})
+
+    data = [
+        {
+            "planet_name": name,
+            "habitability": int(confidence >= 0.5),
+            "habitability_score": round(confidence - SCORE_OFFSET, 4),
+            "confidence": round(confidence, 4),
+            "rank": i + 1
+        }
+        for i, (name, confidence) in enumerate(store.top(top_n))
+    ]
+
+    return response(
+        "success",
+        "Ranking generated",
+        {**stats, "average_score": round(stats["average_score"], 4), "data": data}
+    )
+
+# ---------------- RANK EXPORT ----------------
+
+@api.route("/rank/export", methods=["GET"])
+@api.route("/rank/export/", methods=["GET"])
+def rank_export():
+    fmt = request.args.get("format", "csv")
+
+    if fmt not in STREAMS:
+        return response("error", f"format must be one of {sorted(STREAMS)}"), 400
+
+    return Response(
+        STREAMS[fmt](),
+        mimetype=MIMETYPES[fmt],
+        headers={
+            "Content-Disposition": f'attachment; filename="exoplanet-rankings.{fmt}"'
+        }
+    )
+
+# ---------------- PLANETS (FILTERED CATALOG) ----------------
+
+def _float_arg(name):
+    value = request.args.get(name)
+    return None if value in (None, "") else float(value)
+
+
+@api.route("/planets", methods=["GET"])
+@api.route("/planets/", methods=["GET"])
+def planets():
+    """
+    Filtered, sorted, cursor-paginated catalog.
+
+    Query parameters (all optional):
+        habitable=1|0, min_score, max_score, teff_min, teff_max,
+        insol_min, insol_max, sort=score|st_teff|pl_insol,
+        order=desc|asc, limit (1-500), cursor (next_cursor of the previous
+        page, with the same sort and order)
+    """
+    try:
+        habitable = request.args.get("habitable")
+        try:
+            limit = int(request.args.get("limit", 50))
+        except ValueError:
+            return response("error", "limit must be an integer"), 400
+
+        conn = get_db()
+        ensure_scores(conn)
+        rows, next_cursor = query_planets(
+            conn,
+            habitable=None if habitable in (None, "") else habitable in ("1", "true"),
+            min_score=_float_arg("min_score"),
+            max_score=_float_arg("max_score"),
+            teff_min=_float_arg("teff_min"),
+            teff_max=_float_arg("teff_max"),
+            insol_min=_float_arg("insol_min"),
+            insol_max=_float_arg("insol_max"),
+            sort=request.args.get("sort", "score"),
+            order=request.args.get("order", "desc"),
+            limit=limit,
+            cursor=request.args.get("cursor")
+        )
+        conn.close()
+
+        return response(
+            "success",
+            "Planets retrieved",
+            {
+                "data": [
+                    {
+                        "id": row_id,
+                        "planet_name": name,
+                        "habitability": int(proba >= 0.5),
+                        "habitability_score": round(proba - SCORE_OFFSET, 4),
+                        "confidence": round(proba, 4),
+                        "st_teff": st_teff,
+                        "pl_insol": pl_insol
+                    }
+                    for row_id, name, proba, st_teff, pl_insol in rows
+                ],
+                "next_cursor": next_cursor
+            }
+        )
+
+    except Exception as e:
+        return response("error", str(e)), 400
+
+# ---------------- SIMILAR ----------------
+
+@api.route("/similar", methods=["GET", "POST"])
+@api.route("/similar/", methods=["GET", "POST"])
+def similar():
+    """
+    k nearest stored planets in scaled feature space.
+
+    GET  /similar?planet_name=<name>&k=5   neighbours of a stored planet
+    POST /similar?k=5  {features...}       neighbours of a candidate
+    """
+    try:
+        k = int(request.args.get("k", 5))
+        if k < 1:
+            return response("error", f"k must be at least 1, got {k}"), 400
+        exclude = None
+
+        if request.method == "POST":
+            data, _ = complete_features(request.get_json())
+        else:
+            exclude = request.args["planet_name"]
+            conn = get_db()
+            row = conn.execute(
+                f"SELECT {', '.join(MODEL_FEATURES)} FROM planets WHERE planet_name = ? LIMIT 1",
+                (exclude,)
+            ).fetchone()
+            conn.close()
+
+            if row is None:
+                return response("error", f"Planet not found: {exclude}"), 404
+            data = dict(zip(MODEL_FEATURES, row))
+
+        x = [float(data[f]) for f in MODEL_FEATURES]
+        neighbours = get_index().query(x, k=k, exclude=exclude)
+
+        return response(
+            "success",
+            "Similar planets found",
+            [
+                {
+                    "rank": i + 1,
+                    "planet_name": name,
+                    "distance": round(distance, 4),
+                    "habitability": int(proba >= 0.5),
+                    "habitability_score": round(proba - SCORE_OFFSET, 4),
+                    "confidence": round(proba, 4)
+                }
+                for i, (name, distance, proba) in enumerate(neighbours)
+            ]
+        )
+
+    except Exception as e:
+        return response("error", str(e)), 400
 
 # -------------------------------------------------
-# DEBUG INFO
+# FLASK APP
 # -------------------------------------------------
 
-print("✅ FINAL app.py (DUPLICATE-SAFE, PRODUCTION-READY)")
-print(app.url_map)
+def create_app():
+    """
+    Build the Flask app. Nothing heavy happens here: models are loaded on
+    first use (models.py) and the schema is created on the first DB access.
+    """
+    app = Flask(__name__)
+    app.config["DEBUG"] = DEBUG
+    CORS(app)
+    app.register_blueprint(api)
+    # /debug/profiles (404 unless the caller has the PROFILE_TOKEN)
+    app.register_blueprint(debug)
+    # Per-route-class concurrency limits, 503 + Retry-After, /admission
+    admission.init_app(app)
+    if SHADOW_MODE:
+        shadow.check_model()
+    return app
+
+
+app = create_app()
 
 # -------------------------------------------------
 # RUN
 # -------------------------------------------------
 if __name__ == "__main__":
-    import os
     port = int(os.environ.get("PORT", 5000))
     app.run(host="0.0.0.0", port=port)
-
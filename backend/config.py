@@ -1,8 +1,14 @@
 import os
+import sys
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BASE_DIR)
 
-DB_PATH = os.path.join(BASE_DIR, "database", "exoplanets.db")
+# Shared pipeline code (modules/src) lives at the repository root
+if REPO_DIR not in sys.path:
+    sys.path.append(REPO_DIR)
+
+DB_PATH = os.getenv("EXOPLANETS_DB", os.path.join(BASE_DIR, "database", "exoplanets.db"))
 MODELS_DIR = os.path.join(BASE_DIR, "model")
 
 DEBUG = True
@@ -18,3 +24,84 @@ MODEL_FEATURES = [
     "pl_orbeccen",
     "pl_insol"
 ]
+
+# habitability_score = confidence - SCORE_OFFSET
+SCORE_OFFSET = 0.1225
+
+# Serving models: name -> file stem inside MODELS_DIR.
+# The native XGBoost file (<stem>.ubj) is preferred, the pickle is a fallback.
+MODEL_FILES = {
+    "classifier": "xgboost_classifier",
+    "regressor": "xgboost_reg"
+}
+
+# /predict: also score the regressor on the same packed matrix and return
+# it as `ensemble_score` (habitability_score stays confidence - SCORE_OFFSET)
+ENSEMBLE_SERVING = os.getenv("ENSEMBLE_SERVING", "0") == "1"
+
+# /rank: serve from the in-process array store (store.py) instead of
+# reading and rescoring the whole planets table per request
+PLANET_STORE = os.getenv("PLANET_STORE", "0") == "1"
+
+# Training-time StandardScaler over MODEL_FEATURES (used by /similar)
+SCALER_PATH = os.path.join(MODELS_DIR, "scaler (2).pkl")
+
+# /similar: pending inserts before the KD-tree is rebuilt in the background
+INDEX_REBUILD_EVERY = int(os.getenv("INDEX_REBUILD_EVERY", 256))
+
+# /rank/export: rows fetched from the SQLite cursor per streamed chunk
+EXPORT_CHUNK_ROWS = int(os.getenv("EXPORT_CHUNK_ROWS", 1000))
+
+# /rank: seconds a rendered response is reused while its ETag is unchanged
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", 10))
+RESPONSE_CACHE_SIZE = 256
+
+# Median imputer fitted on the catalog (modules/src/imputation.py serving)
+IMPUTER_PATH = os.path.join(MODELS_DIR, "imputer.json")
+# Model features a request must give (or let derive) before the rest is
+# imputed; fewer is rejected rather than scored and stored as medians
+MIN_REAL_FEATURES = int(os.getenv("MIN_REAL_FEATURES", 4))
+
+# Load every model in the gunicorn master before forking (see gunicorn.conf.py)
+PRELOAD_MODELS = os.getenv("PRELOAD_MODELS", "0") == "1"
+
+# Shadow evaluation: a second model scores /predict rows in a background
+# thread and both results go to the shadow_predictions table (see shadow.py)
+SHADOW_MODE = os.getenv("SHADOW_MODE", "0") == "1"
+# Default: module4's LogisticRegression pipeline (root app.py's model), so
+# the shadow log compares it against the XGBoost classifier served here.
+# Point it at outputs/training/xgboost_classifier.ubj to shadow a candidate
+# from `python -m modules.src.training`
+SHADOW_MODEL_PATH = os.getenv(
+    "SHADOW_MODEL_PATH", os.path.join(REPO_DIR, "model", "habitability_model.pkl")
+)
+# The shadow's own decision threshold, used when its artifact has no
+# manifest: module4's THRESHOLD for the default LogisticRegression. The
+# primary keeps its 0.5 cut (shadow.PRIMARY_THRESHOLD)
+SHADOW_THRESHOLD = float(os.getenv("SHADOW_THRESHOLD", 0.65))
+SHADOW_QUEUE_SIZE = int(os.getenv("SHADOW_QUEUE_SIZE", 1000))
+# Seconds the shadow worker waits to batch queued rows
+SHADOW_INTERVAL = float(os.getenv("SHADOW_INTERVAL", 0.5))
+
+# Per-request profiling (see profiling.py): callers sending PROFILE_TOKEN in
+# the X-Profile header (or ?profile=) get the request profiled; a random
+# PROFILE_SAMPLE_RATE share of requests is profiled as well. No token and a
+# zero rate leave the wrapped handlers untouched.
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN", "")
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", 0))
+# Profiles kept per worker for /debug/profiles, functions per summary
+PROFILE_BUFFER_SIZE = int(os.getenv("PROFILE_BUFFER_SIZE", 50))
+PROFILE_TOP = int(os.getenv("PROFILE_TOP", 15))
+
+# Admission control (see admission.py): per route class, requests that may
+# run at once and requests that may wait for a slot; anything beyond gets
+# an immediate 503 with Retry-After. /rank and /rank/export are
+# "expensive" (O(catalog)), every other API route "cheap".
+ADMISSION_CONTROL = os.getenv("ADMISSION_CONTROL", "1") == "1"
+ADMISSION_LIMITS = {
+    "cheap": (int(os.getenv("CHEAP_CONCURRENCY", 4)), int(os.getenv("CHEAP_QUEUE_DEPTH", 8))),
+    "expensive": (int(os.getenv("EXPENSIVE_CONCURRENCY", 1)),
+                  int(os.getenv("EXPENSIVE_QUEUE_DEPTH", 2)))
+}
+# Seconds a queued request waits for a slot before it is shed
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", 2))
@@ -0,0 +1,296 @@
+import base64
+import json
+import os
+import sqlite3
+import threading
+
+from config import DB_PATH, MODEL_FEATURES, SCORE_OFFSET
+
+# -------------------------------------------------
+# DATABASE
+# -------------------------------------------------
+
+_initialized = False
+_init_lock = threading.Lock()
+_scores_backfilled = False
+
+# Columns added after the first release: name -> type
+MIGRATIONS = {
+    "confidence": "REAL"
+}
+
+# Covering indexes for /planets: each holds every column the query reads,
+# so filtered + sorted pages never touch the table itself.
+INDEXES = [
+    """CREATE INDEX IF NOT EXISTS idx_planets_confidence
+       ON planets (confidence, id, planet_name, st_teff, pl_insol)""",
+    """CREATE INDEX IF NOT EXISTS idx_planets_st_teff
+       ON planets (st_teff, id, planet_name, confidence, pl_insol)""",
+    """CREATE INDEX IF NOT EXISTS idx_planets_pl_insol
+       ON planets (pl_insol, id, planet_name, confidence, st_teff)""",
+    """CREATE INDEX IF NOT EXISTS idx_planets_name
+       ON planets (planet_name)"""
+]
+
+
+# Catalog version: bumped by triggers on every write to planets, so any
+# writer (API, rescoring job, manual SQL) invalidates ETags and caches.
+VERSION_DDL = [
+    """CREATE TABLE IF NOT EXISTS catalog_meta (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        version INTEGER NOT NULL
+    )""",
+    "INSERT OR IGNORE INTO catalog_meta (id, version) VALUES (1, 0)",
+    *[
+        f"""CREATE TRIGGER IF NOT EXISTS planets_version_{event.lower()}
+            AFTER {event} ON planets
+            BEGIN UPDATE catalog_meta SET version = version + 1 WHERE id = 1; END"""
+        for event in ("INSERT", "UPDATE", "DELETE")
+    ]
+]
+
+
+# Primary vs shadow model results on live /predict traffic (see shadow.py)
+SHADOW_DDL = [
+    """CREATE TABLE IF NOT EXISTS shadow_predictions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        planet_name TEXT,
+        primary_model TEXT,
+        primary_proba REAL,
+        primary_ms REAL,
+        shadow_model TEXT,
+        shadow_proba REAL,
+        shadow_ms REAL,
+        agree INTEGER,
+        error TEXT
+    )"""
+]
+
+
+def init_db():
+    conn = sqlite3.connect(DB_PATH)
+    cur = conn.cursor()
+
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS planets (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        planet_name TEXT,
+        st_teff REAL,
+        st_rad REAL,
+        st_mass REAL,
+        st_met REAL,
+        st_luminosity REAL,
+        pl_orbper REAL,
+        pl_orbeccen REAL,
+        pl_insol REAL,
+        source TEXT
+    )
+    """)
+
+    existing = {row[1] for row in cur.execute("PRAGMA table_info(planets)")}
+    for column, col_type in MIGRATIONS.items():
+        if column not in existing:
+            cur.execute(f"ALTER TABLE planets ADD COLUMN {column} {col_type}")
+
+    for ddl in INDEXES + VERSION_DDL + SHADOW_DDL:
+        cur.execute(ddl)
+
+    conn.commit()
+    conn.close()
+
+
+def ensure_db():
+    """
+    Create the schema on first use only; later calls are a flag check.
+    """
+    global _initialized
+
+    if _initialized:
+        return
+
+    with _init_lock:
+        if not _initialized:
+            os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
+            init_db()
+            _initialized = True
+
+
+def get_db():
+    ensure_db()
+    return sqlite3.connect(DB_PATH)
+
+
+def catalog_version(conn):
+    return conn.execute("SELECT version FROM catalog_meta WHERE id = 1").fetchone()[0]
+
+
+def insert_planet(conn, planet_name, features, source, confidence=None):
+    cols = ["planet_name", *MODEL_FEATURES, "source", "confidence"]
+    conn.execute(
+        f"INSERT INTO planets ({', '.join(cols)}) VALUES ({', '.join('?' * len(cols))})",
+        (planet_name, *[features[f] for f in MODEL_FEATURES], source, confidence)
+    )
+    conn.commit()
+
+
+def bulk_update_confidence(conn, ids, confidence):
+    """
+    Write many scores in one transaction. The version trigger stays in
+    place (no DDL per batch, which would also make every other connection
+    re-prepare its statements); its per-row bumps commit together, so
+    readers see the version move once per batch.
+    """
+    conn.commit()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.executemany(
+            "UPDATE planets SET confidence = ? WHERE id = ?",
+            zip(confidence, ids)
+        )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def backfill_scores(conn):
+    """
+    Score the rows stored before the confidence column existed.
+    """
+    rows = conn.execute(
+        f"SELECT id, {', '.join(MODEL_FEATURES)} FROM planets WHERE confidence IS NULL"
+    ).fetchall()
+    if not rows:
+        return 0
+
+    import numpy as np
+    from models import get_model
+
+    X = np.array([r[1:] for r in rows], dtype=float)
+    proba = get_model("classifier").predict_proba(X)[:, 1]
+
+    conn.executemany(
+        "UPDATE planets SET confidence = ? WHERE id = ?",
+        [(float(p), r[0]) for p, r in zip(proba, rows)]
+    )
+    conn.commit()
+    return len(rows)
+
+
+def ensure_scores(conn):
+    """
+    Run backfill_scores() once per process.
+    """
+    global _scores_backfilled
+
+    if not _scores_backfilled:
+        backfill_scores(conn)
+        _scores_backfilled = True
+
+# -------------------------------------------------
+# CATALOG QUERY (/planets)
+# -------------------------------------------------
+
+# Public sort key -> indexed column
+SORT_COLUMNS = {
+    "score": "confidence",
+    "st_teff": "st_teff",
+    "pl_insol": "pl_insol"
+}
+
+
+# Largest page /planets serves
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(sort, order, value, row_id):
+    raw = json.dumps([sort, order, value, row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor, sort, order):
+    """
+    (value, row_id) of a cursor from encode_cursor(); ValueError when it is
+    malformed or was issued for another sort / order.
+    """
+    try:
+        cursor_sort, cursor_order, value, row_id = json.loads(
+            base64.urlsafe_b64decode(cursor.encode())
+        )
+        valid = (
+            isinstance(value, (int, float)) and not isinstance(value, bool)
+            and isinstance(row_id, int) and not isinstance(row_id, bool)
+        )
+    except (ValueError, TypeError):
+        valid = False
+    if not valid:
+        raise ValueError("Invalid cursor: pass next_cursor from a previous page unchanged")
+
+    if (cursor_sort, cursor_order) != (sort, order):
+        raise ValueError(
+            f"cursor belongs to sort={cursor_sort}&order={cursor_order}, "
+            f"not sort={sort}&order={order}"
+        )
+    return value, row_id
+
+
+def query_planets(conn, habitable=None, min_score=None, max_score=None,
+                  teff_min=None, teff_max=None, insol_min=None, insol_max=None,
+                  sort="score", order="desc", limit=50, cursor=None):
+    """
+    One page of the catalog as parameterized SQL with keyset pagination.
+
+    Scores are compared through `confidence` (score = confidence - SCORE_OFFSET)
+    so every predicate and the ORDER BY stay on indexed columns. Returns
+    (rows, next_cursor); next_cursor is None on the last page.
+    """
+    if sort not in SORT_COLUMNS:
+        raise ValueError(f"sort must be one of {sorted(SORT_COLUMNS)}")
+    if order not in ("asc", "desc"):
+        raise ValueError("order must be 'asc' or 'desc'")
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}, got {limit}")
+
+    sort_col = SORT_COLUMNS[sort]
+    where = [f"{sort_col} IS NOT NULL"]
+    params = []
+
+    bounds = [
+        ("confidence >= ?", None if min_score is None else min_score + SCORE_OFFSET),
+        ("confidence <= ?", None if max_score is None else max_score + SCORE_OFFSET),
+        ("st_teff >= ?", teff_min),
+        ("st_teff <= ?", teff_max),
+        ("pl_insol >= ?", insol_min),
+        ("pl_insol <= ?", insol_max)
+    ]
+    if habitable is not None:
+        bounds.append(("confidence >= ?" if habitable else "confidence < ?", 0.5))
+
+    for clause, value in bounds:
+        if value is not None:
+            where.append(clause)
+            params.append(value)
+
+    op = "<" if order == "desc" else ">"
+    if cursor:
+        last_value, last_id = decode_cursor(cursor, sort, order)
+        where.append(f"({sort_col}, id) {op} (?, ?)")
+        params.extend([last_value, last_id])
+
+    sql = (
+        f"SELECT id, planet_name, confidence, st_teff, pl_insol FROM planets "
+        f"WHERE {' AND '.join(where)} "
+        f"ORDER BY {sort_col} {order.upper()}, id {order.upper()} "
+        f"LIMIT ?"
+    )
+    rows = conn.execute(sql, [*params, limit + 1]).fetchall()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        sort_value = {"confidence": last[2], "st_teff": last[3], "pl_insol": last[4]}[sort_col]
+        next_cursor = encode_cursor(sort, order, sort_value, last[0])
+
+    return rows, next_cursor
@@ -0,0 +1,186 @@
+"""
+Streaming exports of the ranked catalog (/rank/export).
+
+Rows come straight from a SQLite cursor ordered by the confidence index and
+are encoded chunk by chunk, so memory stays constant in the catalog size
+and the first bytes go out before the last row is read. XLSX is written as
+a minimal SpreadsheetML zip with inline strings through zipfile's streaming
+(unseekable) mode: no spreadsheet library and no temporary file.
+"""
+
+import csv
+import io
+import json
+import zipfile
+from xml.sax.saxutils import escape
+
+from config import EXPORT_CHUNK_ROWS, SCORE_OFFSET
+from db import ensure_scores, get_db
+
+COLUMNS = ["rank", "planet_name", "habitability", "habitability_score", "confidence"]
+
+MIMETYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+}
+
+
+def iter_ranked_chunks(chunk_size=EXPORT_CHUNK_ROWS):
+    """
+    Yield lists of (rank, planet_name, habitability, habitability_score,
+    confidence), best score first.
+    """
+    conn = get_db()
+    try:
+        ensure_scores(conn)
+        cur = conn.execute(
+            "SELECT planet_name, confidence FROM planets "
+            "WHERE confidence IS NOT NULL "
+            "ORDER BY confidence DESC, id DESC"
+        )
+
+        rank = 0
+        while True:
+            rows = cur.fetchmany(chunk_size)
+            if not rows:
+                break
+
+            chunk = []
+            for name, proba in rows:
+                rank += 1
+                chunk.append((
+                    rank,
+                    name,
+                    int(proba >= 0.5),
+                    round(proba - SCORE_OFFSET, 4),
+                    round(proba, 4)
+                ))
+            yield chunk
+    finally:
+        conn.close()
+
+
+def stream_csv():
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+
+    writer.writerow(COLUMNS)
+    for chunk in iter_ranked_chunks():
+        writer.writerows(chunk)
+        yield buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+
+    if buf.tell():
+        yield buf.getvalue()
+
+
+def stream_ndjson():
+    for chunk in iter_ranked_chunks():
+        yield "".join(json.dumps(dict(zip(COLUMNS, row))) + "\n" for row in chunk)
+
+# -------------------------------------------------
+# XLSX
+# -------------------------------------------------
+
+_XLSX_STATIC = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    "xl/workbook.xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Rankings" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    )
+}
+
+
+class _Sink(io.RawIOBase):
+    """
+    Unseekable file object that buffers zip output until it is drained.
+    """
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self._chunks.append(bytes(b))
+        return len(b)
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _cell(value):
+    if isinstance(value, str):
+        return f'<c t="inlineStr"><is><t>{escape(value)}</t></is></c>'
+    if value is None:
+        return "<c/>"
+    return f"<c><v>{value}</v></c>"
+
+
+def _row(values):
+    return "<row>" + "".join(_cell(v) for v in values) + "</row>"
+
+
+def stream_xlsx():
+    sink = _Sink()
+
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for name, content in _XLSX_STATIC.items():
+            zf.writestr(name, content)
+        yield sink.drain()
+
+        with zf.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as sheet:
+            sheet.write((
+                '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                "<sheetData>" + _row(COLUMNS)
+            ).encode())
+
+            for chunk in iter_ranked_chunks():
+                sheet.write("".join(_row(r) for r in chunk).encode())
+                yield sink.drain()
+
+            sheet.write(b"</sheetData></worksheet>")
+
+    yield sink.drain()
+
+
+STREAMS = {
+    "csv": stream_csv,
+    "ndjson": stream_ndjson,
+    "xlsx": stream_xlsx
+}
@@ -0,0 +1,25 @@
+# gunicorn -c gunicorn.conf.py app:app
+import os
+
+workers = int(os.getenv("WEB_CONCURRENCY", 2))
+# Threaded workers: admission.py bounds how many of these threads /rank
+# can hold, so cheap requests keep theirs. Running + queued requests of
+# both classes (4 + 8 cheap, 1 + 2 expensive by default) fit in 16.
+threads = int(os.getenv("GUNICORN_THREADS", 16))
+bind = "0.0.0.0:" + os.getenv("PORT", "5000")
+
+# Import the app once in the master so workers are forked from it
+preload_app = True
+
+
+def when_ready(server):
+    # Runs in the master after the app is imported and before workers fork:
+    # models loaded here are shared copy-on-write by every worker.
+    from config import PLANET_STORE, PRELOAD_MODELS
+
+    if PRELOAD_MODELS:
+        import models
+        models.preload()
+    if PLANET_STORE:
+        import store
+        store.preload()
@@ -0,0 +1,71 @@
+"""
+Conditional GET and a short-lived response cache for read endpoints.
+
+The ETag of a response is built from the catalog version (bumped by DB
+triggers on every planets write), the serving model version and the query
+string. A matching If-None-Match gets an empty 304; otherwise a body cached
+under the same ETag is replayed for up to RESPONSE_CACHE_TTL seconds, so an
+unchanged catalog is never rescored just because a dashboard polled again.
+"""
+
+import hashlib
+import threading
+import time
+from functools import wraps
+
+from flask import make_response, request
+
+from config import RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL
+from db import catalog_version, get_db
+from models import model_version
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def current_etag():
+    conn = get_db()
+    version = catalog_version(conn)
+    conn.close()
+
+    key = f"{version}|{model_version('classifier')}|{request.full_path}"
+    return f"v{version}-" + hashlib.sha1(key.encode()).hexdigest()[:16]
+
+
+def _finish(resp, etag):
+    resp.set_etag(etag)
+    # Clients may keep the body but must revalidate (cheap with the ETag)
+    resp.headers["Cache-Control"] = "no-cache"
+    return resp
+
+
+def conditional(view):
+    """
+    Decorator adding ETag / If-None-Match / server-side caching to a GET view.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        etag = current_etag()
+
+        if request.if_none_match.contains(etag):
+            return _finish(make_response("", 304), etag)
+
+        now = time.monotonic()
+        cached = _cache.get(request.full_path)
+        if cached and cached[0] == etag and cached[1] > now:
+            return _finish(make_response(cached[2], 200, {"Content-Type": cached[3]}), etag)
+
+        resp = make_response(view(*args, **kwargs))
+        if resp.status_code == 200:
+            with _cache_lock:
+                if len(_cache) >= RESPONSE_CACHE_SIZE:
+                    _cache.clear()
+                _cache[request.full_path] = (
+                    etag,
+                    now + RESPONSE_CACHE_TTL,
+                    resp.get_data(),
+                    resp.headers.get("Content-Type")
+                )
+        return _finish(resp, etag)
+
+    return wrapper
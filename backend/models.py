@@ -0,0 +1,182 @@
+"""
+Lazy, process-wide access to the serving models.
+
+Models are only deserialized the first time a route asks for them, and
+they are read from XGBoost's native UBJSON format (``<stem>.ubj``)
+instead of a pickle. The native file is compact, version-stable and
+loads straight into the booster without unpickling the sklearn wrapper.
+
+When gunicorn runs with ``preload_app`` and ``PRELOAD_MODELS=1`` the
+models are loaded once in the master process, so every forked worker
+shares the same read-only booster pages instead of holding its own copy.
+
+Usage:
+    python models.py export     # convert the .pkl artifacts to .ubj
+"""
+
+import os
+import sys
+import threading
+
+from config import IMPUTER_PATH, MODELS_DIR, MODEL_FILES, SCALER_PATH
+
+_models = {}
+_lock = threading.Lock()
+
+
+def model_path(name):
+    """
+    Return the on-disk artifact for a model, preferring the native format.
+    """
+    stem = os.path.join(MODELS_DIR, MODEL_FILES[name])
+
+    if os.path.exists(stem + ".ubj"):
+        return stem + ".ubj"
+    if os.path.exists(stem + ".pkl"):
+        return stem + ".pkl"
+
+    raise RuntimeError(f"No artifact found for model '{name}' in {MODELS_DIR}")
+
+
+def _native_estimator(path):
+    """
+    Load a native model file into the sklearn wrapper its saved objective
+    calls for: binary:/multi: -> XGBClassifier, rank: -> XGBRanker, anything
+    else -> XGBRegressor.
+    """
+    import json
+
+    import xgboost as xgb
+
+    config = json.loads(xgb.Booster(model_file=path).save_config())
+    objective = config["learner"]["objective"]["name"]
+
+    if objective.startswith(("binary:", "multi:")):
+        model = xgb.XGBClassifier()
+    elif objective.startswith("rank:"):
+        model = xgb.XGBRanker()
+    else:
+        model = xgb.XGBRegressor()
+    model.load_model(path)
+    return model
+
+
+def _load(name):
+    path = model_path(name)
+
+    if path.endswith(".ubj"):
+        return _native_estimator(path)
+
+    import joblib
+    return joblib.load(path)
+
+
+def get_model(name):
+    """
+    Return a loaded model, deserializing it on first use only.
+    """
+    model = _models.get(name)
+    if model is not None:
+        return model
+
+    with _lock:
+        if name not in _models:
+            _models[name] = _load(name)
+            print(f"✅ Model loaded: {name} ({os.path.basename(model_path(name))})")
+        return _models[name]
+
+
+def get_imputer():
+    """
+    Return the fitted imputer artifact, or None if it was never exported.
+    """
+    if "imputer" not in _models:
+        with _lock:
+            if "imputer" not in _models:
+                from modules.src.imputation import load_imputer
+
+                _models["imputer"] = (
+                    load_imputer(IMPUTER_PATH) if os.path.exists(IMPUTER_PATH) else None
+                )
+    return _models["imputer"]
+
+
+def get_scaler():
+    """
+    Return the StandardScaler fitted on MODEL_FEATURES at training time.
+    """
+    if "scaler" not in _models:
+        with _lock:
+            if "scaler" not in _models:
+                import joblib
+
+                _models["scaler"] = joblib.load(SCALER_PATH)
+    return _models["scaler"]
+
+
+def predict_models(X, names=("classifier", "regressor")):
+    """
+    Run several models over one feature matrix and return {name: 1-D array}.
+
+    X is packed once into a contiguous float32 array and handed to each
+    booster with inplace_predict, so no per-model DMatrix or dtype
+    conversion happens. Classifiers yield the positive-class probability,
+    regressors their prediction.
+    """
+    import numpy as np
+
+    X = np.ascontiguousarray(X, dtype=np.float32)
+
+    out = {}
+    for name in names:
+        model = get_model(name)
+        if hasattr(model, "get_booster"):
+            out[name] = model.get_booster().inplace_predict(X)
+        elif hasattr(model, "predict_proba"):
+            out[name] = model.predict_proba(X)[:, 1]
+        else:
+            out[name] = model.predict(X)
+    return out
+
+
+def model_version(name):
+    """
+    Cheap identifier of the artifact currently on disk: the version from its
+    sidecar manifest, else size + mtime (never a hash of the model file).
+    """
+    from modules.src.manifest import artifact_version
+
+    return artifact_version(model_path(name))
+
+
+def loaded_models():
+    return sorted(_models)
+
+
+def preload():
+    """
+    Load every configured model now (used by the gunicorn master).
+    """
+    for name in MODEL_FILES:
+        get_model(name)
+
+
+def export_native():
+    """
+    Convert the pickled models to XGBoost's native UBJSON format.
+    """
+    import joblib
+
+    for name, stem in MODEL_FILES.items():
+        src = os.path.join(MODELS_DIR, stem + ".pkl")
+        dst = os.path.join(MODELS_DIR, stem + ".ubj")
+
+        joblib.load(src).save_model(dst)
+        print(f"✅ {name}: {os.path.basename(src)} → {os.path.basename(dst)}")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ["export"]:
+        export_native()
+    else:
+        print(__doc__)
@@ -0,0 +1,155 @@
+"""
+Opt-in per-request profiling for slow /predict and /rank calls.
+
+A handler wrapped in @profiled runs under cProfile when
+
+  - the caller sends the PROFILE_TOKEN in an X-Profile header (or as
+    ?profile=<token>), or
+  - the request is picked by PROFILE_SAMPLE_RATE (0.01 = 1% of requests).
+
+The profile is reduced to a compact hot-path summary (the PROFILE_TOP
+functions by cumulative time, with call counts and own time) and kept in a
+per-process ring buffer of PROFILE_BUFFER_SIZE entries. The response
+carries an X-Profile-Id header; GET /debug/profiles (same token) lists the
+buffer, /debug/profiles/<id> returns one summary. With gunicorn each
+worker has its own buffer: the id names the worker's pid.
+
+With no token configured and a zero sampling rate, @profiled returns the
+handler unchanged, so a disabled profiler costs nothing at all. Only one
+request is profiled at a time per process; a request that would overlap
+runs unprofiled.
+"""
+
+import cProfile
+import hmac
+import itertools
+import os
+import pstats
+import random
+import threading
+import time
+from collections import deque
+from functools import wraps
+
+from flask import Blueprint, jsonify, make_response, request
+
+from config import PROFILE_BUFFER_SIZE, PROFILE_SAMPLE_RATE, PROFILE_TOKEN, PROFILE_TOP
+
+ENABLED = bool(PROFILE_TOKEN) or PROFILE_SAMPLE_RATE > 0
+
+_profiles = deque(maxlen=PROFILE_BUFFER_SIZE)
+_ids = itertools.count(1)
+# cProfile hooks the running thread only; one profile at a time keeps
+# concurrent requests from tripping over each other
+_busy = threading.Lock()
+
+debug = Blueprint("debug", __name__)
+
+
+def authorized():
+    token = request.headers.get("X-Profile") or request.args.get("profile")
+    return bool(PROFILE_TOKEN) and token is not None and hmac.compare_digest(token, PROFILE_TOKEN)
+
+
+def _trigger():
+    if authorized():
+        return "token"
+    if PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE:
+        return "sampled"
+    return None
+
+
+def _label(func):
+    filename, line, name = func
+    if filename == "~":
+        # Built-ins: "<built-in method time.perf_counter>"
+        return name
+    parts = filename.replace(os.sep, "/").split("/")
+    return f"{'/'.join(parts[-2:])}:{line}({name})"
+
+
+def summarize(profiler, top=PROFILE_TOP):
+    """
+    Hot path of a finished profile: the `top` functions by cumulative time.
+    """
+    stats = pstats.Stats(profiler).stats
+    rows = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)[:top]
+    return [
+        {
+            "function": _label(func),
+            "calls": primitive if primitive == total else f"{total}/{primitive}",
+            "own_ms": round(own * 1e3, 3),
+            "cumulative_ms": round(cumulative * 1e3, 3)
+        }
+        for func, (primitive, total, own, cumulative, _) in rows
+    ]
+
+
+def _record(profiler, trigger, elapsed, status):
+    entry = {
+        "id": f"{os.getpid()}-{next(_ids)}",
+        "method": request.method,
+        "path": request.path,
+        "status": status,
+        "trigger": trigger,
+        "at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "total_ms": round(elapsed * 1e3, 3),
+        "hot_path": summarize(profiler)
+    }
+    _profiles.append(entry)
+    return entry
+
+
+def profiled(view):
+    """
+    Decorator: profile the handler when the request opts in (see module doc).
+    """
+    if not ENABLED:
+        return view
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        trigger = _trigger()
+        if trigger is None or not _busy.acquire(blocking=False):
+            return view(*args, **kwargs)
+
+        profiler = cProfile.Profile()
+        try:
+            start = time.perf_counter()
+            profiler.enable()
+            try:
+                resp = make_response(view(*args, **kwargs))
+            finally:
+                profiler.disable()
+            elapsed = time.perf_counter() - start
+        finally:
+            _busy.release()
+
+        entry = _record(profiler, trigger, elapsed, resp.status_code)
+        resp.headers["X-Profile-Id"] = entry["id"]
+        return resp
+
+    return wrapper
+
+
+# ---------------- /debug/profiles ----------------
+
+@debug.route("/debug/profiles", methods=["GET"])
+def list_profiles():
+    if not authorized():
+        return jsonify({"status": "error", "message": "Not found", "data": None}), 404
+
+    return jsonify({
+        "status": "success",
+        "message": f"{len(_profiles)} profiles (pid {os.getpid()})",
+        "data": list(reversed(_profiles))
+    })
+
+
+@debug.route("/debug/profiles/<profile_id>", methods=["GET"])
+def get_profile(profile_id):
+    if authorized():
+        for entry in _profiles:
+            if entry["id"] == profile_id:
+                return jsonify({"status": "success", "message": "Profile", "data": entry})
+    return jsonify({"status": "error", "message": "Not found", "data": None}), 404
@@ -0,0 +1,249 @@
+"""
+Offline bulk rescoring after a model deploy.
+
+Streams the planets table (keyset pages by id) or a training CSV (pandas
+chunks) and scores every chunk with the classifier. Scoring runs either in
+this process with XGBoost's own threads or across a spawned process pool,
+with at most two chunks per worker in flight, so memory stays bounded by the
+chunk size and not the table size.
+
+planets: each chunk's scores are written back with one executemany UPDATE
+inside one transaction (db.bulk_update_confidence), so readers see the
+catalog version move once per chunk. CSV: rows are appended to
+the output file with a `confidence` column.
+
+A checkpoint (last id / rows done plus the model version) is written after
+every committed chunk, so an interrupted run resumes where it stopped. A
+checkpoint written for another model version is ignored. For a CSV it also
+holds the output's size after that chunk: a resume truncates the file back
+to it, dropping a chunk appended just before a crash took the checkpoint.
+
+Usage:
+    python rescore.py [--chunk 5000] [--workers 1] [--threads 0] [--restart]
+    python rescore.py --csv ../modules/data/scrap/Exoplanet_dataset.csv [--out scored.csv]
+"""
+
+import argparse
+import json
+import multiprocessing as mp
+import os
+import time
+from collections import deque
+
+import numpy as np
+
+from config import BASE_DIR, MODEL_FEATURES
+from db import bulk_update_confidence, get_db
+from models import get_model, model_version, predict_models
+
+CHECKPOINT_PATH = os.path.join(BASE_DIR, "database", "rescore.checkpoint.json")
+
+# -------------------------------------------------
+# CHECKPOINT
+# -------------------------------------------------
+
+def load_checkpoint(path, target, version):
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        checkpoint = json.load(f)
+    if checkpoint.get("target") != target or checkpoint.get("model") != version:
+        return None
+    return checkpoint
+
+
+def save_checkpoint(path, checkpoint):
+    # Write-then-rename so a crash never leaves a truncated checkpoint
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp, path)
+
+# -------------------------------------------------
+# SCORING
+# -------------------------------------------------
+
+def _init_worker(threads):
+    get_model("classifier").get_booster().set_param({"nthread": threads})
+
+
+def _score(X):
+    return predict_models(X, names=("classifier",))["classifier"]
+
+
+def scored(chunks, workers=1, threads=0):
+    """
+    Score (meta, X) chunks and yield (meta, proba) in input order.
+
+    workers=1 scores in-process (threads=0: all cores via XGBoost); more
+    workers use a spawned pool, one XGBoost thread each by default.
+    """
+    if workers <= 1:
+        _init_worker(threads)
+        for meta, X in chunks:
+            yield meta, _score(X)
+        return
+
+    ctx = mp.get_context("spawn")
+    with ctx.Pool(workers, initializer=_init_worker, initargs=(threads or 1,)) as pool:
+        pending = deque()
+        for meta, X in chunks:
+            pending.append((meta, pool.apply_async(_score, (X,))))
+            if len(pending) >= 2 * workers:
+                meta, result = pending.popleft()
+                yield meta, result.get()
+        while pending:
+            meta, result = pending.popleft()
+            yield meta, result.get()
+
+# -------------------------------------------------
+# TARGETS
+# -------------------------------------------------
+
+def planet_chunks(conn, chunk_size, after_id=0):
+    """
+    Yield (ids, X) pages of the planets table in id order.
+    """
+    last_id = after_id
+    while True:
+        rows = conn.execute(
+            f"SELECT id, {', '.join(MODEL_FEATURES)} FROM planets "
+            f"WHERE id > ? ORDER BY id LIMIT ?",
+            (last_id, chunk_size)
+        ).fetchall()
+        if not rows:
+            return
+
+        data = np.array(rows, dtype=float)
+        ids = data[:, 0].astype(int)
+        last_id = int(ids[-1])
+        yield ids, data[:, 1:]
+
+
+def rescore_planets(chunk_size, workers, threads, checkpoint_path, restart=False):
+    version = model_version("classifier")
+    checkpoint = None if restart else load_checkpoint(checkpoint_path, "planets", version)
+    if checkpoint:
+        print(f"↩️  Resuming after id {checkpoint['last_id']} ({checkpoint['rows']:,d} rows done)")
+    else:
+        checkpoint = {"target": "planets", "model": version, "last_id": 0, "rows": 0}
+
+    conn = get_db()
+    # Every chunk rewrites four indexes that hold `confidence`
+    conn.execute("PRAGMA cache_size = -65536")
+    start = time.perf_counter()
+    done = 0
+
+    try:
+        chunks = planet_chunks(conn, chunk_size, checkpoint["last_id"])
+        for ids, proba in scored(chunks, workers, threads):
+            bulk_update_confidence(conn, ids.tolist(), proba.astype(float).tolist())
+
+            done += len(ids)
+            checkpoint.update(last_id=int(ids[-1]), rows=checkpoint["rows"] + len(ids))
+            save_checkpoint(checkpoint_path, checkpoint)
+
+            elapsed = time.perf_counter() - start
+            print(f"   … {checkpoint['rows']:>10,d} rows  {done / elapsed:>10,.0f} rows/s")
+    finally:
+        conn.close()
+
+    return done, time.perf_counter() - start
+
+
+def csv_chunks(path, chunk_size, skip_rows, schema):
+    import pandas as pd
+
+    from models import get_imputer
+    from modules.src.feature_derive import CATALOG_COLUMNS, derive_features, rename_columns
+    from modules.src.imputation import impute_frame
+
+    imputer = get_imputer()
+    skip = range(1, skip_rows + 1) if skip_rows else None
+
+    for frame in pd.read_csv(path, chunksize=chunk_size, skiprows=skip):
+        features = frame
+        if schema == "catalog":
+            features = frame.copy()
+            for name, values in derive_features(features, CATALOG_COLUMNS).items():
+                features[name] = values
+            features = rename_columns(features)
+
+        features = features.reindex(columns=MODEL_FEATURES)
+        if imputer is not None:
+            features = impute_frame(features, imputer)
+
+        yield frame, features.to_numpy(dtype=float)
+
+
+def rescore_csv(path, out_path, chunk_size, workers, threads, schema,
+                checkpoint_path, restart=False):
+    version = model_version("classifier")
+    target = os.path.abspath(path)
+    checkpoint = None if restart else load_checkpoint(checkpoint_path, target, version)
+    # An output shorter than the checkpoint lost chunks: start over
+    if (checkpoint and "bytes" in checkpoint and os.path.exists(out_path)
+            and os.path.getsize(out_path) >= checkpoint["bytes"]):
+        os.truncate(out_path, checkpoint["bytes"])
+        print(f"↩️  Resuming after row {checkpoint['rows']:,d}")
+    else:
+        checkpoint = {"target": target, "model": version, "rows": 0, "bytes": 0}
+        if os.path.exists(out_path):
+            os.remove(out_path)
+
+    start = time.perf_counter()
+    done = 0
+
+    chunks = csv_chunks(path, chunk_size, checkpoint["rows"], schema)
+    for frame, proba in scored(chunks, workers, threads):
+        frame = frame.assign(confidence=np.round(proba, 6))
+        with open(out_path, "a", newline="") as f:
+            frame.to_csv(f, index=False, header=checkpoint["rows"] == 0)
+            # On disk before the checkpoint that points past it
+            f.flush()
+            os.fsync(f.fileno())
+
+        done += len(frame)
+        checkpoint["rows"] += len(frame)
+        checkpoint["bytes"] = os.path.getsize(out_path)
+        save_checkpoint(checkpoint_path, checkpoint)
+
+        elapsed = time.perf_counter() - start
+        print(f"   … {checkpoint['rows']:>10,d} rows  {done / elapsed:>10,.0f} rows/s")
+
+    return done, time.perf_counter() - start
+
+# -------------------------------------------------
+# RUN
+# -------------------------------------------------
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rescore the catalog with the current classifier")
+    parser.add_argument("--chunk", type=int, default=5000, help="rows per chunk / transaction")
+    parser.add_argument("--workers", type=int, default=1, help="scoring processes (1 = in-process)")
+    parser.add_argument("--threads", type=int, default=0, help="XGBoost threads per scorer (0 = all cores)")
+    parser.add_argument("--csv", help="score a training CSV instead of the planets table")
+    parser.add_argument("--out", help="output CSV (default: <csv>_scored.csv)")
+    parser.add_argument("--schema", choices=["catalog", "serving"], default="catalog",
+                        help="column names of --csv (catalog: Exoplanet_dataset.csv)")
+    parser.add_argument("--checkpoint", help="checkpoint file (default: per target)")
+    parser.add_argument("--restart", action="store_true", help="ignore an existing checkpoint")
+    args = parser.parse_args()
+
+    print(f"🔁 Rescoring with {model_version('classifier')} "
+          f"({args.workers} worker(s), chunk {args.chunk:,d})")
+
+    if args.csv:
+        out_path = args.out or os.path.splitext(args.csv)[0] + "_scored.csv"
+        rows, elapsed = rescore_csv(
+            args.csv, out_path, args.chunk, args.workers, args.threads,
+            args.schema, args.checkpoint or out_path + ".checkpoint.json", args.restart
+        )
+        print(f"💾 Saved: {out_path}")
+    else:
+        rows, elapsed = rescore_planets(
+            args.chunk, args.workers, args.threads, args.checkpoint or CHECKPOINT_PATH, args.restart
+        )
+
+    rate = rows / elapsed if elapsed else 0.0
+    print(f"✅ {rows:,d} rows in {elapsed:.2f} s ({rate:,.0f} rows/s)")
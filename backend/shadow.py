@@ -0,0 +1,254 @@
+"""
+Shadow scoring: compare a second model against the serving classifier on
+live /predict traffic.
+
+The request thread only appends the request's feature row as given (raw
+and derived values, nothing imputed), the primary result and its latency
+to a bounded queue (a non-blocking put). One daemon thread loads the shadow model on first use and, at most once
+per SHADOW_INTERVAL, scores everything queued in a single predict_proba
+call and writes it to the shadow_predictions table in one transaction, so
+the worker holds the CPU/GIL in rare short bursts instead of once per
+request. A full queue drops the row (counted) instead of slowing the
+request down.
+
+By default the shadow is module4's LogisticRegression pipeline
+(model/habitability_model.pkl, served by root app.py), so the log compares
+it with the XGBoost classifier served here. It reads other raw columns
+(pl_rade, pl_bmasse, pl_eqt, st_spectype, ...), and a request that did not
+carry one of them is logged with an error instead of a score: its own
+imputers would fill the gap and every such row would get the same
+probability. A booster over MODEL_FEATURES, such as the training package's
+outputs/training/xgboost_classifier.ubj, works as well.
+
+`agree` compares the two decisions, each at its own model's threshold:
+the primary at PRIMARY_THRESHOLD (0.5, the cut behind /predict's
+`habitability`), the shadow at the threshold in its artifact's manifest,
+else SHADOW_THRESHOLD (0.65, the one module4 tuned for its
+LogisticRegression; set it when shadowing anything else).
+
+Usage:
+    python shadow.py        # agreement and latency summary
+"""
+
+import os
+import queue
+import threading
+import time
+
+from config import SHADOW_INTERVAL, SHADOW_MODEL_PATH, SHADOW_QUEUE_SIZE, SHADOW_THRESHOLD
+from db import get_db
+from modules.src.manifest import artifact_version, read_manifest
+
+# /predict's `habitability` cut for the serving classifier
+PRIMARY_THRESHOLD = 0.5
+
+_queue = queue.Queue(maxsize=SHADOW_QUEUE_SIZE)
+_worker = None
+_worker_lock = threading.Lock()
+_shadow_model = None
+
+dropped = 0
+
+
+def submit(planet_name, features, primary_model, primary_proba, primary_ms):
+    """
+    Hand one scored request to the shadow worker. Never blocks.
+    """
+    global dropped
+
+    _ensure_worker()
+    try:
+        _queue.put_nowait((
+            planet_name, dict(features), primary_model,
+            float(primary_proba), float(primary_ms)
+        ))
+    except queue.Full:
+        dropped += 1
+
+
+def check_model():
+    """
+    Fail at startup, not in the worker, when SHADOW_MODE points at a model
+    that is not there.
+    """
+    if not os.path.exists(SHADOW_MODEL_PATH):
+        raise RuntimeError(
+            f"SHADOW_MODE=1 but the shadow model {SHADOW_MODEL_PATH} does not exist; "
+            f"set SHADOW_MODEL_PATH to a .pkl pipeline or .ubj booster"
+        )
+
+
+def _ensure_worker():
+    global _worker
+
+    if _worker is not None:
+        return
+    with _worker_lock:
+        if _worker is None:
+            _worker = threading.Thread(target=_run, name="shadow-scorer", daemon=True)
+            _worker.start()
+
+
+def _load_shadow_model():
+    global _shadow_model
+
+    if _shadow_model is None:
+        if SHADOW_MODEL_PATH.endswith(".ubj"):
+            import xgboost as xgb
+            _shadow_model = xgb.Booster(model_file=SHADOW_MODEL_PATH)
+        else:
+            import joblib
+            _shadow_model = joblib.load(SHADOW_MODEL_PATH)
+    return _shadow_model
+
+
+def _input_columns(model):
+    if hasattr(model, "feature_names_in_"):
+        return list(model.feature_names_in_)
+    manifest = read_manifest(SHADOW_MODEL_PATH)
+    return list(manifest["features"] if manifest else model.feature_names)
+
+
+def _score(model, rows):
+    """
+    Score a batch of feature dicts in one call. Rows missing one of the
+    model's input columns are not scored.
+
+    Returns (probas, errors), both one entry per row.
+    """
+    import numpy as np
+    import pandas as pd
+
+    columns = _input_columns(model)
+    probas, errors = [None] * len(rows), [None] * len(rows)
+
+    complete = []
+    for i, row in enumerate(rows):
+        missing = [c for c in columns if row.get(c) is None]
+        if missing:
+            errors[i] = "missing shadow inputs: " + ", ".join(missing)
+        else:
+            complete.append(i)
+    if not complete:
+        return probas, errors
+
+    frame = pd.DataFrame([{c: rows[i][c] for c in columns} for i in complete], columns=columns)
+    if hasattr(model, "predict_proba"):
+        scored = model.predict_proba(frame)[:, 1]
+    else:
+        scored = model.inplace_predict(np.ascontiguousarray(frame.to_numpy(dtype=np.float32)))
+
+    for i, proba in zip(complete, scored):
+        probas[i] = proba
+    return probas, errors
+
+
+def _shadow_threshold():
+    # The threshold tuned in module4 travels with the artifact's manifest
+    manifest = read_manifest(SHADOW_MODEL_PATH)
+    if manifest and manifest.get("threshold") is not None:
+        return float(manifest["threshold"])
+    return SHADOW_THRESHOLD
+
+
+def _run():
+    shadow_name = artifact_version(SHADOW_MODEL_PATH)
+    threshold = _shadow_threshold()
+
+    while True:
+        # Sleep between batches so scoring never competes with requests
+        # more than once per SHADOW_INTERVAL
+        batch = [_queue.get()]
+        time.sleep(SHADOW_INTERVAL)
+        while True:
+            try:
+                batch.append(_queue.get_nowait())
+            except queue.Empty:
+                break
+
+        probas = [None] * len(batch)
+        shadow_ms = None
+        try:
+            model = _load_shadow_model()
+            start = time.perf_counter()
+            probas, errors = _score(model, [item[1] for item in batch])
+            # Amortized per row: the whole batch is one call
+            shadow_ms = (time.perf_counter() - start) * 1e3 / len(batch)
+        except Exception as e:
+            errors = [str(e)] * len(batch)
+
+        rows = []
+        for item, proba, error in zip(batch, probas, errors):
+            planet_name, _, primary_model, primary_proba, primary_ms = item
+            agree = None
+            if proba is not None:
+                proba = float(proba)
+                agree = int((primary_proba >= PRIMARY_THRESHOLD) == (proba >= threshold))
+            rows.append((
+                planet_name, primary_model, primary_proba, primary_ms,
+                shadow_name, proba, shadow_ms, agree, error
+            ))
+
+        try:
+            conn = get_db()
+            with conn:
+                conn.executemany(
+                    "INSERT INTO shadow_predictions (planet_name, primary_model, "
+                    "primary_proba, primary_ms, shadow_model, shadow_proba, shadow_ms, "
+                    "agree, error) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+            conn.close()
+        except Exception as e:
+            print("⚠️ Shadow log write failed:", e)
+
+
+def flush(timeout=10.0):
+    """
+    Wait until queued rows have been scored (tests and benchmarks).
+    """
+    deadline = time.monotonic() + timeout
+    while not _queue.empty() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    # The last batch may still be in the worker
+    time.sleep(SHADOW_INTERVAL + 0.1)
+
+
+def summary(conn):
+    """
+    Agreement and latency of the logged shadow comparisons.
+    """
+    import numpy as np
+
+    rows = conn.execute(
+        "SELECT primary_proba, primary_ms, shadow_proba, shadow_ms, agree "
+        "FROM shadow_predictions WHERE error IS NULL"
+    ).fetchall()
+    errors = conn.execute(
+        "SELECT COUNT(*) FROM shadow_predictions WHERE error IS NOT NULL"
+    ).fetchone()[0]
+
+    thresholds = {"primary_threshold": PRIMARY_THRESHOLD, "shadow_threshold": _shadow_threshold()}
+    if not rows:
+        return {"rows": 0, "errors": errors, **thresholds}
+
+    primary, primary_ms, shadow, shadow_ms, agree = np.array(rows, dtype=float).T
+    return {
+        "rows": len(rows),
+        "errors": errors,
+        **thresholds,
+        "agreement": round(float(agree.mean()), 4),
+        "mean_abs_proba_diff": round(float(np.abs(primary - shadow).mean()), 4),
+        "primary_ms_p50": round(float(np.percentile(primary_ms, 50)), 3),
+        "primary_ms_p99": round(float(np.percentile(primary_ms, 99)), 3),
+        "shadow_ms_p50": round(float(np.percentile(shadow_ms, 50)), 3),
+        "shadow_ms_p99": round(float(np.percentile(shadow_ms, 99)), 3)
+    }
+
+
+if __name__ == "__main__":
+    conn = get_db()
+    print("📊 Shadow evaluation")
+    for key, value in summary(conn).items():
+        print(f"   {key:22s} {value}")
+    conn.close()
@@ -0,0 +1,212 @@
+"""
+Nearest-neighbour index over the scaled MODEL_FEATURES of the planets table.
+
+Rows are standardized with the training scaler and stored in a KD-tree
+together with their classifier probability, so a /similar query is one
+tree lookup with no model call. Planets inserted after the tree was built
+go to a small pending buffer that is searched by brute force; once it
+reaches INDEX_REBUILD_EVERY rows the tree is rebuilt in a background
+thread and swapped in atomically.
+
+The index is per process: like store.get_store, it remembers the catalog
+version it reflects and is reloaded when another worker (or a rescore)
+changed the planets table behind its back.
+"""
+
+import threading
+
+import numpy as np
+
+from config import INDEX_REBUILD_EVERY, MODEL_FEATURES
+from db import catalog_version, get_db
+from models import get_model, get_scaler
+
+_index = None
+_index_lock = threading.Lock()
+
+
+class PlanetIndex:
+
+    def __init__(self, mean, scale):
+        self.mean = mean
+        self.scale = scale
+
+        # catalog_meta version of the planets rows held (see db.py)
+        self.version = None
+
+        self._lock = threading.Lock()
+        self._rebuilding = False
+
+        # Indexed snapshot (tree + aligned row data)
+        self._tree = None
+        self._points = np.empty((0, len(MODEL_FEATURES)))
+        self._names = []
+        self._proba = np.empty(0)
+
+        # Rows added since the last build
+        self._pending_points = []
+        self._pending_names = []
+        self._pending_proba = []
+
+    def __len__(self):
+        return len(self._names) + len(self._pending_names)
+
+    def scale_rows(self, X):
+        return (np.asarray(X, dtype=float) - self.mean) / self.scale
+
+    def build(self, names, X, proba):
+        from scipy.spatial import cKDTree
+
+        points = self.scale_rows(X)
+        tree = cKDTree(points) if len(points) else None
+
+        with self._lock:
+            self._tree = tree
+            self._points = points
+            self._names = list(names)
+            self._proba = np.asarray(proba, dtype=float)
+
+    def add(self, name, x, proba):
+        with self._lock:
+            self._pending_points.append(self.scale_rows(x))
+            self._pending_names.append(name)
+            self._pending_proba.append(float(proba))
+            start_rebuild = (
+                len(self._pending_names) >= INDEX_REBUILD_EVERY
+                and not self._rebuilding
+            )
+            if start_rebuild:
+                self._rebuilding = True
+
+        if start_rebuild:
+            threading.Thread(target=self._rebuild, daemon=True).start()
+
+    def _rebuild(self):
+        from scipy.spatial import cKDTree
+
+        with self._lock:
+            n_pending = len(self._pending_names)
+            points = np.vstack([self._points, *self._pending_points[:n_pending]])
+            names = self._names + self._pending_names[:n_pending]
+            proba = np.concatenate([self._proba, self._pending_proba[:n_pending]])
+
+        # The expensive part runs without holding the lock
+        tree = cKDTree(points)
+
+        with self._lock:
+            self._tree = tree
+            self._points = points
+            self._names = names
+            self._proba = proba
+            del self._pending_points[:n_pending]
+            del self._pending_names[:n_pending]
+            del self._pending_proba[:n_pending]
+            self._rebuilding = False
+
+    def query(self, x, k=5, exclude=None):
+        """
+        Return [(name, distance, proba)] of the k nearest planets to the
+        (unscaled) feature row x, nearest first.
+        """
+        q = self.scale_rows(x)
+
+        with self._lock:
+            tree, names, proba = self._tree, self._names, self._proba
+            pending = np.array(self._pending_points).reshape(-1, len(MODEL_FEATURES))
+            pending_names = list(self._pending_names)
+            pending_proba = list(self._pending_proba)
+
+        # One extra neighbour so the query planet itself can be skipped
+        want = k + (1 if exclude is not None else 0)
+        candidates = []
+
+        if tree is not None:
+            dist, idx = tree.query(q, k=min(want, len(names)))
+            for d, i in zip(np.atleast_1d(dist), np.atleast_1d(idx)):
+                candidates.append((names[i], float(d), float(proba[i])))
+
+        if len(pending):
+            dist = np.sqrt(((pending - q) ** 2).sum(axis=1))
+            for i in np.argsort(dist)[:want]:
+                candidates.append((pending_names[i], float(dist[i]), pending_proba[i]))
+
+        candidates.sort(key=lambda c: c[1])
+        return [c for c in candidates if c[0] != exclude][:k]
+
+
+def _load_index():
+    conn = get_db()
+    # One read transaction: the version and the rows are the same snapshot
+    conn.execute("BEGIN")
+    try:
+        version = catalog_version(conn)
+        rows = conn.execute(
+            f"SELECT planet_name, {', '.join(MODEL_FEATURES)} FROM planets"
+        ).fetchall()
+    finally:
+        conn.commit()
+        conn.close()
+
+    names = [r[0] for r in rows]
+    X = np.array([r[1:] for r in rows], dtype=float).reshape(-1, len(MODEL_FEATURES))
+
+    # Rows with missing features cannot be placed in feature space
+    keep = ~np.isnan(X).any(axis=1)
+    names = [n for n, k in zip(names, keep) if k]
+    X = X[keep]
+
+    proba = get_model("classifier").predict_proba(X)[:, 1] if len(X) else np.empty(0)
+
+    scaler = get_scaler()
+    index = PlanetIndex(scaler.mean_, scaler.scale_)
+    index.build(names, X, proba)
+    index.version = version
+    return index
+
+
+def _current_version():
+    conn = get_db()
+    try:
+        return catalog_version(conn)
+    finally:
+        conn.close()
+
+
+def get_index():
+    """
+    Return the process-wide index, (re)building it from the DB on first
+    use and whenever the catalog version moved on without this process.
+    """
+    global _index
+
+    version = _current_version()
+    if _index is not None and _index.version == version:
+        return _index
+
+    with _index_lock:
+        if _index is None or _index.version != _current_version():
+            _index = _load_index()
+    return _index
+
+
+def on_planet_inserted(name, features, proba=None):
+    """
+    Keep an already-built index in step with a new planets row. Appends in
+    place when the insert is the only change since the index's version;
+    otherwise leaves the index to be reloaded on its next query.
+    """
+    index = _index
+    if index is None:
+        return
+
+    x = np.array([[float(features[f]) for f in MODEL_FEATURES]])
+    if proba is None and not np.isnan(x).any():
+        proba = get_model("classifier").predict_proba(x)[0, 1]
+
+    with _index_lock:
+        if _current_version() != index.version + 1:
+            return
+        # A row with missing features is not indexed but still counts
+        index.version += 1
+        if not np.isnan(x).any():
+            index.add(name, x[0], proba)
@@ -0,0 +1,256 @@
+"""
+Compact in-process copy of the planets table for /rank.
+
+Each planet is one slot in a set of contiguous NumPy columns:
+
+    MODEL_FEATURES   8 × float32    32 bytes
+    confidence       float32         4 bytes
+    name code        int32           4 bytes   → interned name table
+    source code      uint8           1 byte    → interned source table
+                                    ---------
+                                    41 bytes per planet in the columns
+    name table       str + list slot ~70 bytes for a 13-character name
+
+≈ 115 bytes per planet all in (measured at 1M rows by
+benchmarks/bench_planet_store.py, which fails above 150), against ~125 for
+just the ranked columns of a DataFrame and far more for `SELECT *`.
+
+Names are interned while loading (duplicate rows share one string); the
+name -> code dict is dropped afterwards because it would cost more than the
+strings. Appends always add a string: /add_planet and /predict only insert
+names that are not in the table yet.
+
+Columns grow by doubling, so appends are amortized O(1). Ranking and the
+summary stats run directly over the arrays: no DataFrame, no object
+columns, no copies of the table per request.
+
+The store remembers the catalog version (db.catalog_version) it reflects.
+Writes made through this process are appended in place; any other write
+(another worker, the rescoring job, manual SQL) changes the version and the
+next read reloads from SQLite.
+"""
+
+import threading
+
+import numpy as np
+
+from config import MODEL_FEATURES, SCORE_OFFSET
+from db import catalog_version, ensure_scores, get_db
+
+# Rows fetched per SQLite round trip while loading
+LOAD_CHUNK_ROWS = 10000
+
+_store = None
+_store_lock = threading.Lock()
+
+
+class PlanetStore:
+
+    def __init__(self, capacity=1024):
+        self.size = 0
+        self.version = None
+
+        self.features = np.empty((capacity, len(MODEL_FEATURES)), dtype=np.float32)
+        self.confidence = np.empty(capacity, dtype=np.float32)
+        self.name_codes = np.empty(capacity, dtype=np.int32)
+        self.source_codes = np.empty(capacity, dtype=np.uint8)
+
+        # Interned string tables: code -> str and str -> code. The name
+        # index only lives while loading (see the module docstring)
+        self.names = []
+        self._name_index = {}
+        self.sources = []
+        self._source_index = {}
+
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self.size
+
+    @staticmethod
+    def _intern(value, table, index):
+        code = index.get(value) if index is not None else None
+        if code is None:
+            code = len(table)
+            table.append(value)
+            if index is not None:
+                index[value] = code
+        return code
+
+    def _reserve(self, n):
+        capacity = len(self.confidence)
+        if self.size + n <= capacity:
+            return
+
+        while capacity < self.size + n:
+            capacity *= 2
+        self.features = np.resize(self.features, (capacity, len(MODEL_FEATURES)))
+        self.confidence = np.resize(self.confidence, capacity)
+        self.name_codes = np.resize(self.name_codes, capacity)
+        self.source_codes = np.resize(self.source_codes, capacity)
+
+    # ---------- writes ----------
+
+    def extend(self, names, sources, X, confidence):
+        """
+        Append many planets (parallel sequences / arrays).
+        """
+        n = len(names)
+        with self._lock:
+            self._reserve(n)
+            end = self.size + n
+
+            self.features[self.size:end] = X
+            self.confidence[self.size:end] = confidence
+            self.name_codes[self.size:end] = [
+                self._intern(name, self.names, self._name_index) for name in names
+            ]
+            self.source_codes[self.size:end] = [
+                self._intern(source, self.sources, self._source_index) for source in sources
+            ]
+            self.size = end
+
+    def append(self, name, features, source, confidence):
+        x = [[float(features[f]) for f in MODEL_FEATURES]]
+        self.extend([name], [source], x, [confidence])
+
+    # ---------- reads ----------
+
+    def _snapshot(self):
+        """
+        (size, confidence, name codes) as of one moment. extend() may swap
+        in resized arrays and move `size` at any time, so both are read
+        under the lock; the views stay valid after a swap (they keep the
+        old arrays alive) and appends only write past `size`.
+        """
+        with self._lock:
+            size = self.size
+            return size, self.confidence[:size], self.name_codes[:size]
+
+    def stats(self):
+        size, confidence, _ = self._snapshot()
+        return {
+            "total_count": size,
+            "habitable_count": int((confidence >= 0.5).sum()),
+            "average_score": float(confidence.mean(dtype=np.float64)) - SCORE_OFFSET
+            if size else 0.0
+        }
+
+    def top(self, n):
+        """
+        The n best distinct (name, confidence) entries, best first, as
+        [(name, confidence)]. Same rows as /rank's drop_duplicates +
+        sort_values + head on the DataFrame.
+        """
+        size, confidence, names = self._snapshot()
+
+        want = n
+        while True:
+            k = min(want, size)
+            if k == 0:
+                return []
+
+            # Partial selection, then sort only the k candidates
+            candidates = np.argpartition(-confidence, k - 1)[:k] if k < size else np.arange(size)
+            candidates = candidates[np.argsort(-confidence[candidates], kind="stable")]
+
+            out = []
+            seen = set()
+            for i in candidates:
+                # By string: appended names are not interned
+                key = (self.names[names[i]], confidence[i])
+                if key in seen:
+                    continue
+                seen.add(key)
+                out.append((key[0], float(confidence[i])))
+                if len(out) == n:
+                    return out
+
+            if k == size:
+                return out
+            # Duplicates used up candidates: widen the selection
+            want *= 2
+
+    def nbytes(self):
+        """
+        Bytes held by the used part of the columns (not the name table).
+        """
+        per_row = (
+            self.features.itemsize * len(MODEL_FEATURES)
+            + self.confidence.itemsize
+            + self.name_codes.itemsize
+            + self.source_codes.itemsize
+        )
+        return per_row * self.size
+
+
+def load_store(conn):
+    """
+    Build a store from the planets table, chunk by chunk.
+    """
+    ensure_scores(conn)
+
+    store = PlanetStore()
+
+    # One read transaction: the version and the rows are the same snapshot
+    conn.commit()
+    conn.execute("BEGIN")
+    try:
+        store.version = catalog_version(conn)
+        cur = conn.execute(
+            f"SELECT planet_name, source, confidence, {', '.join(MODEL_FEATURES)} FROM planets"
+        )
+        while True:
+            rows = cur.fetchmany(LOAD_CHUNK_ROWS)
+            if not rows:
+                break
+            names, sources, confidence, *features = zip(*rows)
+            X = np.array(features, dtype=np.float32).T
+            store.extend(names, sources, X, np.array(confidence, dtype=np.float32))
+    finally:
+        conn.commit()
+
+    store._name_index = None
+    return store
+
+
+def get_store(conn):
+    """
+    The process-wide store, (re)loaded when the catalog version moved on
+    without this process knowing.
+    """
+    global _store
+
+    version = catalog_version(conn)
+    if _store is not None and _store.version == version:
+        return _store
+
+    with _store_lock:
+        if _store is None or _store.version != catalog_version(conn):
+            _store = load_store(conn)
+    return _store
+
+
+def preload():
+    """
+    Load the store at startup (gunicorn master, before workers fork).
+    """
+    conn = get_db()
+    get_store(conn)
+    conn.close()
+
+
+def record_insert(conn, name, features, source, confidence):
+    """
+    Mirror a planets insert made on `conn`. Appends in place when the insert
+    is the only change since the store's version; otherwise leaves the
+    store to be reloaded on its next read.
+    """
+    store = _store
+    if store is None:
+        return
+
+    with _store_lock:
+        if catalog_version(conn) == store.version + 1:
+            store.append(name, features, source, confidence)
+            store.version += 1
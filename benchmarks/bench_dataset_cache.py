@@ -0,0 +1,109 @@
+"""
+Prepared-dataset cache (modules/src/training/cache.py): a cold run that
+parses and preprocesses against a warm run that opens the cached,
+memory-mapped matrices.
+
+The CSV is shaped like module4's merged_with_target.csv (numeric columns
+with gaps, st_spectype, the habitability label); prepare() is module4's:
+stratified split, median imputer + scaler and the spectral encoder fitted
+on the training split, every row transformed.
+
+Usage:
+    python benchmarks/bench_dataset_cache.py [ROWS]
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.compose import ColumnTransformer
+from sklearn.impute import SimpleImputer
+from sklearn.model_selection import train_test_split
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from modules.src.spectype import SpectypeEncoder  # noqa: E402
+from modules.src.training.arrays import read_rows  # noqa: E402
+from modules.src.training.cache import cached_dataset  # noqa: E402
+
+NUMERIC = 30
+SPECTYPES = ["G2 V", "K1.5 IV-V", "M3.5Ve", "F8/G0 V", "K0", "G8 IV", "M1 V", "A5", None]
+CONFIG = {"target": "habitability", "test_size": 0.25, "random_state": 42}
+
+
+def write_csv(path, n, rng):
+    df = pd.DataFrame(rng.normal(size=(n, NUMERIC)), columns=[f"f{i}" for i in range(NUMERIC)])
+    df = df.mask(rng.random(df.shape) < 0.1)
+    df["st_spectype"] = rng.choice(np.array(SPECTYPES, dtype=object), n)
+    df["habitability"] = (rng.random(n) < 0.05).astype(int)
+    df.to_csv(path, index=False)
+
+
+def prepare(data_path, config):
+    df = pd.read_csv(data_path)
+    X, y = df.drop(columns=[config["target"]]), df[config["target"]]
+    num = X.select_dtypes(include=["float64"]).columns.tolist()
+    preprocessor = ColumnTransformer([
+        ("num", Pipeline([("imputer", SimpleImputer(strategy="median")),
+                          ("scaler", StandardScaler())]), num),
+        ("cat", Pipeline([("imputer", SimpleImputer(strategy="most_frequent")),
+                          ("spectype", SpectypeEncoder())]), ["st_spectype"])
+    ], sparse_threshold=1.0)
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=config["test_size"], stratify=y, random_state=config["random_state"]
+    )
+    preprocessor.fit(X_train)
+    return {
+        "arrays": {"X_train": preprocessor.transform(X_train), "X_test": preprocessor.transform(X_test),
+                   "X_full": preprocessor.transform(X), "y_train": y_train.to_numpy(),
+                   "y_test": y_test.to_numpy()},
+        "preprocessor": preprocessor,
+        "frame": df
+    }
+
+
+def timed(func):
+    start = time.perf_counter()
+    out = func()
+    return out, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    rng = np.random.default_rng(0)
+    directory = tempfile.mkdtemp()
+    try:
+        data = os.path.join(directory, "merged_with_target.csv")
+        write_csv(data, n, rng)
+        cache_dir = os.path.join(directory, "cache")
+        print(f"🪐 {n:,d} rows × {NUMERIC + 2} columns, "
+              f"{os.path.getsize(data) / 2**20:.1f} MiB CSV\n")
+
+        _, t_prepare = timed(lambda: prepare(data, CONFIG))
+        (cold, hit_cold), t_cold = timed(lambda: cached_dataset(data, CONFIG, prepare, cache_dir))
+        (warm, hit_warm), t_warm = timed(lambda: cached_dataset(data, CONFIG, prepare, cache_dir))
+        assert not hit_cold and hit_warm
+        _, t_arrays = timed(lambda: {name: read_rows(a, 0, a.shape[0])
+                                     for name, a in warm["arrays"].items() if name != "X_full"})
+        (_, hit_changed), t_changed = timed(lambda: cached_dataset(
+            data, {**CONFIG, "test_size": 0.2}, prepare, cache_dir))
+        assert not hit_changed
+
+        same = all((read_rows(cold["arrays"][k], 0, cold["arrays"][k].shape[0])
+                    != read_rows(warm["arrays"][k], 0, warm["arrays"][k].shape[0])).sum() == 0
+                   for k in ("X_train", "X_test"))
+
+        print(f"{'parse + preprocess (no cache)':34s} {t_prepare:7.2f} s")
+        print(f"{'cold: prepare + write cache':34s} {t_cold:7.2f} s")
+        print(f"{'warm: hash + open (mmap)':34s} {t_warm:7.2f} s   {t_prepare / t_warm:5.1f}× faster")
+        print(f"{'   + train/test into memory':34s} {t_warm + t_arrays:7.2f} s")
+        print(f"{'config changed: new entry':34s} {t_changed:7.2f} s")
+        print(f"\n🔁 warm matrices identical to cold: {same}")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
@@ -0,0 +1,62 @@
+"""
+Latency overhead of ensemble serving (classifier + regressor) against the
+classifier-only path that /predict used before.
+
+Rows are the stored catalog features, tiled to the batch size. Each batch is
+scored three ways:
+    classifier only     predict_proba() on the sklearn wrapper
+    ensemble, naive     predict_proba() + predict() (two conversions)
+    ensemble, packed    models.predict_models(): one float32 pack, then
+                        inplace_predict on each booster
+
+Usage:
+    python benchmarks/bench_ensemble.py
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from config import MODEL_FEATURES  # noqa: E402
+from db import get_db  # noqa: E402
+from models import get_model, predict_models  # noqa: E402
+
+BATCH_SIZES = [1, 10, 100, 1000, 10000]
+
+
+def per_call(func, budget=0.5):
+    func()
+    calls = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < budget:
+        func()
+        calls += 1
+    return (time.perf_counter() - start) / calls
+
+
+if __name__ == "__main__":
+    conn = get_db()
+    base = np.array(
+        conn.execute(f"SELECT {', '.join(MODEL_FEATURES)} FROM planets").fetchall(),
+        dtype=float
+    )
+    conn.close()
+    base = base[~np.isnan(base).any(axis=1)]
+
+    cls = get_model("classifier")
+    reg = get_model("regressor")
+
+    print(f"{'rows':>7s} {'classifier':>12s} {'naive ens.':>12s} {'packed ens.':>12s} {'overhead':>9s}")
+    for n in BATCH_SIZES:
+        X = np.resize(base, (n, len(MODEL_FEATURES)))
+
+        only = per_call(lambda: cls.predict_proba(X)[:, 1])
+        naive = per_call(lambda: (cls.predict_proba(X)[:, 1], reg.predict(X)))
+        packed = per_call(lambda: predict_models(X))
+
+        print(f"{n:>7,d} {only * 1e3:9.3f} ms {naive * 1e3:9.3f} ms "
+              f"{packed * 1e3:9.3f} ms {packed / only - 1:+8.0%}")
@@ -0,0 +1,56 @@
+"""
+Memory and time-to-first-byte of the streamed /rank/export formats.
+
+Fills a throwaway SQLite file with N scored planets and drains each export
+generator, reporting bytes produced, time to the first chunk, total time
+and peak Python heap (tracemalloc) — which should not grow with N.
+
+Usage:
+    python benchmarks/bench_export.py [N_PLANETS]
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+os.environ["EXOPLANETS_DB"] = os.path.join(tempfile.mkdtemp(), "bench.db")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from db import get_db  # noqa: E402
+from export import STREAMS  # noqa: E402
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+
+    conn = get_db()
+    conn.executemany(
+        "INSERT INTO planets (planet_name, confidence) VALUES (?, ?)",
+        ((f"bench-{i}", (i * 7919 % 10_000) / 10_000) for i in range(n))
+    )
+    conn.commit()
+    conn.close()
+
+    print(f"📤 Export of {n:,d} ranked planets\n")
+    for fmt, stream in STREAMS.items():
+        tracemalloc.start()
+        start = time.perf_counter()
+        first = None
+        size = 0
+
+        for chunk in stream():
+            if first is None:
+                first = time.perf_counter() - start
+            size += len(chunk)
+
+        total = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        print(
+            f"   {fmt:7s} {size / 1e6:7.1f} MB   first chunk {first * 1e3:6.1f} ms   "
+            f"total {total:5.2f} s   peak heap {peak / 1024:6.0f} KB"
+        )
+
+    os.remove(os.environ["EXOPLANETS_DB"])
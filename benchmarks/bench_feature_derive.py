@@ -0,0 +1,64 @@
+"""
+Throughput of the vectorized feature derivation over the full catalog.
+
+Derives all physical features for modules/data/scrap/Exoplanet_dataset.csv,
+then for the catalog tiled up to ~1M rows, and compares against a per-row
+Python loop over derive_record (the request-time path).
+
+Usage:
+    python benchmarks/bench_feature_derive.py [TARGET_ROWS]
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT_DIR)
+
+from modules.src.feature_derive import (  # noqa: E402
+    CATALOG_COLUMNS,
+    JUPITER_DENSITY,
+    derive_features,
+    derive_record
+)
+
+CATALOG = os.path.join(ROOT_DIR, "modules", "data", "scrap", "Exoplanet_dataset.csv")
+
+
+def best_of(func, repeat=5):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+if __name__ == "__main__":
+    target_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+    catalog = pd.read_csv(CATALOG)
+    inputs = [c for c in CATALOG_COLUMNS.values() if c in catalog.columns]
+    catalog = catalog[inputs]
+
+    tiled = pd.concat([catalog] * max(1, target_rows // len(catalog)), ignore_index=True)
+    arrays = {c: tiled[c].to_numpy(dtype=float) for c in inputs}
+
+    print("⚙️  Vectorized derivation (derive_features)")
+    runs = (
+        ("catalog", catalog, len(catalog)),
+        (f"tiled ×{len(tiled) // len(catalog)}", arrays, len(tiled))
+    )
+    for label, data, n in runs:
+        t = best_of(lambda: derive_features(data, CATALOG_COLUMNS, reference_density=JUPITER_DENSITY))
+        print(f"   {label:12s} {n:>9,d} rows  {t * 1e3:8.2f} ms  {n / t / 1e6:6.1f} M rows/s")
+
+    records = catalog.head(2000).to_dict("records")
+    records = [{k: v for k, v in r.items() if not np.isnan(v)} for r in records]
+    t = best_of(lambda: [derive_record(r, CATALOG_COLUMNS) for r in records], repeat=3)
+    print("\n🐢 Per-record path (derive_record)")
+    print(f"   {len(records):>9,d} rows  {t * 1e3:8.2f} ms  {t / len(records) * 1e6:6.1f} µs/record")
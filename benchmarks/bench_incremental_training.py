@@ -0,0 +1,147 @@
+"""
+Out-of-core training (modules/src/training/incremental.py) against the
+in-memory fits: peak memory and test-metric parity.
+
+A module3-shaped dataset is generated (15 standardized numeric columns plus
+sparse spectral class / subclass indicators, ~1% positives with a
+non-linear boundary) and saved with save_matrix() as memory-mapped CSR
+parts. Every training mode then runs in a fresh interpreter so its peak
+anonymous RSS is its own (RssAnon sampled while fitting, above the value
+after imports; pages of the memory-mapped files are clean page cache the
+kernel can drop, so they are not counted):
+
+    logistic in memory    LogisticRegression(liblinear) on the loaded matrix
+    logistic incremental  SGDClassifier.partial_fit over mmap blocks
+    xgboost in memory     xgb.train on the loaded matrix
+    xgboost external      ExtMemQuantileDMatrix over mmap blocks
+
+Usage:
+    python benchmarks/bench_incremental_training.py [ROWS] [BLOCK_ROWS]
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+from scipy import sparse
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+from modules.src.training.arrays import save_matrix  # noqa: E402
+
+ROUNDS = 50
+NUMERIC = 15
+SUBCLASSES = 70
+
+MODE = """
+import json, sys, threading, time
+import numpy as np
+sys.path.insert(0, {root!r})
+from modules.src.training.arrays import open_matrix, read_rows
+from modules.src.training.incremental import (
+    C, CLASS_WEIGHT, fit_incremental, predict_blocks, train_booster_external
+)
+from modules.src.training.model import scores, train_booster
+
+mode, directory, block_rows, rounds = sys.argv[1], sys.argv[2], int(sys.argv[3]), int(sys.argv[4])
+X = open_matrix(directory + "/X_train.npy")
+y = np.load(directory + "/y_train.npy", mmap_mode="r")
+
+def rss():
+    # Anonymous memory only: mapped file pages are clean and reclaimable
+    with open("/proc/self/status") as f:
+        return next(int(line.split()[1]) * 1024 for line in f if line.startswith("RssAnon"))
+
+before, peak, done = rss(), [0], threading.Event()
+
+def sample():
+    while not done.is_set():
+        peak[0] = max(peak[0], rss())
+        time.sleep(0.005)
+
+sampler = threading.Thread(target=sample)
+sampler.start()
+
+start = time.perf_counter()
+if mode == "logistic in memory":
+    from sklearn.linear_model import LogisticRegression
+    model = LogisticRegression(C=C, max_iter=1000, class_weight=CLASS_WEIGHT,
+                               solver="liblinear").fit(read_rows(X, 0, X.shape[0]), np.asarray(y))
+elif mode == "logistic incremental":
+    model = fit_incremental(X, y, block_rows=block_rows)
+elif mode == "xgboost in memory":
+    model, _ = train_booster(read_rows(X, 0, X.shape[0]), np.asarray(y), None, rounds)
+else:
+    model = train_booster_external(X, y, None, rounds, block_rows=block_rows)
+elapsed = time.perf_counter() - start
+done.set()
+sampler.join()
+X_test = open_matrix(directory + "/X_test.npy")
+y_test = np.load(directory + "/y_test.npy")
+print(json.dumps({{"seconds": elapsed, "baseline_mib": before / 2**20, "peak_mib": peak[0] / 2**20,
+                   "metrics": scores(y_test, predict_blocks(model, X_test, block_rows))}}))
+"""
+
+MODES = ["logistic in memory", "logistic incremental", "xgboost in memory", "xgboost external"]
+
+
+def module3_like(n, rng):
+    numeric = rng.normal(size=(n, NUMERIC)).astype(np.float64)
+    subclass = rng.integers(0, SUBCLASSES, n)
+    indicators = sparse.csr_matrix(
+        (np.ones(2 * n), (np.r_[np.arange(n), np.arange(n)], np.r_[subclass // 10, 7 + subclass])),
+        shape=(n, 7 + SUBCLASSES)
+    )
+    signal = (numeric[:, 0] - 0.7 * numeric[:, 1] + 0.3 * numeric[:, 2] ** 2
+              + 0.5 * numeric[:, 3] * numeric[:, 4] + 0.5 * (subclass // 10 == 4)
+              + rng.normal(scale=0.5, size=n))
+    y = (signal > np.quantile(signal, 0.99)).astype(np.int8)
+    X = sparse.hstack([sparse.csr_matrix(numeric), indicators]).tocsr()
+    return X, y
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    block_rows = int(sys.argv[2]) if len(sys.argv) > 2 else 50_000
+    rng = np.random.default_rng(0)
+
+    with tempfile.TemporaryDirectory() as directory:
+        X, y = module3_like(n, rng)
+        split = int(n * 0.8)
+        save_matrix(X[:split], os.path.join(directory, "X_train.npy"))
+        save_matrix(X[split:], os.path.join(directory, "X_test.npy"))
+        np.save(os.path.join(directory, "y_train.npy"), y[:split])
+        np.save(os.path.join(directory, "y_test.npy"), y[split:])
+        on_disk = X[:split].data.nbytes + X[:split].indices.nbytes + X[:split].indptr.nbytes
+        del X
+
+        print(f"🪐 {split:,d} training rows, {NUMERIC + 7 + SUBCLASSES} columns, "
+              f"{on_disk / 2**20:.0f} MiB CSR on disk, blocks of {block_rows:,d}, "
+              f"xgboost {ROUNDS} rounds\n")
+        print(f"{'mode':22s} {'fit':>8s} {'peak RSS':>11s} "
+              f"{'accuracy':>9s} {'f1':>7s} {'roc_auc':>8s}")
+
+        results = {}
+        for mode in MODES:
+            start = time.perf_counter()
+            out = subprocess.run(
+                [sys.executable, "-c", MODE.format(root=ROOT), mode, directory,
+                 str(block_rows), str(ROUNDS)],
+                check=True, capture_output=True, text=True
+            ).stdout
+            r = results[mode] = json.loads(out.strip().splitlines()[-1])
+            m = r["metrics"]
+            print(f"{mode:22s} {r['seconds']:6.1f} s {r['peak_mib'] - r['baseline_mib']:7.0f} MiB "
+                  f"{m['accuracy']:9.4f} {m['f1']:7.4f} {m['roc_auc']:8.4f}")
+
+    print("\n📊 parity (incremental - in memory)")
+    for family, (a, b) in {"logistic": MODES[:2], "xgboost": MODES[2:]}.items():
+        print(f"   {family:9s} " + "  ".join(
+            f"{k} {results[b]['metrics'][k] - results[a]['metrics'][k]:+.4f}"
+            for k in ("accuracy", "f1", "roc_auc")
+        ))
@@ -0,0 +1,180 @@
+"""
+Local load test of admission control (backend/admission.py): /predict
+latency while /rank is saturated, with the gates off and on.
+
+A gunicorn server (threaded workers, backend/gunicorn.conf.py) is started
+against a throwaway database filled with ROWS synthetic planets, so every
+/rank rescoring is O(catalog); the response cache is off and each /rank
+asks for a different top-N. RANK_CLIENTS threads then call /rank back to
+back (waiting Retry-After when shed) while PREDICT_CLIENTS threads call
+/predict, for SECONDS. Reported:
+/predict p50 / p99 / max, /rank completions and 503s (with Retry-After).
+
+Usage:
+    python benchmarks/bench_load_shedding.py [ROWS] [SECONDS]
+"""
+
+import http.client
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend")
+
+RANK_CLIENTS = 16
+PREDICT_CLIENTS = 4
+
+PAYLOAD = json.dumps({
+    "planet_name": "Bench-Load-1",
+    "st_teff": 5778, "st_rad": 1.0, "st_mass": 1.0, "st_met": 0.0,
+    "pl_orbper": 365.25, "pl_orbeccen": 0.017,
+    "pl_rade": 1.0, "pl_bmasse": 1.0, "st_spectype": "G2 V"
+})
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def fill_db(path, n):
+    # Synthetic scored planets (distributions as in bench_planets_query.py),
+    # written in a separate process so this one never imports the backend
+    code = f"""
+import os, sys
+import numpy as np
+os.environ["EXOPLANETS_DB"] = {path!r}
+sys.path.insert(0, {BACKEND_DIR!r})
+from config import MODEL_FEATURES
+from db import get_db
+
+rng = np.random.default_rng(0)
+X = np.column_stack([
+    rng.normal(5500, 1200, {n}), rng.lognormal(0, 0.5, {n}), rng.lognormal(0, 0.3, {n}),
+    rng.normal(0, 0.2, {n}), rng.lognormal(0, 1, {n}), rng.lognormal(3, 1.5, {n}),
+    rng.random({n}) * 0.5, rng.lognormal(2, 2, {n})
+])
+cols = ["planet_name", *MODEL_FEATURES, "source", "confidence"]
+conn = get_db()
+conn.executemany(
+    f"INSERT INTO planets ({{', '.join(cols)}}) VALUES ({{', '.join('?' * len(cols))}})",
+    ((f"bench-{{i}}", *X[i].tolist(), "bench", float(p)) for i, p in enumerate(rng.random({n})))
+)
+conn.commit()
+print(conn.execute("SELECT COUNT(*) FROM planets").fetchone()[0])
+"""
+    out = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True)
+    return int(out.stdout.split()[-1])
+
+
+def request(port, method, path, body=None, timeout=60):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=timeout)
+    start = time.perf_counter()
+    conn.request(method, path, body=body, headers={"Content-Type": "application/json"})
+    resp = conn.getresponse()
+    resp.read()
+    conn.close()
+    return resp.status, resp.getheader("Retry-After"), time.perf_counter() - start
+
+
+def start_server(db, port, admission):
+    env = {**os.environ, "EXOPLANETS_DB": db, "PORT": str(port), "WEB_CONCURRENCY": "1",
+           "RESPONSE_CACHE_TTL": "0", "ADMISSION_CONTROL": "1" if admission else "0"}
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app:app"],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    for _ in range(200):
+        try:
+            request(port, "GET", "/health", timeout=1)
+            return proc
+        except OSError:
+            time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError("server did not start")
+
+
+def load(port, seconds):
+    stop = time.monotonic() + seconds
+    predict, rank = [], {"ok": 0, "shed": 0, "retry_after": set(), "ms": []}
+    lock = threading.Lock()
+
+    def rank_client(i):
+        top = 10 + i
+        while time.monotonic() < stop:
+            top += RANK_CLIENTS
+            status, retry, elapsed = request(port, "GET", f"/rank?top={top % 500 + 1}")
+            with lock:
+                if status == 503:
+                    rank["shed"] += 1
+                    rank["retry_after"].add(retry)
+                else:
+                    rank["ok"] += 1
+                    rank["ms"].append(elapsed * 1e3)
+            if status == 503:
+                # Clients honour Retry-After (the dashboards poll, they do
+                # not hammer)
+                time.sleep(float(retry))
+
+    def predict_client():
+        while time.monotonic() < stop:
+            status, _, elapsed = request(port, "POST", "/predict", PAYLOAD)
+            with lock:
+                predict.append((status, elapsed * 1e3))
+
+    threads = [threading.Thread(target=rank_client, args=(i,)) for i in range(RANK_CLIENTS)]
+    threads += [threading.Thread(target=predict_client) for _ in range(PREDICT_CLIENTS)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    return predict, rank
+
+
+def report(label, predict, rank):
+    ms = np.array([t for s, t in predict if s == 200])
+    errors = sum(1 for s, _ in predict if s != 200)
+    print(f"{label:16s} {len(ms):7d} {np.percentile(ms, 50):8.1f} {np.percentile(ms, 99):8.1f} "
+          f"{ms.max():8.1f} {errors:6d}   {rank['ok']:6d} {rank['shed']:6d} "
+          f"{np.percentile(rank['ms'], 50) if rank['ms'] else 0:8.0f}  "
+          f"{','.join(sorted(r for r in rank['retry_after'] if r)) or '-'}")
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 20
+    db = os.path.join(tempfile.mkdtemp(), "bench.db")
+    rows = fill_db(db, rows)
+
+    print(f"⚙️  {rows:,d} planets, {RANK_CLIENTS} /rank + {PREDICT_CLIENTS} /predict clients, "
+          f"{seconds:.0f} s per run, 1 gunicorn worker\n")
+    print(f"{'':16s} {'/predict':>7s} {'p50 ms':>8s} {'p99 ms':>8s} {'max ms':>8s} {'errors':>6s}   "
+          f"{'/rank':>6s} {'503':>6s} {'p50 ms':>8s}  Retry-After")
+
+    for label, admission in (("no admission", False), ("admission", True)):
+        port = free_port()
+        proc = start_server(db, port, admission)
+        try:
+            request(port, "POST", "/predict", PAYLOAD)
+            request(port, "GET", "/rank?top=5")
+            predict, rank = load(port, seconds)
+            report(label, predict, rank)
+            if admission:
+                print("\n📊 /admission after the run:")
+                conn = http.client.HTTPConnection("127.0.0.1", port)
+                conn.request("GET", "/admission")
+                for name, stats in json.loads(conn.getresponse().read())["data"].items():
+                    print(f"   {name:10s} {stats}")
+        finally:
+            proc.send_signal(signal.SIGTERM)
+            proc.wait()
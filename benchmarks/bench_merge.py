@@ -0,0 +1,109 @@
+"""
+Peak memory and time of the streaming merge (modules/src/merge.py) against
+the load-concat-sample version it replaced, on synthetic catalogs.
+
+Each merge runs in its own subprocess and reports its peak RSS, so the
+numbers are not polluted by the other run. Catalog size is doubled between
+runs: the legacy peak grows with the input while the streaming peak stays
+at one chunk / one bucket, which is what lets it merge catalogs larger
+than RAM. Both outputs must hold the same rows.
+
+Usage:
+    python benchmarks/bench_merge.py [ROWS ...]
+"""
+
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+from modules.src.merge import merge_exoplanet_datasets  # noqa: E402
+
+COLUMNS = [
+    "pl_name", "hostname", "pl_orbper", "pl_rade", "pl_bmasse", "pl_orbeccen",
+    "pl_insol", "pl_eqt", "st_teff", "st_mass", "st_rad", "st_met",
+    "sy_dist", "ra", "dec", "disc_year"
+]
+
+
+def legacy_merge(habitable_path, non_habitable_path, output_path):
+    df_hab = pd.read_csv(habitable_path)
+    df_non = pd.read_csv(non_habitable_path)
+    df_hab["Habitable"] = 1
+    df_non["Habitable"] = 0
+    df_combined = pd.concat([df_hab, df_non], ignore_index=True)
+    df_combined = df_combined.sample(frac=1, random_state=42).reset_index(drop=True)
+    df_combined.to_csv(output_path, index=False)
+
+
+def write_catalog(path, n, rng):
+    chunk = 200_000
+    for start in range(0, n, chunk):
+        m = min(chunk, n - start)
+        df = pd.DataFrame(rng.uniform(0, 1000, (m, len(COLUMNS))).round(4), columns=COLUMNS)
+        df["pl_name"] = [f"P-{start + i}" for i in range(m)]
+        df["hostname"] = [f"H-{(start + i) // 3}" for i in range(m)]
+        df.to_csv(path, mode="w" if start == 0 else "a", header=start == 0, index=False)
+
+
+def run(which, hab, non, out):
+    start = time.perf_counter()
+    if which == "legacy":
+        legacy_merge(hab, non, out)
+    else:
+        import contextlib
+        import io
+        with contextlib.redirect_stdout(io.StringIO()):
+            merge_exoplanet_datasets(hab, non, out, chunk_rows=50_000, memory_limit=64 << 20)
+    elapsed = time.perf_counter() - start
+    # ru_maxrss is in KiB on Linux
+    print(elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+
+
+def measure(which, hab, non, out):
+    result = subprocess.run(
+        [sys.executable, __file__, "--run", which, hab, non, out],
+        capture_output=True, text=True, check=True
+    )
+    elapsed, rss = result.stdout.split()
+    return float(elapsed), int(rss) / 1024
+
+
+def same_rows(a, b):
+    key = ["pl_name", "Habitable"]
+    left = pd.read_csv(a, usecols=key).sort_values(key).to_numpy()
+    right = pd.read_csv(b, usecols=key).sort_values(key).to_numpy()
+    return np.array_equal(left, right)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--run":
+        run(*sys.argv[2:6])
+        sys.exit(0)
+
+    sizes = [int(a) for a in sys.argv[1:]] or [250_000, 500_000, 1_000_000]
+    rng = np.random.default_rng(0)
+
+    print(f"{'rows':>10s} {'CSV MiB':>8s} {'legacy':>16s} {'streaming':>16s}")
+    with tempfile.TemporaryDirectory() as tmp:
+        hab, non = os.path.join(tmp, "hab.csv"), os.path.join(tmp, "non.csv")
+        for n in sizes:
+            write_catalog(hab, n // 10, rng)
+            write_catalog(non, n - n // 10, rng)
+            mib = (os.path.getsize(hab) + os.path.getsize(non)) / 2**20
+
+            old_out, new_out = os.path.join(tmp, "old.csv"), os.path.join(tmp, "new.csv")
+            t_old, rss_old = measure("legacy", hab, non, old_out)
+            t_new, rss_new = measure("streaming", hab, non, new_out)
+            assert same_rows(old_out, new_out)
+
+            print(f"{n:10,d} {mib:8.1f} {t_old:6.1f} s {rss_old:5.0f} MiB "
+                  f"{t_new:6.1f} s {rss_new:5.0f} MiB")
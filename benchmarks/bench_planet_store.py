@@ -0,0 +1,115 @@
+"""
+Array-backed planet store (backend/store.py) at catalog scale: memory per
+planet and /rank latency against the DataFrame path it replaces.
+
+A synthetic catalog of ROWS planets with unique names is loaded into the
+store through its own extend() (the path load_store() uses) while
+tracemalloc counts every byte allocated, name table included. The run
+fails if the cost per planet exceeds the budget documented in store.py.
+
+Usage:
+    python benchmarks/bench_planet_store.py [ROWS]
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from config import MODEL_FEATURES, SCORE_OFFSET  # noqa: E402
+from store import PlanetStore  # noqa: E402
+
+# Documented in backend/store.py: columns (41 bytes) + name (str + list
+# slot), with capacity-doubling slack on the columns
+BYTES_PER_PLANET_BUDGET = 150
+
+
+def best_of(func, repeat=5):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def names_and_sources(n, rng):
+    names = [f"KOI-{i:07d} b" for i in range(n)]
+    sources = rng.choice(["dataset", "prediction", "user"], n).tolist()
+    return names, sources
+
+
+def load(names, sources, X, confidence, chunk=10000):
+    store = PlanetStore()
+    for start in range(0, len(names), chunk):
+        end = start + chunk
+        store.extend(names[start:end], sources[start:end], X[start:end], confidence[start:end])
+    store._name_index = None  # as load_store()
+    return store
+
+
+def rank_dataframe(df, top_n):
+    # backend/app.py rank() minus the model call
+    ranked = (
+        df[["planet_name", "habitability", "habitability_score", "confidence"]]
+        .drop_duplicates()
+        .sort_values("habitability_score", ascending=False)
+        .head(top_n)
+        .reset_index(drop=True)
+    )
+    return ranked.to_dict("records"), int(df["habitability"].sum()), float(df["habitability_score"].mean())
+
+
+def rank_store(store, top_n):
+    return store.top(top_n), store.stats()
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    rng = np.random.default_rng(0)
+    X = rng.uniform(0, 1000, (n, len(MODEL_FEATURES))).astype(np.float32)
+    confidence = rng.random(n).astype(np.float32)
+
+    # Name strings are created under tracemalloc (as when read from SQLite)
+    # and only what the store keeps alive is left at the end
+    tracemalloc.start()
+    names, sources = names_and_sources(n, rng)
+    start = time.perf_counter()
+    store = load(names, sources, X, confidence)
+    load_s = time.perf_counter() - start
+    del names, sources
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    per_planet = held / n
+    print(f"🪐 {n:,d} planets")
+    print(f"   columns          {store.nbytes() / n:6.1f} bytes/planet")
+    print(f"   total (traced)   {per_planet:6.1f} bytes/planet   {held / 2**20:7.1f} MiB")
+    print(f"   load             {load_s:6.2f} s")
+    assert per_planet <= BYTES_PER_PLANET_BUDGET, f"{per_planet:.0f} > {BYTES_PER_PLANET_BUDGET} bytes/planet"
+
+    df = pd.DataFrame(X, columns=MODEL_FEATURES)
+    df.insert(0, "planet_name", store.names)
+    df["confidence"] = confidence.astype(float)
+    df["habitability_score"] = df["confidence"] - SCORE_OFFSET
+    df["habitability"] = (df["confidence"] >= 0.5).astype(int)
+    df_bytes = df.memory_usage(deep=True).sum()
+    print(f"   DataFrame        {df_bytes / n:6.1f} bytes/planet   {df_bytes / 2**20:7.1f} MiB")
+
+    top = [name for name, _ in store.top(10)]
+    assert top == [r["planet_name"] for r in rank_dataframe(df, 10)[0]]
+
+    print(f"\n{'top':>6s} {'DataFrame':>11s} {'store':>9s} {'speedup':>8s}")
+    for top_n in (10, 100, 1000):
+        t_df = best_of(lambda: rank_dataframe(df, top_n), repeat=3)
+        t_store = best_of(lambda: rank_store(store, top_n))
+        print(f"{top_n:6d} {t_df * 1e3:8.1f} ms {t_store * 1e3:6.1f} ms {t_df / t_store:7.1f}×")
+
+    t = best_of(lambda: store.append(
+        "new", dict(zip(MODEL_FEATURES, range(8))), "user", 0.5), repeat=1000)
+    print(f"\n➕ append: {t * 1e6:.1f} µs")
@@ -0,0 +1,100 @@
+"""
+/planets query latency as the catalog grows.
+
+Fills a throwaway SQLite file with N synthetic scored planets at several
+sizes and times typical filtered, sorted pages (first page and a deep
+cursor page), printing the query plan so covering-index use is visible.
+
+Usage:
+    python benchmarks/bench_planets_query.py [MAX_ROWS]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+os.environ["EXOPLANETS_DB"] = os.path.join(tempfile.mkdtemp(), "bench.db")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from config import MODEL_FEATURES  # noqa: E402
+from db import get_db, query_planets  # noqa: E402
+
+QUERIES = {
+    "top by score": dict(),
+    "habitable, teff band": dict(habitable=True, teff_min=4500, teff_max=6500),
+    "insol band by insol": dict(insol_min=0.25, insol_max=2.0, sort="pl_insol", order="asc"),
+    "score range": dict(min_score=0.3, max_score=0.6)
+}
+
+
+def fill(conn, n_total, rng, batch=100_000):
+    have = conn.execute("SELECT COUNT(*) FROM planets").fetchone()[0]
+    cols = ["planet_name", *MODEL_FEATURES, "source", "confidence"]
+    sql = f"INSERT INTO planets ({', '.join(cols)}) VALUES ({', '.join('?' * len(cols))})"
+
+    while have < n_total:
+        n = min(batch, n_total - have)
+        X = np.column_stack([
+            rng.normal(5500, 1200, n),      # st_teff
+            rng.lognormal(0, 0.5, n),       # st_rad
+            rng.lognormal(0, 0.3, n),       # st_mass
+            rng.normal(0, 0.2, n),          # st_met
+            rng.lognormal(0, 1, n),         # st_luminosity
+            rng.lognormal(3, 1.5, n),       # pl_orbper
+            rng.random(n) * 0.5,            # pl_orbeccen
+            rng.lognormal(2, 2, n)          # pl_insol
+        ])
+        proba = rng.random(n)
+        conn.executemany(sql, (
+            (f"bench-{have + i}", *X[i].tolist(), "bench", float(proba[i])) for i in range(n)
+        ))
+        conn.commit()
+        have += n
+
+
+def time_query(conn, kwargs, repeat=20):
+    best_first = best_deep = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows, cursor = query_planets(conn, limit=50, **kwargs)
+        best_first = min(best_first, time.perf_counter() - start)
+
+    # Walk 20 pages, time the 20th
+    for _ in range(19):
+        rows, cursor = query_planets(conn, limit=50, cursor=cursor, **kwargs)
+    for _ in range(repeat):
+        start = time.perf_counter()
+        query_planets(conn, limit=50, cursor=cursor, **kwargs)
+        best_deep = min(best_deep, time.perf_counter() - start)
+
+    return best_first * 1e3, best_deep * 1e3
+
+
+if __name__ == "__main__":
+    max_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    rng = np.random.default_rng(0)
+    conn = get_db()
+
+    sizes = [n for n in (10_000, 100_000, 1_000_000, 10_000_000) if n <= max_rows]
+    for n in sizes:
+        fill(conn, n, rng)
+        conn.execute("ANALYZE")
+        print(f"\n📚 {n:,d} planets (first page / page 20, ms)")
+        for label, kwargs in QUERIES.items():
+            first, deep = time_query(conn, kwargs)
+            print(f"   {label:22s} {first:7.2f} / {deep:7.2f}")
+
+    print("\n🧭 Query plans")
+    for label, kwargs in QUERIES.items():
+        captured = []
+        conn.set_trace_callback(captured.append)
+        query_planets(conn, limit=50, **kwargs)
+        conn.set_trace_callback(None)
+        plan = conn.execute("EXPLAIN QUERY PLAN " + captured[-1]).fetchall()
+        print(f"   {label:22s} {' | '.join(r[-1] for r in plan)}")
+
+    conn.close()
+    os.remove(os.environ["EXOPLANETS_DB"])
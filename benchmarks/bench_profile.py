@@ -0,0 +1,112 @@
+"""
+Chunked data-quality profile (modules/src/check.py) against the exact
+whole-frame pandas equivalent (isna().sum(), min/max/mean, quantile(),
+nunique()) on a synthetic catalog.
+
+Each run is a subprocess reporting its wall time and peak RSS (of the
+main process; pool workers hold one chunk each). Quantile
+error is reported as normalized rank error against the exact values,
+distinct-count error as a relative error.
+
+Usage:
+    python benchmarks/bench_profile.py [ROWS] [WORKERS]
+"""
+
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+from modules.src.check import QUANTILES, profile  # noqa: E402
+
+
+def write_catalog(path, n, rng):
+    chunk = 200_000
+    for start in range(0, n, chunk):
+        m = min(chunk, n - start)
+        df = pd.DataFrame({
+            f"num_{i}": rng.lognormal(i % 3, 1.5, m).round(4) for i in range(12)
+        })
+        for name in list(df.columns)[::3]:
+            df.loc[rng.random(m) < 0.3, name] = np.nan
+        df["method"] = rng.choice(["RV", "transit", "imaging", "timing"], m)
+        df["host"] = [f"H-{rng.integers(n // 4)}" for _ in range(m)]
+        df.to_csv(path, mode="w" if start == 0 else "a", header=start == 0, index=False)
+
+
+def exact(path):
+    df = pd.read_csv(path, low_memory=False)
+    numeric = df.select_dtypes("number")
+    return {
+        "nulls": df.isna().sum().to_dict(),
+        "min": numeric.min().to_dict(),
+        "max": numeric.max().to_dict(),
+        "mean": numeric.mean().to_dict(),
+        "quantiles": numeric.quantile(list(QUANTILES)).to_dict(),
+        "distinct": df.nunique().to_dict()
+    }
+
+
+def run(which, path, workers):
+    start = time.perf_counter()
+    result = exact(path) if which == "exact" else profile(path, workers=int(workers))
+    elapsed = time.perf_counter() - start
+    print(json.dumps({
+        "seconds": elapsed,
+        "rss_mib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "result": result
+    }, default=float))
+
+
+def measure(which, path, workers=1):
+    out = subprocess.run(
+        [sys.executable, __file__, "--run", which, path, str(workers)],
+        capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(out)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--run":
+        run(*sys.argv[2:5])
+        sys.exit(0)
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count() or 1
+    rng = np.random.default_rng(0)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "catalog.csv")
+        write_catalog(path, n, rng)
+        print(f"⚙️  {n:,d} rows, {os.path.getsize(path) / 2**20:.1f} MiB, {os.cpu_count()} CPU(s)\n")
+
+        ref = measure("exact", path)
+        runs = [("pandas exact", ref)] + [
+            (f"profile, {w} worker(s)", measure("profile", path, w)) for w in sorted({1, workers})
+        ]
+        for name, r in runs:
+            print(f"{name:24s} {r['seconds']:6.2f} s {r['rss_mib']:6.0f} MiB")
+
+        report = runs[-1][1]["result"]["columns"]
+        rank_err = dist_err = 0.0
+        data = pd.read_csv(path, low_memory=False)
+        for name, column in report.items():
+            assert column["nulls"] == ref["result"]["nulls"][name]
+            dist_err = max(dist_err, abs(column["distinct"] / ref["result"]["distinct"][name] - 1))
+            if column["kind"] != "numeric":
+                continue
+            values = np.sort(data[name].dropna().to_numpy())
+            for q in QUANTILES:
+                est = column["quantiles"][f"p{round(q * 100):02d}"]
+                rank_err = max(rank_err, abs(np.searchsorted(values, est) / len(values) - q))
+
+        print(f"\n📊 max quantile rank error {rank_err:.4f}, max distinct error {dist_err:.4f}")
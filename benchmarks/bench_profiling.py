@@ -0,0 +1,88 @@
+"""
+Cost of the per-request profiling hook (backend/profiling.py) on /predict.
+
+The handler is called inside a request context (no routing or test-client
+overhead, so the hook's own cost is not hidden) in three ways, interleaved
+in rounds so machine noise hits them alike:
+
+    bare        the undecorated handler: what @profiled returns when
+                PROFILE_TOKEN is unset and PROFILE_SAMPLE_RATE is 0
+    armed       the wrapper with a token configured, request not opting in
+    profiled    the wrapper with the X-Profile token: cProfile + summary
+
+Runs against a temporary copy of the database (the planet already exists
+after the warm-up, so no request inserts).
+
+Usage:
+    python benchmarks/bench_profiling.py [REQUESTS]
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend")
+sys.path.insert(0, BACKEND_DIR)
+
+TMP_DB = os.path.join(tempfile.mkdtemp(), "exoplanets.db")
+shutil.copy(os.path.join(BACKEND_DIR, "database", "exoplanets.db"), TMP_DB)
+os.environ["EXOPLANETS_DB"] = TMP_DB
+os.environ["PROFILE_TOKEN"] = "bench-token"
+os.environ["PROFILE_SAMPLE_RATE"] = "0"
+
+import app as backend_app  # noqa: E402
+import profiling  # noqa: E402
+
+PAYLOAD = {
+    "planet_name": "Bench-Profile-1",
+    "st_teff": 5778, "st_rad": 1.0, "st_mass": 1.0, "st_met": 0.0,
+    "pl_orbper": 365.25, "pl_orbeccen": 0.017,
+    "pl_rade": 1.0, "pl_bmasse": 1.0, "st_spectype": "G2 V"
+}
+
+
+def timed(view, headers, n):
+    times = []
+    for _ in range(n):
+        with backend_app.app.test_request_context("/predict", method="POST", json=PAYLOAD,
+                                                  headers=headers):
+            start = time.perf_counter()
+            view()
+            times.append(time.perf_counter() - start)
+    return times
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    wrapped = backend_app.predict
+    modes = {
+        "bare": (wrapped.__wrapped__, {}),
+        "armed": (wrapped, {}),
+        "profiled": (wrapped, {"X-Profile": "bench-token"})
+    }
+
+    for view, headers in modes.values():
+        timed(view, headers, 50)
+
+    results = {name: [] for name in modes}
+    rounds = 10
+    for _ in range(rounds):
+        for name, (view, headers) in modes.items():
+            results[name] += timed(view, headers, n // rounds)
+
+    print(f"⚙️  /predict handler, {n} calls per mode\n")
+    print(f"{'mode':10s} {'p50':>9s} {'p99':>9s} {'mean':>9s}")
+    base = np.mean(results["bare"])
+    for name, times in results.items():
+        t = np.array(times) * 1e3
+        print(f"{name:10s} {np.percentile(t, 50):6.3f} ms {np.percentile(t, 99):6.3f} ms "
+              f"{t.mean():6.3f} ms  ({np.mean(times) / base - 1:+.1%})")
+
+    entry = profiling._profiles[-1]
+    print(f"\n📋 last summary: {entry['total_ms']} ms, top of hot path:")
+    for row in entry["hot_path"][:5]:
+        print(f"   {row['cumulative_ms']:8.3f} ms  {row['function']}")
@@ -0,0 +1,94 @@
+"""
+Accuracy of the KLL quantile sketch (modules/src/sketch.py) against exact
+quantiles, at the error bounds module2 / module3 can be configured with.
+
+For every distribution, size and error bound the values are split into
+chunks, sketched per chunk and merged (as across worker processes), then
+compared with the exact order statistics over a 1%..99% grid plus the IQR
+quartiles. The error is the normalized rank error: the distance between q
+and the rank interval of the returned value, so ties are not penalized.
+The run fails if any error exceeds the configured bound.
+
+Usage:
+    python benchmarks/bench_quantile_sketch.py [ROWS] [WORKERS]
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from modules.src.sketch import QuantileSketch, sketch_columns  # noqa: E402
+
+ERRORS = (0.01, 0.005, 0.001, 0.0005)
+QS = np.r_[np.linspace(0.01, 0.99, 99), 0.25, 0.75]
+CHUNKS = 16
+
+
+def distributions(n, rng):
+    return {
+        "uniform": rng.uniform(0, 1, n),
+        "lognormal": rng.lognormal(0, 2, n),
+        "few distinct": rng.integers(0, 50, n).astype(float),
+        "sorted": np.sort(rng.normal(size=n))
+    }
+
+
+def rank_error(sorted_values, estimates, qs):
+    lo = np.searchsorted(sorted_values, estimates, side="left") / len(sorted_values)
+    hi = np.searchsorted(sorted_values, estimates, side="right") / len(sorted_values)
+    return float(np.maximum(0, np.maximum(lo - qs, qs - hi)).max())
+
+
+def merged_sketch(values, error, seed):
+    sketch = QuantileSketch(error=error)
+    for i, chunk in enumerate(np.array_split(values, CHUNKS)):
+        sketch.merge(QuantileSketch(error=error, seed=seed + i).update(chunk))
+    return sketch
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else 2
+    rng = np.random.default_rng(0)
+
+    print(f"⚙️  {n:,d} values in {CHUNKS} merged chunks\n")
+    print(f"{'distribution':14s} {'error':>7s} {'k':>6s} {'kept':>7s} {'rank err':>9s} "
+          f"{'sketch':>9s} {'exact':>9s}")
+
+    worst = 0.0
+    for name, values in distributions(n, rng).items():
+        start = time.perf_counter()
+        exact = np.quantile(values, QS)
+        t_exact = time.perf_counter() - start
+        sorted_values = np.sort(values)
+
+        for error in ERRORS:
+            start = time.perf_counter()
+            sketch = merged_sketch(values, error, seed=7)
+            estimates = sketch.quantile(QS)
+            t_sketch = time.perf_counter() - start
+
+            err = rank_error(sorted_values, estimates, QS)
+            worst = max(worst, err / error)
+            print(f"{name:14s} {error:7.4f} {sketch.k:6d} {len(sketch):7d} {err:9.5f} "
+                  f"{t_sketch * 1e3:6.0f} ms {t_exact * 1e3:6.0f} ms")
+            assert err <= error, f"{name}: rank error {err} > {error}"
+
+    print(f"\n📊 worst rank error / bound: {worst:.2f}")
+
+    # Same columns through the process pool: chunks sketched in workers
+    df = pd.DataFrame(distributions(n // 4, rng))
+    chunks = (df.iloc[i:i + 50_000] for i in range(0, len(df), 50_000))
+    start = time.perf_counter()
+    sketches = sketch_columns(chunks, df.columns, error=0.001, workers=workers)
+    elapsed = time.perf_counter() - start
+    for name in df.columns:
+        err = rank_error(np.sort(df[name].to_numpy()), sketches[name].quantile(QS), QS)
+        assert err <= 0.001, f"{name} via pool: rank error {err}"
+    print(f"🔁 sketch_columns, {workers} workers: {len(df.columns)} columns × {len(df):,d} rows "
+          f"in {elapsed:.2f} s, within bound")
@@ -0,0 +1,125 @@
+"""
+Per-request parsing cost of /predict: the compiled RequestSchema against the
+previous path (lower/strip every key through KEY_MAP, derive_record, then a
+float() loop over feature_cols into np.array).
+
+Times parsing + derivation + validation (no model call) for a payload
+using frontend labels, one using model column names, and a columnar batch,
+then parsing alone. A payload of frontend labels omits the derived
+features, so its cost is dominated by derive_features() in both paths.
+
+Usage:
+    python benchmarks/bench_request_parsing.py [BATCH_ROWS]
+"""
+
+import os
+import sys
+import time
+
+import joblib
+import numpy as np
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT_DIR)
+
+from app import KEY_MAP  # noqa: E402
+from modules.src.feature_derive import derive_record  # noqa: E402
+from request_schema import RequestSchema  # noqa: E402
+
+FEATURE_COLS = list(joblib.load(os.path.join(ROOT_DIR, "model_features.pkl")))
+
+LABELED = {
+    "Planet Name": "Bench-1",
+    "Planet Radius (pl_rade)": 1.5,
+    "Planet Mass (pl_bmasse)": 2.0,
+    "Orbital Period (pl_orbper)": 365.25,
+    "Star Temperature": 5778,
+    "Star Mass": 1.0,
+    "Star Radius": 1.0,
+    "Metallicity": 0.0
+}
+
+RAW = {
+    "pl_name": "Bench-1", "pl_rade": 1.5, "pl_bmasse": 2.0, "pl_eqt": 350,
+    "pl_density": 5.5, "pl_orbper": 365.25, "pl_orbsmax": 1.0,
+    "st_luminosity": 1.0, "pl_insol": 1.0, "st_teff": 5778,
+    "st_mass": 1.0, "st_rad": 1.0, "st_met": 0.0
+}
+
+
+def legacy_parse(data, derive=True):
+    normalized = {}
+    for k, v in data.items():
+        key = str(k).lower().strip()
+        normalized[KEY_MAP.get(key, key)] = v
+
+    if derive:
+        normalized = derive_record(normalized)
+
+    values = []
+    missing = []
+    for col in FEATURE_COLS:
+        if col not in normalized:
+            missing.append(col)
+            values.append(0.0)
+        else:
+            try:
+                values.append(float(normalized[col]))
+            except:  # noqa: E722
+                missing.append(col)
+                values.append(0.0)
+    return np.array([values]), missing
+
+
+def schema_parse(schema, data):
+    row, extras, errors = schema.parse(data)
+    X = row[None, :]
+    schema.complete(X, [extras.get("st_spectype")])
+    return X, errors or schema.missing_errors(X)
+
+
+def per_call(func, n=20000):
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(n):
+            func()
+        best = min(best, (time.perf_counter() - start) / n)
+    return best
+
+
+if __name__ == "__main__":
+    batch_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+
+    start = time.perf_counter()
+    schema = RequestSchema(FEATURE_COLS, KEY_MAP)
+    print(f"⚙️  Schema compiled in {(time.perf_counter() - start) * 1e6:.0f} µs "
+          f"({len(schema.aliases)} aliases)\n")
+
+    # Same rows out of both paths
+    assert np.allclose(legacy_parse(LABELED)[0], schema_parse(schema, LABELED)[0])
+    assert np.allclose(legacy_parse(RAW)[0], schema_parse(schema, RAW)[0])
+
+    print(f"{'payload':24s} {'legacy':>10s} {'schema':>10s}")
+    for label, payload in (("frontend labels", LABELED), ("model columns", RAW)):
+        old = per_call(lambda: legacy_parse(payload))
+        new = per_call(lambda: schema_parse(schema, payload))
+        print(f"{label:24s} {old * 1e6:8.1f} µs {new * 1e6:8.1f} µs   ×{old / new:.1f}")
+
+    columnar = {k: [v] * batch_rows for k, v in RAW.items()}
+
+    def batch():
+        X, extras, errors = schema.parse_batch(columnar)
+        schema.complete(X, extras.get("st_spectype"))
+        return X
+
+    print("\nParsing + validation only (no derivation):")
+    for label, payload in (("frontend labels", LABELED), ("model columns", RAW)):
+        old = per_call(lambda: legacy_parse(payload, derive=False))
+        new = per_call(lambda: schema.parse(payload))
+        print(f"{label:24s} {old * 1e6:8.1f} µs {new * 1e6:8.1f} µs   ×{old / new:.1f}")
+
+    t = per_call(batch, n=50)
+    old = per_call(lambda: legacy_parse(RAW), n=2000) * batch_rows
+    print(f"\n📦 Columnar batch of {batch_rows:,d} rows: {t * 1e3:.2f} ms "
+          f"({t / batch_rows * 1e6:.2f} µs/row; {old * 1e3:.1f} ms as single requests)")
@@ -0,0 +1,102 @@
+"""
+Compiled habitability rules (modules/src/rules.py) against the pandas
+expressions they replace in module3_target_creation.py (np.where over
+chained Series.between) and module2_data_cleaning.py (HSI / SCI).
+
+Rows are sampled from the raw catalog's ranges with ~5% NaN and tiled up to
+the requested size; both paths must agree exactly (labels) or to rounding
+(scores).
+
+Usage:
+    python benchmarks/bench_rules.py [ROWS]
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from modules.src.rules import LABEL_RULES, SCORE_RULES, compile_label, compile_score  # noqa: E402
+
+COLUMNS = {
+    "pl_eqt": (50, 2500),
+    "pl_rade": (0.3, 25),
+    "pl_insol": (0.01, 5000),
+    "pl_orbeccen": (0, 0.9),
+    "st_teff": (2500, 10000),
+    "st_mass": (0.1, 3)
+}
+
+
+def best_of(func, repeat=5):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def pandas_label(df):
+    return np.where(
+        (df["pl_eqt"].between(180, 300)) &
+        (df["pl_rade"] <= 2.0) &
+        (df["pl_insol"].between(0.25, 2.0)),
+        1,
+        0
+    )
+
+
+def pandas_hsi(df):
+    return (
+        (1 / (1 + abs(df["pl_rade"] - 1))) * 0.25 +
+        (1 / (1 + abs(df["pl_eqt"] - 288))) * 0.25 +
+        (1 / (1 + abs(df["pl_insol"] - 1))) * 0.25 +
+        (1 / (1 + abs(df["pl_orbeccen"]))) * 0.25
+    )
+
+
+def pandas_sci(df):
+    return (
+        (1 / (1 + abs(df["st_teff"] - 5778))) * 0.6 +
+        (1 / (1 + abs(df["st_mass"] - 1))) * 0.4
+    )
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000_000
+    rng = np.random.default_rng(0)
+
+    data = {}
+    for name, (lo, hi) in COLUMNS.items():
+        values = rng.uniform(lo, hi, n)
+        values[rng.random(n) < 0.05] = np.nan
+        data[name] = values
+    df = pd.DataFrame(data)
+
+    label = compile_label(LABEL_RULES["habitability"])
+    hsi = compile_score(SCORE_RULES["habitability_score"])
+    sci = compile_score(SCORE_RULES["stellar_compatibility"])
+
+    assert np.array_equal(label(data), pandas_label(df))
+    assert np.allclose(hsi(data), pandas_hsi(df), equal_nan=True)
+    assert np.allclose(sci(data), pandas_sci(df), equal_nan=True)
+
+    print(f"⚙️  {n:,d} rows\n")
+    print(f"{'rule':24s} {'pandas':>10s} {'compiled':>10s} {'speedup':>8s} {'M rows/s':>9s}")
+    for name, old, new in (
+        ("habitability label", lambda: pandas_label(df), lambda: label(data)),
+        ("HSI", lambda: pandas_hsi(df), lambda: hsi(data)),
+        ("SCI", lambda: pandas_sci(df), lambda: sci(data))
+    ):
+        t_old, t_new = best_of(old), best_of(new)
+        print(f"{name:24s} {t_old * 1e3:7.1f} ms {t_new * 1e3:7.1f} ms "
+              f"{t_old / t_new:7.1f}× {n / t_new / 1e6:9.1f}")
+
+    record = {name: float(values[0]) for name, values in data.items()}
+    t = best_of(lambda: [hsi(record) for _ in range(10000)], repeat=3) / 10000
+    print(f"\n🪐 Single record (serving): {t * 1e6:.1f} µs per HSI")
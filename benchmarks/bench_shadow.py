@@ -0,0 +1,78 @@
+"""
+Latency of /predict with shadow scoring off and on.
+
+Sends the same request through the Flask test client (no network) with
+SHADOW_MODE off, then on, interleaved in rounds so machine noise hits both
+alike, and reports p50/p99 of the primary response. Afterwards it waits for
+the shadow worker and prints the agreement/latency summary it logged.
+
+Runs against a temporary copy of the database.
+
+Usage:
+    python benchmarks/bench_shadow.py [REQUESTS]
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend")
+sys.path.insert(0, BACKEND_DIR)
+
+TMP_DB = os.path.join(tempfile.mkdtemp(), "exoplanets.db")
+shutil.copy(os.path.join(BACKEND_DIR, "database", "exoplanets.db"), TMP_DB)
+os.environ["EXOPLANETS_DB"] = TMP_DB
+
+import app as backend_app  # noqa: E402
+import shadow  # noqa: E402
+from db import get_db  # noqa: E402
+
+PAYLOAD = {
+    "planet_name": "Bench-Shadow-1",
+    "st_teff": 5778, "st_rad": 1.0, "st_mass": 1.0, "st_met": 0.0,
+    "pl_orbper": 365.25, "pl_orbeccen": 0.017,
+    "pl_rade": 1.0, "pl_bmasse": 1.0, "st_spectype": "G2 V"
+}
+
+
+def timed(client, n):
+    times = []
+    for _ in range(n):
+        start = time.perf_counter()
+        client.post("/predict", json=PAYLOAD)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    client = backend_app.create_app().test_client()
+
+    # Warm up: models, DB, the shadow model in its worker
+    backend_app.SHADOW_MODE = True
+    timed(client, 50)
+    shadow.flush()
+
+    results = {False: [], True: []}
+    rounds = 10
+    for _ in range(rounds):
+        for mode in (False, True):
+            backend_app.SHADOW_MODE = mode
+            results[mode] += timed(client, n // rounds)
+        shadow.flush()
+
+    print(f"{'shadow':>8s} {'p50':>9s} {'p99':>9s}")
+    for mode, times in results.items():
+        t = np.array(times) * 1e3
+        print(f"{'on' if mode else 'off':>8s} {np.percentile(t, 50):7.3f} ms {np.percentile(t, 99):7.3f} ms")
+
+    conn = get_db()
+    print("\n📊 Logged comparison")
+    for key, value in shadow.summary(conn).items():
+        print(f"   {key:22s} {value}")
+    print(f"   {'dropped':22s} {shadow.dropped}")
+    conn.close()
@@ -0,0 +1,67 @@
+"""
+Latency of /similar's nearest-neighbour lookup.
+
+Builds a PlanetIndex over N synthetic planets (the stored catalog rows with
+multiplicative jitter), then times k-NN queries against the tree alone and
+with a pending buffer of unindexed inserts, plus the background rebuild.
+
+Usage:
+    python benchmarks/bench_similar.py [N_PLANETS]
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from config import INDEX_REBUILD_EVERY, MODEL_FEATURES  # noqa: E402
+from db import get_db  # noqa: E402
+from models import get_scaler  # noqa: E402
+from similarity import PlanetIndex  # noqa: E402
+
+
+def query_us(index, queries, k=5):
+    start = time.perf_counter()
+    for q in queries:
+        index.query(q, k=k)
+    return (time.perf_counter() - start) / len(queries) * 1e6
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    rng = np.random.default_rng(42)
+
+    conn = get_db()
+    base = np.array(
+        conn.execute(f"SELECT {', '.join(MODEL_FEATURES)} FROM planets").fetchall(),
+        dtype=float
+    )
+    conn.close()
+
+    X = base[rng.integers(0, len(base), n)] * rng.normal(1, 0.05, (n, len(MODEL_FEATURES)))
+    names = [f"synthetic-{i}" for i in range(n)]
+    proba = rng.random(n)
+
+    scaler = get_scaler()
+    index = PlanetIndex(scaler.mean_, scaler.scale_)
+
+    start = time.perf_counter()
+    index.build(names, X, proba)
+    print(f"🌲 Build over {n:,d} planets: {(time.perf_counter() - start) * 1e3:.1f} ms")
+
+    queries = X[rng.integers(0, n, 2000)]
+    print(f"🔎 k=5 query, tree only:            {query_us(index, queries):7.1f} µs")
+
+    for i in range(INDEX_REBUILD_EVERY - 1):
+        index.add(f"new-{i}", X[i], 0.5)
+    print(f"🔎 k=5 query, {INDEX_REBUILD_EVERY - 1} pending inserts:   {query_us(index, queries):7.1f} µs")
+
+    start = time.perf_counter()
+    index.add("trigger", X[0], 0.5)
+    while len(index._pending_names):
+        time.sleep(0.001)
+    print(f"♻️  Background rebuild visible after: {(time.perf_counter() - start) * 1e3:.1f} ms")
+    print(f"🔎 k=5 query, after rebuild:        {query_us(index, queries):7.1f} µs")
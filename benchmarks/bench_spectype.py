@@ -0,0 +1,110 @@
+"""
+Sparse class/subclass encoding of st_spectype (modules/src/spectype.py)
+against the dense pd.get_dummies it replaced in module2 (plus module3's
+StandardScaler and a LogisticRegression fit, as in module4).
+
+The full NASA catalog is not in the repository, so spectral strings are
+generated with the kinds of spelling found in it: decimal subclasses,
+luminosity classes and ranges, peculiarity suffixes, composite types
+("F8/G0 V") and non O-M types (white dwarfs, brown dwarfs), roughly 40k
+rows by default like the Planetary Systems table.
+
+Usage:
+    python benchmarks/bench_spectype.py [ROWS]
+"""
+
+import io
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import StandardScaler
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from modules.src.spectype import SpectypeEncoder, normalize_spectypes  # noqa: E402
+
+CLASSES = list("OBAFGKM")
+CLASS_WEIGHTS = [0.002, 0.02, 0.06, 0.2, 0.32, 0.25, 0.148]
+LUMINOSITY = ["V", "IV", "III", "IV-V", "III-IV", "Ve", "V(e)", "Vp", "", "II", "IVe"]
+
+
+def spectral_strings(n, rng):
+    letters = rng.choice(CLASSES, n, p=CLASS_WEIGHTS)
+    digits = rng.integers(0, 10, n)
+    halves = rng.random(n) < 0.15
+    lum = rng.choice(LUMINOSITY, n)
+    out = []
+    for letter, digit, half, l, r in zip(letters, digits, halves, lum, rng.random(n)):
+        sub = f"{digit}.5" if half else str(digit)
+        if r < 0.05:
+            s = f"{letter}{sub}/{CLASSES[min(CLASSES.index(letter) + 1, 6)]}0 {l}"
+        elif r < 0.08:
+            s = rng.choice(["DA", "DB", "DQ", "L3", "T8", "WD"])
+        elif r < 0.12:
+            s = letter
+        else:
+            s = f"{letter}{sub} {l}".strip()
+        out.append(s)
+    return np.array(out, dtype=object)
+
+
+def best_of(func, repeat=3):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def csv_bytes(df):
+    buf = io.StringIO()
+    df.to_csv(buf, index=False)
+    return len(buf.getvalue())
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 40_000
+    rng = np.random.default_rng(0)
+
+    raw = spectral_strings(n, rng)
+    numeric = rng.normal(size=(n, 10))
+    y = (numeric[:, 0] + (pd.Series(raw).str[:1] == "G").to_numpy() + rng.normal(size=n) > 1).astype(int)
+
+    # ---------- legacy: module2 get_dummies, module3 scaler ----------
+    dummies = pd.get_dummies(pd.DataFrame({"st_spectype": raw}), columns=["st_spectype"], drop_first=True)
+    dense = np.hstack([numeric, StandardScaler(with_mean=False).fit_transform(dummies.to_numpy(float))])
+
+    # ---------- sparse: normalized codes, persisted vocabulary ----------
+    codes = normalize_spectypes(raw)
+    encoder = SpectypeEncoder().fit(codes)
+    indicators = StandardScaler(with_mean=False).fit_transform(encoder.transform(codes))
+    sparse_X = sparse.hstack([sparse.csr_matrix(numeric), indicators]).tocsr()
+
+    def nbytes(m):
+        return m.data.nbytes + m.indices.nbytes + m.indptr.nbytes
+
+    print(f"🪐 {n:,d} rows, {len(set(raw)):,d} raw spellings -> {len(set(codes) - {None})} codes\n")
+    print(f"{'':28s} {'dense dummies':>15s} {'sparse codes':>15s}")
+    print(f"{'spectype columns':28s} {dummies.shape[1]:15d} {len(encoder.get_feature_names_out()):15d}")
+    print(f"{'CSV written by module2':28s} {csv_bytes(dummies) / 2**20:11.2f} MiB "
+          f"{csv_bytes(pd.DataFrame({'st_spectype': codes})) / 2**20:11.2f} MiB")
+    print(f"{'spectype frame / matrix':28s} {dummies.memory_usage().sum() / 2**20:11.2f} MiB "
+          f"{nbytes(indicators.tocsr()) / 2**20:11.2f} MiB")
+    print(f"{'model input (+10 numeric)':28s} {dense.nbytes / 2**20:11.2f} MiB "
+          f"{nbytes(sparse_X) / 2**20:11.2f} MiB")
+
+    model = LogisticRegression(C=0.1, max_iter=1000, class_weight={0: 1, 1: 15}, solver="liblinear")
+    t_dense = best_of(lambda: model.fit(dense, y))
+    t_sparse = best_of(lambda: model.fit(sparse_X, y))
+    print(f"{'LogisticRegression fit':28s} {t_dense * 1e3:12.0f} ms {t_sparse * 1e3:12.0f} ms")
+
+    t_dummies = best_of(lambda: pd.get_dummies(
+        pd.DataFrame({"st_spectype": raw}), columns=["st_spectype"], drop_first=True))
+    t_encode = best_of(lambda: encoder.transform(raw))
+    print(f"{'encode':28s} {t_dummies * 1e3:12.0f} ms {t_encode * 1e3:12.0f} ms")
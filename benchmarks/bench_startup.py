@@ -0,0 +1,70 @@
+"""
+Cold-start profile of the two API modules.
+
+For each app this reports:
+  - the `python -X importtime` breakdown (top modules by cumulative time)
+  - wall time from interpreter start to the first healthy /health response
+    (the root app's /health loads the model, so it includes sklearn)
+
+Usage:
+    python benchmarks/bench_startup.py [TOP_N]
+"""
+
+import os
+import subprocess
+import sys
+import time
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+APPS = {
+    "root app.py": ROOT_DIR,
+    "backend/app.py": os.path.join(ROOT_DIR, "backend")
+}
+
+FIRST_RESPONSE = (
+    "from app import app\n"
+    "r = app.test_client().get('/health')\n"
+    "assert r.status_code == 200, r.get_data(as_text=True)\n"
+)
+
+
+def import_profile(cwd):
+    """
+    Return [(cumulative_us, module)] parsed from -X importtime, slowest first.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app"],
+        cwd=cwd,
+        capture_output=True,
+        text=True
+    )
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cum_us, name = line.split(":", 1)[1].split("|")
+        rows.append((int(cum_us), name.rstrip()))
+
+    return sorted(rows, reverse=True)
+
+
+def first_response_seconds(cwd):
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", FIRST_RESPONSE], cwd=cwd, check=True, capture_output=True)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    top_n = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+
+    for label, cwd in APPS.items():
+        rows = import_profile(cwd)
+        total = next((us for us, name in rows if name.strip() == "app"), 0)
+
+        print(f"📦 {label}: `import app` took {total / 1e3:.1f} ms")
+        for us, name in rows[1:top_n + 1]:
+            print(f"   {us / 1e3:8.1f} ms  {name.strip()}")
+
+        print(f"⏱️  start → first healthy /health: {first_response_seconds(cwd):.3f} s\n")
@@ -0,0 +1,101 @@
+"""
+Phase timings of the training package (modules/src/training) and the
+effect of early stopping and thread count on the boosting phases.
+
+Each configuration trains into a temporary directory; the first one is
+run twice to check the artifacts are byte-identical. With BASELINE (a
+JSON written earlier by --timings or by this script) the phase timings
+are compared against it, so a regression in any phase shows up.
+
+Usage:
+    python benchmarks/bench_training.py [--data CSV] [--baseline JSON] [--save JSON]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from modules.src.training import run  # noqa: E402
+from modules.src.training.__main__ import DEFAULT_DATA  # noqa: E402
+from modules.src.training.pipeline import ARTIFACTS  # noqa: E402
+
+CONFIGS = [
+    ("300 rounds, no early stop", {"early_stopping_rounds": None, "nthread": 1}),
+    ("early stop 20, 1 thread", {"early_stopping_rounds": 20, "nthread": 1}),
+    ("early stop 20, all threads", {"early_stopping_rounds": 20, "nthread": None})
+]
+
+
+def digests(directory):
+    out = {}
+    for name in ("classifier", "scaler", "imputer"):
+        with open(os.path.join(directory, ARTIFACTS[name]), "rb") as f:
+            out[name] = hashlib.sha256(f.read()).hexdigest()
+    return out
+
+
+def best_run(data, repeat=3, **kwargs):
+    best = None
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as out:
+            summary = run(data, out, **kwargs)
+            summary["digests"] = digests(out)
+        if best is None or sum(summary["timings"].values()) < sum(best["timings"].values()):
+            best = summary
+    return best
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--data", default=DEFAULT_DATA)
+    parser.add_argument("--baseline", help="timings JSON to compare against")
+    parser.add_argument("--save", help="write this run's timings JSON")
+    args = parser.parse_args()
+    data, save = args.data, args.save
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    results = {label: best_run(data, **kwargs) for label, kwargs in CONFIGS}
+    phases = list(next(iter(results.values()))["timings"])
+
+    print(f"⏱️  {os.path.basename(data)}, best of 3 (ms)\n")
+    print(f"{'phase':18s}" + "".join(f"{label:>28s}" for label in results))
+    for phase in phases + ["total"]:
+        row = f"{phase:18s}"
+        for summary in results.values():
+            t = sum(summary["timings"].values()) if phase == "total" else summary["timings"][phase]
+            row += f"{t * 1e3:28.1f}"
+        print(row)
+    print(f"{'rounds':18s}" + "".join(
+        f"{s['rounds']['classifier']:28d}" for s in results.values()
+    ))
+    print(f"{'test roc_auc':18s}" + "".join(
+        f"{s['metrics']['test']['classifier']['roc_auc']:28.3f}" for s in results.values()
+    ))
+
+    # Reproducibility: same seed, same bytes
+    label, kwargs = CONFIGS[1]
+    with tempfile.TemporaryDirectory() as out:
+        run(data, out, **kwargs)
+        same = digests(out) == results[label]["digests"]
+    print(f"\n🔁 re-run of '{label}' byte-identical: {same}")
+    assert same, "artifacts differ between runs with the same seed"
+
+    current = results[CONFIGS[1][0]]
+    if baseline:
+        print("\n📊 against baseline")
+        for phase, t in current["timings"].items():
+            before = baseline["timings"].get(phase)
+            if before:
+                print(f"   {phase:18s} {before * 1e3:8.1f} -> {t * 1e3:8.1f} ms ({t / before:5.2f}×)")
+    if save:
+        with open(save, "w") as f:
+            json.dump(current, f, indent=2)
+        print("💾 Saved:", save)
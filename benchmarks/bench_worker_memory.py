@@ -0,0 +1,81 @@
+"""
+Per-worker memory of the backend API under N gunicorn workers.
+
+Starts gunicorn twice (models loaded lazily in each worker, then preloaded
+in the master), warms every worker with /rank requests and reports RSS and
+PSS per worker from /proc. PSS splits shared pages between the processes
+that map them, so it drops when workers share the model pages.
+
+Linux only. Usage:
+    python benchmarks/bench_worker_memory.py [N_WORKERS]
+"""
+
+import os
+import signal
+import subprocess
+import sys
+import time
+import urllib.request
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend")
+PORT = 5077
+
+
+def read_kb(pid, field):
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1])
+    return 0
+
+
+def worker_pids(master_pid):
+    out = subprocess.run(
+        ["pgrep", "-P", str(master_pid)],
+        capture_output=True,
+        text=True
+    ).stdout
+    return [int(p) for p in out.split()]
+
+
+def run(n_workers, preload):
+    env = dict(os.environ, PRELOAD_MODELS="1" if preload else "0", PORT=str(PORT))
+    proc = subprocess.Popen(
+        ["gunicorn", "-c", "gunicorn.conf.py", "-w", str(n_workers), "app:app"],
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+
+    try:
+        deadline = time.time() + 30
+        while time.time() < deadline:
+            try:
+                urllib.request.urlopen(f"http://127.0.0.1:{PORT}/", timeout=1)
+                break
+            except OSError:
+                time.sleep(0.2)
+
+        # Enough requests that every worker has served (and loaded) a model
+        for _ in range(n_workers * 10):
+            urllib.request.urlopen(f"http://127.0.0.1:{PORT}/rank?top=1").read()
+
+        pids = worker_pids(proc.pid)
+        rss = [read_kb(p, "Rss") for p in pids]
+        pss = [read_kb(p, "Pss") for p in pids]
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        proc.wait()
+
+    return sum(rss) / len(rss) / 1024, sum(pss) / len(pss) / 1024
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+
+    print(f"📏 Per-worker memory with {n} gunicorn workers\n")
+    for preload in (False, True):
+        rss, pss = run(n, preload)
+        mode = "preloaded in master" if preload else "lazy, per worker  "
+        print(f"{mode}:  RSS {rss:7.1f} MB   PSS {pss:7.1f} MB")
@@ -1,12 +1,41 @@
 import { FileDown, FileSpreadsheet } from 'lucide-react';
-import { useEffect, useState } from 'react';
-import { getRankedPlanets, type RankedPlanet } from '../services/api';
+import { useEffect, useRef, useState } from 'react';
+import { getPlanets, getRankingsExportUrl, type CatalogPlanet, type PlanetFilters } from '../services/api';
 
 interface Planet {
+  id: number;
   rank: number;
   name: string;
   score: number;
   confidence: number;
+  stellarTemperature: number | null;
+  insolation: number | null;
+}
+
+// Filter form, as typed; blank fields are not sent
+const EMPTY_FILTERS = {
+  habitable: '',  // '' | '1' | '0'
+  minScore: '',   // %
+  maxScore: '',   // %
+  teffMin: '',    // st_teff (K)
+  teffMax: '',
+  insolMin: '',   // pl_insol
+  insolMax: ''
+};
+
+type FilterForm = typeof EMPTY_FILTERS;
+
+function toPlanetFilters(form: FilterForm): PlanetFilters {
+  const number = (value: string, scale = 1) => (value === '' ? undefined : Number(value) / scale);
+  return {
+    habitable: form.habitable === '' ? undefined : form.habitable === '1',
+    min_score: number(form.minScore, 100),
+    max_score: number(form.maxScore, 100),
+    teff_min: number(form.teffMin),
+    teff_max: number(form.teffMax),
+    insol_min: number(form.insolMin),
+    insol_max: number(form.insolMax)
+  };
 }
 
 interface RankingSectionProps {
@@ -15,40 +44,93 @@ interface RankingSectionProps {
 
 export function RankingSection({ refreshTrigger }: RankingSectionProps) {
   const [planets, setPlanets] = useState<Planet[]>([]);
+  const [form, setForm] = useState<FilterForm>(EMPTY_FILTERS);
+  const [filters, setFilters] = useState<PlanetFilters>({});
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [isLoading, setIsLoading] = useState(false);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
+  const [error, setError] = useState<string | null>(null);
+  // Bumped on every first-page load so a late "load more" page of the
+  // previous filters is dropped
+  const listing = useRef(0);
 
-  // Fetch ranked planets from backend API
+  // Transform API response to component format, ranked after `offset` rows
+  const toPlanets = (rows: CatalogPlanet[], offset: number): Planet[] =>
+    rows.map((planet, i) => ({
+      id: planet.id,
+      rank: offset + i + 1,
+      name: planet.planet_name,
+      score: planet.habitability_score,
+      confidence: planet.confidence,
+      stellarTemperature: planet.st_teff,
+      insolation: planet.pl_insol
+    }));
+
+  // Fetch the first page from GET /planets, best score first
   useEffect(() => {
+    const current = ++listing.current;
+
     const fetchRankings = async () => {
       setIsLoading(true);
-      try {
-        // Call GET /rank API
-        const response = await getRankedPlanets();
-        
-        if (response.status === 'success' && response.data) {
-          // Transform API response to component format
-          const transformedData: Planet[] = response.data.data.map((planet: RankedPlanet) => ({
-            rank: planet.rank,
-            name: planet.planet_name,
-            score: planet.habitability_score,
-            confidence: planet.confidence
-          }));
-          
-          setPlanets(transformedData);
-        } else {
-          console.error('Failed to fetch rankings');
-          setPlanets([]);
-        }
-      } catch (error) {
-        console.error('Error fetching rankings:', error);
+      setError(null);
+      const response = await getPlanets(filters);
+      if (current !== listing.current) {
+        return;
+      }
+
+      if (response.status === 'success' && response.data) {
+        setPlanets(toPlanets(response.data.data, 0));
+        setNextCursor(response.data.next_cursor);
+      } else {
+        setError(response.message || 'Failed to fetch rankings');
         setPlanets([]);
-      } finally {
-        setIsLoading(false);
+        setNextCursor(null);
       }
+      setIsLoading(false);
     };
 
     fetchRankings();
-  }, [refreshTrigger]); // Re-fetch when refreshTrigger changes
+  }, [filters, refreshTrigger]); // Re-fetch when the filters or refreshTrigger change
+
+  // Append the next page of the same listing
+  const handleLoadMore = async () => {
+    if (!nextCursor) {
+      return;
+    }
+    const current = listing.current;
+
+    setIsLoadingMore(true);
+    const response = await getPlanets({ ...filters, cursor: nextCursor });
+    setIsLoadingMore(false);
+    if (current !== listing.current) {
+      return;
+    }
+
+    if (response.status === 'success' && response.data) {
+      const page = response.data;
+      setPlanets(previous => [...previous, ...toPlanets(page.data, previous.length)]);
+      setNextCursor(page.next_cursor);
+    } else {
+      setError(response.message || 'Failed to fetch more planets');
+    }
+  };
+
+  const handleFilterChange = (e: React.ChangeEvent<HTMLInputElement | HTMLSelectElement>) => {
+    setForm({
+      ...form,
+      [e.target.name]: e.target.value
+    });
+  };
+
+  const handleApplyFilters = (e: React.FormEvent) => {
+    e.preventDefault();
+    setFilters(toPlanetFilters(form));
+  };
+
+  const handleClearFilters = () => {
+    setForm(EMPTY_FILTERS);
+    setFilters({});
+  };
 
   const handleExport = (format: 'pdf' | 'excel') => {
     if (format === 'pdf') {
@@ -71,26 +153,21 @@ export function RankingSection({ refreshTrigger }: RankingSectionProps) {
       console.log('Exporting to PDF...', planets);
       alert('PDF export initiated. In production, this would generate a PDF file.');
     } else {
-      // TODO: API INTEGRATION REQUIRED (OPTIONAL)
-      // Current CSV export works client-side
-      // Optionally replace with server-side Excel generation:
-      // const response = await fetch('/api/export/excel', {
-      //   method: 'POST',
-      //   headers: { 'Content-Type': 'application/json' },
-      //   body: JSON.stringify({ planets })
-      // });
-      // const blob = await response.blob();
-      // const url = window.URL.createObjectURL(blob);
-      // const a = document.createElement('a');
-      // a.href = url;
-      // a.download = 'exoplanet-rankings.xlsx';
-      // a.click();
-      
-      // Mock Excel export (CSV format - works without backend)
+      // Server-side streamed export of the full ranked catalog
+      const exportUrl = getRankingsExportUrl('xlsx');
+      if (exportUrl) {
+        const a = document.createElement('a');
+        a.href = exportUrl;
+        a.download = 'exoplanet-rankings.xlsx';
+        a.click();
+        return;
+      }
+
+      // Demo mode: CSV export of the visible rows (works without backend)
       console.log('Exporting to Excel...', planets);
       const csvContent = [
-        ['Rank', 'Planet Name', 'Habitability Score', 'Confidence'],
-        ...planets.map(p => [p.rank, p.name, p.score, p.confidence])
+        ['Rank', 'Planet Name', 'Habitability Score', 'Confidence', 'Stellar Temp (K)', 'Insolation'],
+        ...planets.map(p => [p.rank, p.name, p.score, p.confidence, p.stellarTemperature ?? '', p.insolation ?? ''])
       ].map(row => row.join(',')).join('\n');
       
       const blob = new Blob([csvContent], { type: 'text/csv' });
@@ -115,7 +192,7 @@ export function RankingSection({ refreshTrigger }: RankingSectionProps) {
             Top Habitable Planets
           </h2>
           <p className="font-['Space_Mono'] text-sm text-neutral-400">
-            Ranked by habitability score
+            Ranked by habitability score, {planets.length} shown
           </p>
         </div>
         <div className="flex gap-3">
@@ -138,6 +215,127 @@ export function RankingSection({ refreshTrigger }: RankingSectionProps) {
         </div>
       </div>
 
+      <form
+        onSubmit={handleApplyFilters}
+        className="grid grid-cols-1 md:grid-cols-5 gap-4 items-end mb-6"
+      >
+        <div>
+          <label className="block font-['Space_Mono'] text-xs text-neutral-400 mb-2 tracking-wide">
+            HABITABILITY
+          </label>
+          <select
+            name="habitable"
+            value={form.habitable}
+            onChange={handleFilterChange}
+            className="w-full bg-black border border-neutral-700 px-3 py-2 text-white font-['Space_Mono'] text-sm focus:outline-none focus:border-orange-500"
+          >
+            <option value="">All</option>
+            <option value="1">Habitable</option>
+            <option value="0">Not habitable</option>
+          </select>
+        </div>
+        <div>
+          <label className="block font-['Space_Mono'] text-xs text-neutral-400 mb-2 tracking-wide">
+            SCORE (%)
+          </label>
+          <div className="flex gap-2">
+            <input
+              type="number"
+              name="minScore"
+              value={form.minScore}
+              onChange={handleFilterChange}
+              className="w-full bg-black border border-neutral-700 px-3 py-2 text-white font-['Space_Mono'] text-sm focus:outline-none focus:border-orange-500"
+              placeholder="min"
+              step="0.1"
+            />
+            <input
+              type="number"
+              name="maxScore"
+              value={form.maxScore}
+              onChange={handleFilterChange}
+              className="w-full bg-black border border-neutral-700 px-3 py-2 text-white font-['Space_Mono'] text-sm focus:outline-none focus:border-orange-500"
+              placeholder="max"
+              step="0.1"
+            />
+          </div>
+        </div>
+        <div>
+          <label className="block font-['Space_Mono'] text-xs text-neutral-400 mb-2 tracking-wide">
+            STELLAR TEMP (K)
+          </label>
+          <div className="flex gap-2">
+            <input
+              type="number"
+              name="teffMin"
+              value={form.teffMin}
+              onChange={handleFilterChange}
+              className="w-full bg-black border border-neutral-700 px-3 py-2 text-white font-['Space_Mono'] text-sm focus:outline-none focus:border-orange-500"
+              placeholder="min"
+              step="100"
+            />
+            <input
+              type="number"
+              name="teffMax"
+              value={form.teffMax}
+              onChange={handleFilterChange}
+              className="w-full bg-black border border-neutral-700 px-3 py-2 text-white font-['Space_Mono'] text-sm focus:outline-none focus:border-orange-500"
+              placeholder="max"
+              step="100"
+            />
+          </div>
+        </div>
+        <div>
+          <label className="block font-['Space_Mono'] text-xs text-neutral-400 mb-2 tracking-wide">
+            INSOLATION (S⊕)
+          </label>
+          <div className="flex gap-2">
+            <input
+              type="number"
+              name="insolMin"
+              value={form.insolMin}
+              onChange={handleFilterChange}
+              className="w-full bg-black border border-neutral-700 px-3 py-2 text-white font-['Space_Mono'] text-sm focus:outline-none focus:border-orange-500"
+              placeholder="min"
+              step="any"
+            />
+            <input
+              type="number"
+              name="insolMax"
+              value={form.insolMax}
+              onChange={handleFilterChange}
+              className="w-full bg-black border border-neutral-700 px-3 py-2 text-white font-['Space_Mono'] text-sm focus:outline-none focus:border-orange-500"
+              placeholder="max"
+              step="any"
+            />
+          </div>
+        </div>
+        <div className="flex gap-2">
+          <button
+            type="submit"
+            className="flex-1 px-4 py-2 bg-orange-600 text-white font-['Space_Mono'] text-sm hover:bg-orange-700 transition-colors"
+            disabled={isLoading}
+          >
+            Filter
+          </button>
+          <button
+            type="button"
+            onClick={handleClearFilters}
+            className="flex-1 px-4 py-2 bg-neutral-800 border border-neutral-700 text-neutral-300 font-['Space_Mono'] text-sm hover:bg-neutral-700 transition-colors"
+            disabled={isLoading}
+          >
+            Clear
+          </button>
+        </div>
+      </form>
+
+      {error && (
+        <div className="p-4 mb-6 border border-orange-600/50 bg-orange-950/20">
+          <p className="font-['Space_Mono'] text-xs text-orange-400">
+            {error}
+          </p>
+        </div>
+      )}
+
       {isLoading ? (
         <div className="flex items-center justify-center py-12">
           <div className="animate-pulse font-['Space_Mono'] text-orange-500">
@@ -161,12 +359,18 @@ export function RankingSection({ refreshTrigger }: RankingSectionProps) {
                 <th className="text-left py-4 px-4 font-['Space_Mono'] text-xs text-neutral-400 tracking-wider">
                   CONFIDENCE
                 </th>
+                <th className="text-left py-4 px-4 font-['Space_Mono'] text-xs text-neutral-400 tracking-wider">
+                  STELLAR TEMP
+                </th>
+                <th className="text-left py-4 px-4 font-['Space_Mono'] text-xs text-neutral-400 tracking-wider">
+                  INSOLATION
+                </th>
               </tr>
             </thead>
             <tbody>
               {planets.map((planet) => (
                 <tr
-                  key={planet.rank}
+                  key={planet.id}
                   className="border-b border-neutral-800 hover:bg-neutral-800 transition-colors"
                 >
                   <td className="py-4 px-4">
@@ -197,10 +401,32 @@ export function RankingSection({ refreshTrigger }: RankingSectionProps) {
                       {(planet.confidence * 100).toFixed(1)}%
                     </span>
                   </td>
+                  <td className="py-4 px-4">
+                    <span className="font-['Space_Mono'] text-sm text-neutral-400">
+                      {planet.stellarTemperature === null ? '—' : `${Math.round(planet.stellarTemperature)} K`}
+                    </span>
+                  </td>
+                  <td className="py-4 px-4">
+                    <span className="font-['Space_Mono'] text-sm text-neutral-400">
+                      {planet.insolation === null ? '—' : planet.insolation.toFixed(2)}
+                    </span>
+                  </td>
                 </tr>
               ))}
             </tbody>
           </table>
+
+          {nextCursor && (
+            <div className="flex justify-center pt-6">
+              <button
+                onClick={handleLoadMore}
+                className="px-4 py-2 bg-neutral-800 border border-orange-600 text-orange-500 font-['Space_Mono'] text-sm hover:bg-neutral-700 transition-colors"
+                disabled={isLoadingMore}
+              >
+                {isLoadingMore ? 'Loading...' : 'Load more'}
+              </button>
+            </div>
+          )}
         </div>
       )}
     </div>
@@ -50,6 +50,40 @@ export interface RankingResponse {
   data: RankedPlanet[];
 }
 
+export interface CatalogPlanet {
+  id: number;
+  planet_name: string;
+  habitability: 0 | 1;
+  habitability_score: number;
+  confidence: number;
+  st_teff: number | null;
+  pl_insol: number | null;
+}
+
+// GET /planets query parameters; all optional
+export interface PlanetFilters {
+  habitable?: boolean;
+  min_score?: number;
+  max_score?: number;
+  teff_min?: number;
+  teff_max?: number;
+  insol_min?: number;
+  insol_max?: number;
+  sort?: 'score' | 'st_teff' | 'pl_insol';
+  order?: 'desc' | 'asc';
+  limit?: number;    // 1-500, backend default 50
+  cursor?: string;   // next_cursor of the previous page, same sort and order
+}
+
+export interface PlanetsResponse {
+  status: 'success' | 'error';
+  message?: string;
+  data?: {
+    data: CatalogPlanet[];
+    next_cursor: string | null; // null on the last page
+  };
+}
+
 export interface AddPlanetResponse {
   status: 'success' | 'error';
   message: string;
@@ -227,6 +261,70 @@ export async function getRankedPlanets(top?: number): Promise<RankingResponse> {
   }
 }
 
+/**
+ * 5. PLANET CATALOG (FILTERED, PAGINATED)
+ * Route: GET /planets
+ * Purpose: One page of the catalog matching the filters; pass next_cursor
+ * back as `cursor` for the following page
+ */
+export async function getPlanets(filters: PlanetFilters = {}): Promise<PlanetsResponse> {
+  // If backend unavailable, filter the mock data in a single page
+  if (!isBackendAvailable) {
+    console.log('📊 Demo Mode: Using mock catalog data');
+    const mockData = MOCK_RANKED_PLANETS
+      .filter(p => filters.habitable === undefined || (p.habitability === 1) === filters.habitable)
+      .filter(p => filters.min_score === undefined || p.habitability_score >= filters.min_score)
+      .filter(p => filters.max_score === undefined || p.habitability_score <= filters.max_score)
+      // No stellar data in the mock: a Teff or insolation bound matches nothing, as a NULL does in the backend
+      .filter(() => [filters.teff_min, filters.teff_max, filters.insol_min, filters.insol_max]
+        .every(bound => bound === undefined))
+      .map(({ rank, ...p }) => ({ ...p, id: rank, st_teff: null, pl_insol: null }));
+    return {
+      status: 'success',
+      data: { data: mockData, next_cursor: null },
+    };
+  }
+
+  try {
+    const params = new URLSearchParams();
+    for (const [key, value] of Object.entries(filters)) {
+      if (value === undefined || value === '') continue;
+      params.set(key, typeof value === 'boolean' ? (value ? '1' : '0') : String(value));
+    }
+    const query = params.toString();
+
+    const response = await fetch(`${API_BASE_URL}/planets${query ? `?${query}` : ''}`, {
+      method: 'GET',
+    });
+
+    const data = await response.json();
+
+    if (!response.ok) {
+      throw new Error(data.message || 'Failed to fetch planets');
+    }
+
+    return data;
+  } catch (error) {
+    console.error('Error fetching planets:', error);
+    return {
+      status: 'error',
+      message: error instanceof Error ? error.message : 'Unknown error occurred',
+    };
+  }
+}
+
+/**
+ * 6. EXPORT RANKINGS (STREAMED BY THE SERVER)
+ * Route: GET /rank/export?format=csv|xlsx|ndjson
+ * Purpose: Download URL for the full ranked catalog (null in demo mode)
+ */
+export function getRankingsExportUrl(format: 'csv' | 'xlsx' | 'ndjson'): string | null {
+  if (!isBackendAvailable) {
+    return null;
+  }
+  return `${API_BASE_URL}/rank/export?format=${format}`;
+}
+
 /**
  * HELPER: Compute dashboard statistics from ranking data
  * This is computed on the frontend from the /rank response
@@ -3,127 +3,272 @@ import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 import os
-from sklearn.preprocessing import MinMaxScaler
+
+from modules.src.imputation import (
+    SPECTRAL_CLASSES, impute_frame, imputer_from_sketches, load_imputer, save_imputer, spectral_classes
+)
+from modules.src.manifest import fingerprint
+from modules.src.rules import SCORE_RULES, compile_score
+from modules.src.sketch import QuantileSketch
+from modules.src.spectype import fit_vocabulary, normalize_spectypes, save_vocabulary
 
 # -------------------------------
 # Configuration
 # -------------------------------
 INPUT_FILE = os.path.join("outputs", "merged_dataset.csv")
 OUTPUT_DIR = "outputs"
+IMPUTER_FILE = os.path.join(OUTPUT_DIR, "imputer.json")
+VOCABULARY_FILE = os.path.join(OUTPUT_DIR, "spectype_vocabulary.json")
+REFIT_IMPUTER = os.getenv("REFIT_IMPUTER") == "1"
+# Global medians by default; "spectral_class" adds per-class medians
+IMPUTER_GROUP_BY = os.getenv("IMPUTER_GROUP_BY") or None
+# Medians and IQR quantiles: normalized rank error of the sketches (exact
+# up to 3 / QUANTILE_ERROR rows, i.e. 6000 at the default)
+QUANTILE_ERROR = float(os.getenv("QUANTILE_ERROR", 0.0005))
+# Rows per chunk of both passes over the input: memory is bounded by it,
+# not by the dataset
+CHUNK_ROWS = 100_000
+HEATMAP_BLOCK_ROWS = 1000
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
 print("📌 Module 2: Data Cleaning & Feature Engineering\n")
 
 # -------------------------------
-# Step 1: Load merged dataset
+# Step 1: Missing-value imputer
 # -------------------------------
-df = pd.read_csv(INPUT_FILE)
-print("Dataset loaded:", df.shape)
+print("Preparing the missing-value imputer...")
+
+# Numerical columns are filled with medians, fitted once and reused on
+# later runs of the same input file and grouping
+data_sha256, _ = fingerprint(INPUT_FILE)
+imputer = None
+if os.path.exists(IMPUTER_FILE) and not REFIT_IMPUTER:
+    imputer = load_imputer(IMPUTER_FILE)
+    if (imputer.get("data_sha256") != data_sha256
+            or imputer.get("group_by") != IMPUTER_GROUP_BY):
+        print("Fitted imputer is stale (other data or grouping), refitting")
+        imputer = None
+    else:
+        print("Using fitted imputer:", IMPUTER_FILE)
 
 # -------------------------------
-# Step 2: Handle missing values
-# -------------------------------
-print("\nHandling missing values...")
-
-numerical_cols = df.select_dtypes(include=["float64", "int64"]).columns
-categorical_cols = df.select_dtypes(include=["object"]).columns
-
-# Fill numerical columns with median
-df[numerical_cols] = df[numerical_cols].fillna(df[numerical_cols].median())
-
-# Fill categorical columns with mode
-for col in categorical_cols:
-    df[col] = df[col].fillna(df[col].mode()[0])
-
-print("Missing values handled.")
-
+# Step 2: One streamed pass: medians, IQR bounds, category modes
 # -------------------------------
-# Step 3: Outlier handling (IQR method)
-# -------------------------------
-print("\nHandling outliers using IQR method...")
-
+print("\nStreaming the dataset for medians and IQR outlier bounds...")
+
+# One mergeable quantile sketch per numerical column (modules/src/sketch.py)
+# over its raw values, plus missing counts, fed chunk by chunk: the full
+# frame is never in memory and no column is sorted. The imputer's medians
+# come from these sketches, and so do the IQR quantiles of the imputed
+# columns: imputation only adds each missing count's worth of copies of a
+# median, which update_repeated() adds without materializing them
+group_by = imputer["group_by"] if imputer is not None else IMPUTER_GROUP_BY
+quantile_k = QuantileSketch(error=QUANTILE_ERROR).k
+
+columns = None
+text_cols = set()
+sketches = {}
+missing = pd.Series(dtype=float)
+group_rows = {letter: 0 for letter in SPECTRAL_CLASSES}
+group_missing = {letter: pd.Series(dtype=float) for letter in SPECTRAL_CLASSES}
+group_sketches = {letter: {} for letter in SPECTRAL_CLASSES}
+category_counts = {}
+
+for chunk in pd.read_csv(INPUT_FILE, chunksize=CHUNK_ROWS):
+    if columns is None:
+        columns = chunk.columns
+    numeric = chunk.select_dtypes(include="number").columns
+    text_cols.update(chunk.columns.difference(numeric))
+
+    # Refitting: every numeric column is a candidate until a chunk shows
+    # text in it
+    sketched = imputer["columns"] if imputer is not None else numeric.difference(text_cols)
+    sketched = [c for c in chunk.columns if c in set(sketched)]
+    values = chunk[sketched].to_numpy(dtype=float, na_value=np.nan)
+    for j, col in enumerate(sketched):
+        sketches.setdefault(col, QuantileSketch(quantile_k)).update(values[:, j])
+    missing = missing.add(chunk[sketched].isna().sum(), fill_value=0)
+
+    if group_by == "spectral_class":
+        groups = spectral_classes(chunk)
+        for letter in SPECTRAL_CLASSES:
+            rows = groups == letter
+            group_rows[letter] += int(rows.sum())
+            group_missing[letter] = group_missing[letter].add(
+                chunk.loc[rows, sketched].isna().sum(), fill_value=0
+            )
+            if imputer is None:
+                for j, col in enumerate(sketched):
+                    group_sketches[letter].setdefault(col, QuantileSketch(quantile_k)).update(
+                        values[rows, j]
+                    )
+
+    for col in chunk.columns.difference(numeric):
+        category_counts[col] = category_counts.get(col, pd.Series(dtype=float)).add(
+            chunk[col].value_counts(), fill_value=0
+        )
+
+if imputer is None:
+    numerical = [c for c in columns if c in sketches and c not in text_cols]
+    imputer = imputer_from_sketches(
+        numerical, sketches, group_by=group_by,
+        group_sketches=group_sketches, group_rows=group_rows
+    )
+    imputer["data_sha256"] = data_sha256
+    save_imputer(imputer, IMPUTER_FILE)
+    print("Imputer fitted and saved:", IMPUTER_FILE)
+
+numerical_cols = pd.Index(imputer["columns"])
+
+# The imputed columns' sketches: raw values plus the filled medians, as
+# impute_frame() fills them (class medians first, then the global one)
 for col in numerical_cols:
-    Q1 = df[col].quantile(0.25)
-    Q3 = df[col].quantile(0.75)
+    filled = 0
+    if imputer["group_by"] == "spectral_class":
+        for letter, medians in imputer["group_medians"].items():
+            if col in medians:
+                count = group_missing[letter].get(col, 0)
+                sketches[col].update_repeated(medians[col], count)
+                filled += count
+    if col in imputer["medians"]:
+        sketches[col].update_repeated(imputer["medians"][col], missing.get(col, 0) - filled)
+
+bounds = {}
+for col in numerical_cols:
+    Q1, Q3 = sketches[col].quantile([0.25, 0.75])
     IQR = Q3 - Q1
-    lower = Q1 - 1.5 * IQR
-    upper = Q3 + 1.5 * IQR
-    df[col] = np.clip(df[col], lower, upper)
-
-print("Outliers capped.")
-
-# -------------------------------
-# Step 4: Encode categorical features (One-Hot Encoding)
-# -------------------------------
-print("\nEncoding categorical features (st_spectype)...")
+    bounds[col] = (Q1 - 1.5 * IQR, Q3 + 1.5 * IQR)
 
-df = pd.get_dummies(df, columns=["st_spectype"], drop_first=True)
+# Categorical columns are filled with their mode (ties: the smallest
+# value, as Series.mode()[0])
+categorical_modes = {}
+for col in columns:
+    counts = category_counts.get(col)
+    if col in text_cols and counts is not None and len(counts):
+        categorical_modes[col] = min(counts.index[counts == counts.max()])
 
-print("Categorical encoding completed.")
+print("Bounds computed.")
 
 # -------------------------------
-# Step 5: Habitability Score Index (HSI)
+# Step 3: Clean, score and write the dataset chunk by chunk
 # -------------------------------
-print("\nCreating Habitability Score Index...")
+print("\nCleaning and writing the dataset chunk by chunk...")
 
-df["habitability_score"] = (
-    (1 / (1 + abs(df["pl_rade"] - 1))) * 0.25 +
-    (1 / (1 + abs(df["pl_eqt"] - 288))) * 0.25 +
-    (1 / (1 + abs(df["pl_insol"] - 1))) * 0.25 +
-    (1 / (1 + abs(df["pl_orbeccen"]))) * 0.25
-)
-
-print("Habitability Score Index created.")
-
-# -------------------------------
-# Step 6: Stellar Compatibility Index (SCI)
-# -------------------------------
-print("\nCreating Stellar Compatibility Index...")
+# Min-max scaling as sklearn's MinMaxScaler fitted on the capped columns,
+# whose min / max are the sketches' exact min / max capped to the bounds
+scaling = {}
+for col in numerical_cols:
+    if not sketches[col].n:
+        continue
+    lower, upper = bounds[col]
+    data_min, data_max = np.clip([sketches[col].min, sketches[col].max], lower, upper)
+    data_range = data_max - data_min
+    scale = 1.0 / (data_range if data_range >= 10 * np.finfo(float).eps else 1.0)
+    scaling[col] = (scale, -data_min * scale)
 
-df["stellar_compatibility"] = (
-    (1 / (1 + abs(df["st_teff"] - 5778))) * 0.6 +
-    (1 / (1 + abs(df["st_mass"] - 1))) * 0.4
-)
+habitability_score = compile_score(SCORE_RULES["habitability_score"])
+stellar_compatibility = compile_score(SCORE_RULES["stellar_compatibility"])
 
-print("Stellar Compatibility Index created.")
+cleaned_file = os.path.join(OUTPUT_DIR, "cleaned_feature_engineered_dataset.csv")
+rows = 0
+spectype_codes = set()
+# describe() of the output: exact counts, sums and min / max, sketched
+# quartiles
+stats_cols = None
+stats_sums = stats_squares = None
+stats_sketches = {}
+# Share of missing values per block of HEATMAP_BLOCK_ROWS rows
+null_blocks = []
+
+for i, chunk in enumerate(pd.read_csv(INPUT_FILE, chunksize=CHUNK_ROWS)):
+    # Missing values: medians, then the categorical modes
+    chunk = impute_frame(chunk, imputer).fillna(categorical_modes)
+
+    # Outliers: IQR capping
+    for col, (lower, upper) in bounds.items():
+        chunk[col] = np.clip(chunk[col], lower, upper)
+
+    # "K1.5 IV-V" -> "K1": one short column instead of a dummy per spelling;
+    # module3 one-hot encodes it sparsely from the saved vocabulary
+    chunk["st_spectype"] = normalize_spectypes(chunk["st_spectype"])
+    spectype_codes.update(code for code in chunk["st_spectype"] if code is not None)
+
+    # HSI: Σ 0.25 / (1 + |x - Earth|) over pl_rade, pl_eqt, pl_insol, pl_orbeccen
+    chunk["habitability_score"] = habitability_score(chunk)
+    # SCI: 0.6 / (1 + |st_teff - 5778|) + 0.4 / (1 + |st_mass - 1|)
+    chunk["stellar_compatibility"] = stellar_compatibility(chunk)
+
+    for col, (scale, offset) in scaling.items():
+        chunk[col] = chunk[col] * scale + offset
+
+    if stats_cols is None:
+        stats_cols = chunk.select_dtypes(include="number").columns
+        stats_sums = np.zeros(len(stats_cols))
+        stats_squares = np.zeros(len(stats_cols))
+    values = chunk[stats_cols].to_numpy(dtype=float, na_value=np.nan)
+    stats_sums += np.nansum(values, axis=0)
+    stats_squares += np.nansum(values ** 2, axis=0)
+    for j, col in enumerate(stats_cols):
+        stats_sketches.setdefault(col, QuantileSketch(quantile_k)).update(values[:, j])
+
+    starts = np.arange(0, len(chunk), HEATMAP_BLOCK_ROWS)
+    block_rows = np.diff(np.append(starts, len(chunk)))
+    null_blocks.append(
+        np.add.reduceat(chunk.isnull().to_numpy(dtype=float), starts, axis=0) / block_rows[:, None]
+    )
+
+    chunk.to_csv(cleaned_file, mode="w" if i == 0 else "a", header=i == 0, index=False)
+    rows += len(chunk)
+
+print("Missing values handled, outliers capped, spectral types normalized,")
+print("HSI and SCI created, numerical features normalized:", rows, "rows")
 
 # -------------------------------
-# Step 7: Normalize numerical features
+# Step 4: Spectral type vocabulary
 # -------------------------------
-print("\nNormalizing numerical features...")
-
-scaler = MinMaxScaler()
-df[numerical_cols] = scaler.fit_transform(df[numerical_cols])
+save_vocabulary(fit_vocabulary(sorted(spectype_codes)), VOCABULARY_FILE)
 
-print("Normalization completed.")
+print("\nVocabulary saved:", VOCABULARY_FILE)
 
 # -------------------------------
-# Step 8: Data validation using statistics
+# Step 5: Data validation using statistics
 # -------------------------------
 print("\nSaving descriptive statistics...")
 
+# The layout of DataFrame.describe()
+stats = {}
+for j, col in enumerate(stats_cols):
+    sketch = stats_sketches[col]
+    n = sketch.n
+    mean = stats_sums[j] / n if n else np.nan
+    std = np.sqrt(max(stats_squares[j] - n * mean ** 2, 0.0) / (n - 1)) if n > 1 else np.nan
+    stats[col] = [n, mean, std, *(sketch.quantile([0, 0.25, 0.5, 0.75, 1]) if n else [np.nan] * 5)]
+
 stats_file = os.path.join(OUTPUT_DIR, "module2_statistics.txt")
 with open(stats_file, "w") as f:
-    f.write(str(df.describe()))
+    f.write(str(pd.DataFrame(
+        stats, index=["count", "mean", "std", "min", "25%", "50%", "75%", "max"], dtype=float
+    )))
 
 print("Statistics saved.")
 
 # -------------------------------
-# Step 9: Data validation using visualization
+# Step 6: Data validation using visualization
 # -------------------------------
 print("\nGenerating validation visualizations...")
 
-# Missing values heatmap
+# Missing values heatmap, one row per block of rows
 plt.figure(figsize=(10, 4))
-sns.heatmap(df.isnull(), cbar=False)
+sns.heatmap(pd.DataFrame(np.vstack(null_blocks), columns=chunk.columns), cbar=False)
 plt.title("Missing Values Heatmap")
 plt.tight_layout()
 plt.savefig(os.path.join(OUTPUT_DIR, "missing_values_heatmap.png"))
 plt.close()
 
-# Distribution of Habitability Score
+# Distribution of Habitability Score, from its sketch's weighted items
+items, weights = stats_sketches["habitability_score"].weighted_items()
 plt.figure(figsize=(6, 4))
-sns.histplot(df["habitability_score"], bins=30, kde=True)
+sns.histplot(x=items, weights=weights, bins=30, kde=True)
 plt.title("Habitability Score Distribution")
 plt.tight_layout()
 plt.savefig(os.path.join(OUTPUT_DIR, "habitability_score_distribution.png"))
@@ -131,11 +276,5 @@ plt.close()
 
 print("Visualizations saved.")
 
-# -------------------------------
-# Step 10: Save cleaned dataset
-# -------------------------------
-cleaned_file = os.path.join(OUTPUT_DIR, "cleaned_feature_engineered_dataset.csv")
-df.to_csv(cleaned_file, index=False)
-
 print("\nCleaned dataset saved to:", cleaned_file)
 print("\n✅ Module 2: Data Cleaning & Feature Engineering COMPLETED SUCCESSFULLY")
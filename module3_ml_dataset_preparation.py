@@ -1,6 +1,7 @@
 import pandas as pd
 import numpy as np
 import os
+from scipy import sparse
 
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
@@ -8,127 +9,184 @@ from sklearn.pipeline import Pipeline
 from sklearn.compose import ColumnTransformer
 from sklearn.feature_selection import SelectKBest, f_classif
 
+from modules.src.manifest import fingerprint
+from modules.src.sketch import sketch_columns
+from modules.src.spectype import SpectypeEncoder, load_vocabulary
+from modules.src.training.cache import cached_dataset
+
 # -------------------------------
 # Configuration
 # -------------------------------
 INPUT_FILE = os.path.join("outputs", "cleaned_feature_engineered_dataset.csv")
 OUTPUT_DIR = "outputs"
+VOCABULARY_FILE = os.path.join(OUTPUT_DIR, "spectype_vocabulary.json")
+# Median of habitability_score: sketch rank error and rows per block
+# (exact up to 3 / QUANTILE_ERROR rows, as in module2)
+QUANTILE_ERROR = float(os.getenv("QUANTILE_ERROR", 0.0005))
+QUANTILE_CHUNK_ROWS = 100_000
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-print("\n📌 Module 3: Machine Learning Dataset Preparation\n")
-
-# -------------------------------
-# Step 1: Load cleaned dataset
-# -------------------------------
-df = pd.read_csv(INPUT_FILE)
-print("Dataset loaded:", df.shape)
-
-# -------------------------------
-# Step 2: Define target variable
-# -------------------------------
-print("\nDefining target variable (Habitability Class)...")
-
-# Binary classification based on habitability score
-df["habitability_class"] = np.where(
-    df["habitability_score"] >= df["habitability_score"].median(),
-    1,  # Habitable
-    0   # Non-Habitable
-)
-
-print("Target variable created.")
-
-# -------------------------------
-# Step 3: Feature selection based on domain relevance
-# -------------------------------
-print("\nSelecting relevant features...")
-
-target = "habitability_class"
-
-# Drop non-ML columns
-drop_cols = [
-    target,
-    "habitability_score"  # Used only for labeling
-]
-
-X = df.drop(columns=drop_cols)
-y = df[target]
-
-print("Features shape:", X.shape)
-print("Target shape:", y.shape)
-
-# -------------------------------
-# Step 4: Identify numerical & categorical features
-# -------------------------------
-numerical_features = X.select_dtypes(include=["float64", "int64"]).columns.tolist()
-categorical_features = X.select_dtypes(include=["uint8", "bool"]).columns.tolist()
-
-print("Numerical features:", len(numerical_features))
-print("Categorical features:", len(categorical_features))
+# Everything the prepared matrices depend on besides the input file: a
+# change here (or in the data) prepares a new cache entry, otherwise the
+# cached one is reused (modules/src/training/cache.py)
+CONFIG = {
+    "target": "habitability_score >= median",
+    "quantile_error": QUANTILE_ERROR,
+    "test_size": 0.2,
+    "random_state": 42,
+    "k_best": 15,
+    "vocabulary_sha256": fingerprint(VOCABULARY_FILE)[0]
+}
 
-# -------------------------------
-# Step 5: Preprocessing pipelines
-# -------------------------------
-print("\nCreating preprocessing pipelines...")
-
-numeric_pipeline = Pipeline(
-    steps=[
-        ("scaler", StandardScaler()),
-        ("feature_selection", SelectKBest(score_func=f_classif, k=15))
-    ]
-)
+print("\n📌 Module 3: Machine Learning Dataset Preparation\n")
 
-categorical_pipeline = Pipeline(
-    steps=[
-        ("scaler", StandardScaler(with_mean=False))
-    ]
-)
 
-preprocessor = ColumnTransformer(
-    transformers=[
-        ("num", numeric_pipeline, numerical_features),
-        ("cat", categorical_pipeline, categorical_features)
+def prepare(data_path, config):
+    """
+    Label, split and preprocess the cleaned dataset (cache miss only).
+    """
+    # -------------------------------
+    # Step 1: Median habitability score
+    # -------------------------------
+    # Sketched from the one column streamed in chunks, before the full
+    # frame is loaded
+    chunks = pd.read_csv(data_path, usecols=["habitability_score"], chunksize=QUANTILE_CHUNK_ROWS)
+    median_score = sketch_columns(chunks, ["habitability_score"], error=config["quantile_error"])[
+        "habitability_score"
+    ].quantile(0.5)
+
+    # -------------------------------
+    # Step 2: Load cleaned dataset, define target variable
+    # -------------------------------
+    df = pd.read_csv(data_path)
+    print("Dataset loaded:", df.shape)
+
+    print("\nDefining target variable (Habitability Class)...")
+
+    # Binary classification based on habitability score
+
+    df["habitability_class"] = np.where(
+        df["habitability_score"] >= median_score,
+        1,  # Habitable
+        0   # Non-Habitable
+    )
+
+    print("Target variable created.")
+
+    # -------------------------------
+    # Step 3: Feature selection based on domain relevance
+    # -------------------------------
+    print("\nSelecting relevant features...")
+
+    target = "habitability_class"
+
+    # Drop non-ML columns
+    drop_cols = [
+        target,
+        "habitability_score"  # Used only for labeling
     ]
-)
-
-print("Pipelines created.")
-
-# -------------------------------
-# Step 6: Train-test split (80:20)
-# -------------------------------
-print("\nSplitting dataset (80:20)...")
-
-X_train, X_test, y_train, y_test = train_test_split(
-    X,
-    y,
-    test_size=0.2,
-    random_state=42,
-    stratify=y
-)
-
-print("Training set:", X_train.shape)
-print("Testing set:", X_test.shape)
-
-# -------------------------------
-# Step 7: Apply preprocessing
-# -------------------------------
-print("\nApplying preprocessing pipeline...")
-
-X_train_processed = preprocessor.fit_transform(X_train, y_train)
-X_test_processed = preprocessor.transform(X_test)
-
-print("Processed training shape:", X_train_processed.shape)
-print("Processed testing shape:", X_test_processed.shape)
-
-# -------------------------------
-# Step 8: Save prepared datasets
-# -------------------------------
-print("\nSaving prepared datasets...")
-
-np.save(os.path.join(OUTPUT_DIR, "X_train.npy"), X_train_processed)
-np.save(os.path.join(OUTPUT_DIR, "X_test.npy"), X_test_processed)
-np.save(os.path.join(OUTPUT_DIR, "y_train.npy"), y_train.values)
-np.save(os.path.join(OUTPUT_DIR, "y_test.npy"), y_test.values)
 
-print("Datasets saved.")
+    X = df.drop(columns=drop_cols)
+    y = df[target]
+
+    print("Features shape:", X.shape)
+    print("Target shape:", y.shape)
+
+    # -------------------------------
+    # Step 4: Identify numerical & categorical features
+    # -------------------------------
+    numerical_features = X.select_dtypes(include=["float64", "int64"]).columns.tolist()
+    # Normalized spectral type (module2), one-hot encoded sparsely below
+    categorical_features = [c for c in ["st_spectype"] if c in X]
+
+    print("Numerical features:", len(numerical_features))
+    print("Categorical features:", len(categorical_features))
+
+    # -------------------------------
+    # Step 5: Preprocessing pipelines
+    # -------------------------------
+    print("\nCreating preprocessing pipelines...")
+
+    numeric_pipeline = Pipeline(
+        steps=[
+            ("scaler", StandardScaler()),
+            ("feature_selection", SelectKBest(score_func=f_classif, k=config["k_best"]))
+        ]
+    )
+
+    categorical_pipeline = Pipeline(
+        steps=[
+            ("encoder", SpectypeEncoder(vocabulary=load_vocabulary(VOCABULARY_FILE))),
+            ("scaler", StandardScaler(with_mean=False))
+        ]
+    )
+
+    # sparse_threshold=1: keep the output CSR whatever the overall density
+    preprocessor = ColumnTransformer(
+        transformers=[
+            ("num", numeric_pipeline, numerical_features),
+            ("cat", categorical_pipeline, categorical_features)
+        ],
+        sparse_threshold=1.0
+    )
+
+    print("Pipelines created.")
+
+    # -------------------------------
+    # Step 6: Train-test split (80:20)
+    # -------------------------------
+    print("\nSplitting dataset (80:20)...")
+
+    X_train, X_test, y_train, y_test = train_test_split(
+        X,
+        y,
+        test_size=config["test_size"],
+        random_state=config["random_state"],
+        stratify=y
+    )
+
+    print("Training set:", X_train.shape)
+    print("Testing set:", X_test.shape)
+
+    # -------------------------------
+    # Step 7: Apply preprocessing
+    # -------------------------------
+    print("\nApplying preprocessing pipeline...")
+
+    X_train_processed = preprocessor.fit_transform(X_train, y_train)
+    X_test_processed = preprocessor.transform(X_test)
+
+    print("Processed training shape:", X_train_processed.shape)
+    print("Processed testing shape:", X_test_processed.shape)
+
+    return {
+        "arrays": {
+            "X_train": sparse.csr_matrix(X_train_processed),
+            "X_test": sparse.csr_matrix(X_test_processed),
+            "y_train": y_train.to_numpy(),
+            "y_test": y_test.to_numpy()
+        },
+        "preprocessor": preprocessor,
+        "info": {
+            "numerical_features": numerical_features,
+            "categorical_features": categorical_features,
+            "median_score": float(median_score)
+        }
+    }
+
+
+# -------------------------------
+# Step 8: Prepared dataset (cached)
+# -------------------------------
+# Sparse CSR (spectral indicators) and labels as memory-mappable .npy files
+# in outputs/dataset_cache/<key>/ with the fitted preprocessor; training
+# opens them with modules.src.training.cache.open_dataset
+dataset, hit = cached_dataset(INPUT_FILE, CONFIG, prepare)
+
+if hit:
+    print("📦 Prepared dataset reused from cache (no parsing / preprocessing)")
+print("Training set:", dataset["arrays"]["X_train"].shape)
+print("Testing set:", dataset["arrays"]["X_test"].shape)
+print("💾 Prepared dataset:", dataset["path"])
 
 print("\n✅ Module 3: Machine Learning Dataset Preparation COMPLETED SUCCESSFULLY")
@@ -1,5 +1,6 @@
 import pandas as pd
-import numpy as np
+
+from modules.src.rules import LABEL_RULES, compile_label
 
 # Load merged dataset
 df = pd.read_csv("outputs/merged_dataset.csv")
@@ -7,13 +8,8 @@ df = pd.read_csv("outputs/merged_dataset.csv")
 # -----------------------------
 # HABITABILITY LOGIC
 # -----------------------------
-df["habitability"] = np.where(
-    (df["pl_eqt"].between(180, 300)) &
-    (df["pl_rade"] <= 2.0) &
-    (df["pl_insol"].between(0.25, 2.0)),
-    1,
-    0
-)
+# pl_eqt 180–300 K, pl_rade ≤ 2 R⊕, pl_insol 0.25–2 S⊕ (see modules/src/rules.py)
+df["habitability"] = compile_label(LABEL_RULES["habitability"])(df)
 
 print("\nHabitability Distribution:")
 print(df["habitability"].value_counts())
@@ -7,6 +7,8 @@
 # 4. Stratified Cross-Validation
 # ============================================================
 
+import time
+
 import pandas as pd
 import numpy as np
 
@@ -15,7 +17,8 @@ from sklearn.model_selection import (
     StratifiedKFold,
     cross_validate
 )
-from sklearn.preprocessing import StandardScaler, OneHotEncoder
+from sklearn.preprocessing import StandardScaler
+from sklearn.base import clone
 from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
 from sklearn.impute import SimpleImputer
@@ -31,57 +34,122 @@ from sklearn.metrics import (
 
 from sklearn.utils import resample
 
+from modules.src.imputation import fit_imputer, save_imputer
+from modules.src.manifest import write_manifest
+from modules.src.spectype import SpectypeEncoder, save_vocabulary
+from modules.src.training.arrays import read_rows
+from modules.src.training.cache import cached_dataset
+
+TRAIN_START = time.perf_counter()
+
 # ------------------------------------------------------------
-# 1. LOAD DATA
+# 1. PREPARED DATASET (CACHED)
 # ------------------------------------------------------------
 DATA_PATH = "outputs/merged_with_target.csv"
 TARGET = "habitability"
 
-df = pd.read_csv(DATA_PATH)
+# What the prepared matrices depend on besides the CSV itself; the same
+# data and config reuse the cached split, fitted preprocessor and
+# matrices (modules/src/training/cache.py) without parsing the CSV
+CONFIG = {
+    "target": TARGET,
+    "test_size": 0.25,
+    "random_state": 42,
+    "numeric": "median imputer + standard scaler",
+    "categorical": "most frequent imputer + spectype encoder"
+}
 
-print("\nDataset loaded:", df.shape)
-print("\nClass Distribution:")
-print(df[TARGET].value_counts())
 
-# ------------------------------------------------------------
-# 2. FEATURE SEPARATION
-# ------------------------------------------------------------
-X = df.drop(columns=[TARGET])
-y = df[TARGET]
+def build_preprocessor(num_features, cat_features):
+    numeric_pipeline = Pipeline([
+        ("imputer", SimpleImputer(strategy="median")),
+        ("scaler", StandardScaler())
+    ])
 
-num_features = X.select_dtypes(include=["int64", "float64"]).columns
-cat_features = X.select_dtypes(include=["object"]).columns
+    # st_spectype -> sparse class / subclass indicators (modules/src/spectype.py)
+    # instead of one column per raw spelling
+    categorical_pipeline = Pipeline([
+        ("imputer", SimpleImputer(strategy="most_frequent")),
+        ("spectype", SpectypeEncoder())
+    ])
 
-# ------------------------------------------------------------
-# 3. PREPROCESSING PIPELINE (NO DATA LEAKAGE)
-# ------------------------------------------------------------
-numeric_pipeline = Pipeline([
-    ("imputer", SimpleImputer(strategy="median")),
-    ("scaler", StandardScaler())
-])
+    # sparse_threshold=1: the model is trained on the CSR matrix as is
+    return ColumnTransformer([
+        ("num", numeric_pipeline, num_features),
+        ("cat", categorical_pipeline, cat_features)
+    ], sparse_threshold=1.0)
 
-categorical_pipeline = Pipeline([
-    ("imputer", SimpleImputer(strategy="most_frequent")),
-    ("onehot", OneHotEncoder(handle_unknown="ignore"))
-])
 
-preprocessor = ColumnTransformer([
-    ("num", numeric_pipeline, num_features),
-    ("cat", categorical_pipeline, cat_features)
-])
+def prepare(data_path, config):
+    """
+    Parse, split (stratified) and preprocess; runs on a cache miss only.
+    The preprocessor is fitted on the training split alone.
+    """
+    df = pd.read_csv(data_path)
+    X = df.drop(columns=[config["target"]])
+    y = df[config["target"]]
 
-# ------------------------------------------------------------
-# 4. TRAIN–TEST SPLIT (STRATIFIED)
-# ------------------------------------------------------------
-X_train, X_test, y_train, y_test = train_test_split(
-    X, y,
-    test_size=0.25,
-    stratify=y,
-    random_state=42
-)
+    num_features = X.select_dtypes(include=["int64", "float64"]).columns.tolist()
+    cat_features = X.select_dtypes(include=["object"]).columns.tolist()
+
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y,
+        test_size=config["test_size"],
+        stratify=y,
+        random_state=config["random_state"]
+    )
+
+    preprocessor = build_preprocessor(num_features, cat_features).fit(X_train)
+
+    return {
+        "arrays": {
+            "X_train": preprocessor.transform(X_train),
+            "X_test": preprocessor.transform(X_test),
+            "X_full": preprocessor.transform(X),
+            "y_train": y_train.to_numpy(),
+            "y_test": y_test.to_numpy(),
+            "train_rows": np.asarray(X_train.index)
+        },
+        "preprocessor": preprocessor,
+        "frame": df,
+        "info": {"num_features": num_features, "cat_features": cat_features}
+    }
+
+
+dataset, cache_hit = cached_dataset(DATA_PATH, CONFIG, prepare)
+arrays = dataset["arrays"]
+preprocessor = dataset["preprocessor"]
+df = dataset["frame"]
+num_features = dataset["info"]["num_features"]
+
+
+def load(name):
+    # Memory-mapped on disk -> in-memory array / CSR for scikit-learn
+    return read_rows(arrays[name], 0, arrays[name].shape[0])
+
+
+X_train, X_test = load("X_train"), load("X_test")
+y_train, y_test = load("y_train"), load("y_test")
+
+# Raw (untransformed) training rows for cross-validation: every fold
+# refits its own preprocessor, so no validation fold leaks into it
+X_train_raw = df.loc[load("train_rows")].drop(columns=[TARGET])
+
+
+def cv_pipeline(classifier):
+    return Pipeline([
+        ("preprocessing", clone(preprocessor)),
+        ("classifier", clone(classifier))
+    ])
+
+
+print("\nDataset loaded:", df.shape, "(prepared dataset from cache)" if cache_hit else "")
+print("Prepared dataset:", dataset["path"])
+print("\nClass Distribution:")
+print(df[TARGET].value_counts())
 
 # ------------------------------------------------------------
-# 5. CROSS-VALIDATION SETUP
+# 2. CROSS-VALIDATION SETUP
 # ------------------------------------------------------------
 cv = StratifiedKFold(n_splits=5, shuffle=True, random_state=42)
 
@@ -100,20 +168,20 @@ scoring = {
 print("\nMODEL PERFORMANCE – PRIMARY MODEL (Class Weight + Regularization)")
 print("=" * 70)
 
-primary_model = Pipeline([
-    ("preprocessing", preprocessor),
-    ("classifier", LogisticRegression(
-        C=0.1,
-        max_iter=1000,
-        class_weight={0: 1, 1: 15},
-        solver="liblinear"
-    ))
-])
+# The preprocessor comes fitted (on the training split only) from the
+# cache: the final fit and the test set use the cached matrices, the
+# folds below refit preprocessing per fold on the raw rows
+primary_classifier = LogisticRegression(
+    C=0.1,
+    max_iter=1000,
+    class_weight={0: 1, 1: 15},
+    solver="liblinear"
+)
 
 # ---- Cross Validation ----
 cv_results = cross_validate(
-    primary_model,
-    X_train,
+    cv_pipeline(primary_classifier),
+    X_train_raw,
     y_train,
     cv=cv,
     scoring=scoring,
@@ -125,19 +193,27 @@ for metric in scoring:
     print(f"{metric.capitalize():10s}: {cv_results[f'test_{metric}'].mean():.3f}")
 
 # ---- Train final model ----
-primary_model.fit(X_train, y_train)
+primary_classifier.fit(X_train, y_train)
 
 # ---- Threshold Tuning ----
 THRESHOLD = 0.65
-y_prob = primary_model.predict_proba(X_test)[:, 1]
+y_prob = primary_classifier.predict_proba(X_test)[:, 1]
 y_pred = (y_prob >= THRESHOLD).astype(int)
 
+test_metrics = {
+    "accuracy": accuracy_score(y_test, y_pred),
+    "precision": precision_score(y_test, y_pred, zero_division=0),
+    "recall": recall_score(y_test, y_pred),
+    "f1": f1_score(y_test, y_pred),
+    "roc_auc": roc_auc_score(y_test, y_prob)
+}
+
 print("\nThreshold used:", THRESHOLD)
-print("Accuracy :", accuracy_score(y_test, y_pred))
-print("Precision:", precision_score(y_test, y_pred, zero_division=0))
-print("Recall   :", recall_score(y_test, y_pred))
-print("F1 Score :", f1_score(y_test, y_pred))
-print("ROC-AUC  :", roc_auc_score(y_test, y_prob))
+print("Accuracy :", test_metrics["accuracy"])
+print("Precision:", test_metrics["precision"])
+print("Recall   :", test_metrics["recall"])
+print("F1 Score :", test_metrics["f1"])
+print("ROC-AUC  :", test_metrics["roc_auc"])
 
 # ============================================================
 # BASELINE MODEL – RANDOM UNDER-SAMPLING
@@ -146,10 +222,9 @@ print("ROC-AUC  :", roc_auc_score(y_test, y_prob))
 print("\n\nMODEL PERFORMANCE – BASELINE (Under-sampling)")
 print("=" * 70)
 
-df_train = pd.concat([X_train, y_train], axis=1)
-
-minority = df_train[df_train[TARGET] == 1]
-majority = df_train[df_train[TARGET] == 0]
+# Row indices of the prepared training matrix, majority class down-sampled
+minority = np.flatnonzero(y_train == 1)
+majority = np.flatnonzero(y_train == 0)
 
 majority_downsampled = resample(
     majority,
@@ -158,24 +233,21 @@ majority_downsampled = resample(
     random_state=42
 )
 
-df_balanced = pd.concat([majority_downsampled, minority])
+balanced = np.concatenate([majority_downsampled, minority])
 
-X_bal = df_balanced.drop(columns=[TARGET])
-y_bal = df_balanced[TARGET]
+X_bal = X_train[balanced]
+y_bal = y_train[balanced]
 
-baseline_model = Pipeline([
-    ("preprocessing", preprocessor),
-    ("classifier", LogisticRegression(
-        C=1.0,
-        max_iter=1000,
-        solver="liblinear"
-    ))
-])
+baseline_model = LogisticRegression(
+    C=1.0,
+    max_iter=1000,
+    solver="liblinear"
+)
 
 # ---- Cross Validation (Baseline) ----
 cv_base = cross_validate(
-    baseline_model,
-    X_bal,
+    cv_pipeline(baseline_model),
+    X_train_raw.iloc[balanced],
     y_bal,
     cv=cv,
     scoring=scoring,
@@ -209,19 +281,13 @@ print("✔ No overfitting")
 print("✔ No data leakage")
 print("✔ Imbalance handled correctly")
 
-# FORCE re-fit to avoid stale state
+# Saved / served as one pipeline over raw columns: the cached, fitted
+# preprocessor followed by the classifier trained above
 primary_model = Pipeline([
     ("preprocessing", preprocessor),
-    ("classifier", LogisticRegression(
-        C=0.1,
-        max_iter=1000,
-        class_weight={0: 1, 1: 15},
-        solver="liblinear"
-    ))
+    ("classifier", primary_classifier)
 ])
 
-primary_model.fit(X_train, y_train)
-
 # ============================================================
 # FINAL HABITABILITY RANKING — PIPELINE SAFE
 # ============================================================
@@ -229,11 +295,9 @@ primary_model.fit(X_train, y_train)
 print("\nGENERATING HABITABILITY RANKING")
 print("=" * 60)
 
-# IMPORTANT: RAW DATA ONLY (NO preprocessing here)
-X_full = df.drop(columns=[TARGET])
-
-# 🔥 THIS LINE IS THE FIX — USE THE PIPELINE
-habitability_scores = primary_model.predict_proba(X_full)[:, 1]
+# Every row went through the same fitted preprocessor when the dataset
+# was prepared (X_full), so no preprocessing happens here
+habitability_scores = primary_classifier.predict_proba(load("X_full"))[:, 1]
 
 ranking_df = df.copy()
 ranking_df["habitability_score"] = habitability_scores
@@ -258,3 +322,37 @@ import joblib
 
 joblib.dump(primary_model, "model/habitability_model.pkl")
 print("✅ Model saved successfully")
+
+# Sidecar manifest: what this artifact was trained on (see modules/src/manifest.py)
+import sklearn
+
+manifest = write_manifest(
+    "model/habitability_model.pkl",
+    data={**dataset["meta"]["data"], "rows": len(df)},
+    features=[c for c in df.columns if c != TARGET],
+    target=TARGET,
+    threshold=THRESHOLD,
+    params=primary_model.named_steps["classifier"].get_params(),
+    metrics={
+        "cv": {m: float(cv_results[f"test_{m}"].mean()) for m in scoring},
+        "test": {m: float(v) for m, v in test_metrics.items()}
+    },
+    libraries={"sklearn": sklearn.__version__, "pandas": pd.__version__, "numpy": np.__version__},
+    training_seconds=round(time.perf_counter() - TRAIN_START, 3)
+)
+print("✅ Manifest saved: model/habitability_model.manifest.json (" + manifest["version"] + ")")
+
+# Spectral type vocabulary of the saved pipeline (columns of the encoding)
+save_vocabulary(
+    primary_model.named_steps["preprocessing"].named_transformers_["cat"]
+    .named_steps["spectype"].vocabulary_,
+    "model/spectype_vocabulary.json"
+)
+print("✅ Vocabulary saved: model/spectype_vocabulary.json")
+
+# Serving-time imputer: medians of the training split, per spectral class
+save_imputer(
+    fit_imputer(df.loc[load("train_rows")], num_features, group_by="spectral_class"),
+    "model/imputer.json"
+)
+print("✅ Imputer saved: model/imputer.json")
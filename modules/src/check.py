@@ -1,14 +1,257 @@
+"""
+Data-quality profile of a catalog CSV in one chunked, parallel pass.
+
+For every column:
+
+    nulls / null_fraction        exact
+    min / max / mean             exact (numeric columns)
+    quantiles                    KLL sketch (modules/src/sketch.py)
+    distinct                     HyperLogLog estimate
+
+The main process parses the CSV in chunks and hands them to a spawned
+process pool (at most two chunks per worker in flight, as in
+backend/rescore.py); each worker returns small per-column partials that
+are merged here, so memory is bounded by the chunk size.
+
+The report is JSON and keyed on the data's SHA-256 (manifest.fingerprint):
+re-running against an unchanged file with the same options returns the
+saved report without profiling again, and two reports (e.g. of two dataset
+versions) can be diffed column by column.
+
+Usage:
+    python check.py [DATA.csv] [--out report.json] [--workers N] [--chunk ROWS]
+                    [--plot nulls.png] [--diff old_report.json]
+"""
+
+import argparse
+import json
+import multiprocessing as mp
+import os
+import sys
+import time
+from collections import deque
+
 import pandas as pd
-import matplotlib.pyplot as plt
-
-
-df = pd.read_csv("data/Exoplanet_dataset.csv")
-null_counts = df.isna().sum()
-plt.figure()
-null_counts.plot(kind='bar')
-plt.title("Null Values in Raw Exoplanet Dataset")
-plt.xlabel("Features")
-plt.ylabel("Number of Null Values")
-plt.xticks(rotation=90)
-plt.tight_layout()
-plt.show()
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+
+from modules.src.manifest import data_section, fingerprint  # noqa: E402
+from modules.src.sketch import DistinctSketch, QuantileSketch  # noqa: E402
+
+DEFAULT_DATA = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "data", "scrap", "Exoplanet_dataset.csv"
+)
+
+QUANTILES = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+SKETCH_K = 200
+HLL_PRECISION = 14
+
+# -------------------------------------------------
+# PER-CHUNK PARTIALS
+# -------------------------------------------------
+
+def profile_chunk(chunk):
+    """
+    {column: partial} for one DataFrame chunk. Runs in the worker processes.
+    """
+    partials = {}
+    for name in chunk.columns:
+        column = chunk[name]
+        values = column.dropna().to_numpy()
+        numeric = pd.api.types.is_numeric_dtype(column.dtype)
+
+        partial = {
+            "rows": len(column),
+            "nulls": len(column) - len(values),
+            # A chunk with no values says nothing about the column's type
+            "kind": None if not len(values) else "numeric" if numeric else "text",
+            "distinct": DistinctSketch(HLL_PRECISION).update(values)
+        }
+        if partial["kind"] == "numeric":
+            values = values.astype(float)
+            partial["sum"] = float(values.sum())
+            partial["quantiles"] = QuantileSketch(SKETCH_K).update(values)
+        partials[name] = partial
+    return partials
+
+
+def merge_partials(total, partials):
+    for name, partial in partials.items():
+        current = total.get(name)
+        if current is None:
+            total[name] = partial
+            continue
+
+        current["rows"] += partial["rows"]
+        current["nulls"] += partial["nulls"]
+        current["distinct"].merge(partial["distinct"])
+
+        kinds = {current["kind"], partial["kind"]} - {None}
+        if len(kinds) > 1:
+            # Numbers in some chunks, text in others: report it as text
+            current["kind"] = "text"
+            current.pop("sum", None)
+            current.pop("quantiles", None)
+        elif partial["kind"] == "numeric":
+            if current["kind"] is None:
+                current.update(kind="numeric", sum=0.0, quantiles=QuantileSketch(SKETCH_K))
+            current["sum"] += partial["sum"]
+            current["quantiles"].merge(partial["quantiles"])
+    return total
+
+
+def profiled(chunks, workers=1):
+    """
+    Yield the partials of every chunk, in-process or across a spawned pool.
+    """
+    if workers <= 1:
+        for chunk in chunks:
+            yield profile_chunk(chunk)
+        return
+
+    ctx = mp.get_context("spawn")
+    with ctx.Pool(workers) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.apply_async(profile_chunk, (chunk,)))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
+
+# -------------------------------------------------
+# REPORT
+# -------------------------------------------------
+
+def _column_report(partial):
+    report = {
+        "kind": partial["kind"] or "empty",
+        "nulls": partial["nulls"],
+        "null_fraction": round(partial["nulls"] / partial["rows"], 6) if partial["rows"] else 0.0,
+        "distinct": partial["distinct"].estimate()
+    }
+    if partial["kind"] == "numeric":
+        sketch = partial["quantiles"]
+        report.update({
+            "min": sketch.min,
+            "max": sketch.max,
+            "mean": partial["sum"] / sketch.n,
+            "quantiles": {
+                f"p{round(q * 100):02d}": float(v)
+                for q, v in zip(QUANTILES, sketch.quantile(list(QUANTILES)))
+            }
+        })
+    return report
+
+
+def options(chunk_rows):
+    # Inputs that change the numbers; a saved report is reused only if equal
+    return {"chunk_rows": chunk_rows, "sketch_k": SKETCH_K, "hll_precision": HLL_PRECISION,
+            "quantiles": list(QUANTILES)}
+
+
+def profile(path, chunk_rows=50_000, workers=1):
+    start = time.perf_counter()
+
+    total = {}
+    chunks = pd.read_csv(path, chunksize=chunk_rows, low_memory=False)
+    for partials in profiled(chunks, workers):
+        merge_partials(total, partials)
+
+    rows = next(iter(total.values()))["rows"] if total else 0
+    return {
+        "data": data_section(path, rows),
+        "options": options(chunk_rows),
+        "columns": {name: _column_report(p) for name, p in total.items()},
+        "profiled_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "seconds": round(time.perf_counter() - start, 3)
+    }
+
+
+def profile_cached(path, report_path, chunk_rows=50_000, workers=1):
+    """
+    The saved report at `report_path` if it was made from the same bytes
+    with the same options, else a fresh profile (saved there).
+    """
+    if os.path.exists(report_path):
+        with open(report_path) as f:
+            saved = json.load(f)
+        if (saved.get("data", {}).get("sha256") == fingerprint(path)[0]
+                and saved.get("options") == options(chunk_rows)):
+            return saved, True
+
+    report = profile(path, chunk_rows, workers)
+    with open(report_path, "w") as f:
+        json.dump(report, f, indent=2)
+    return report, False
+
+
+def diff_reports(old, new):
+    """
+    {column: {field: [old, new]}} for every changed value, plus columns
+    only present on one side.
+    """
+    changes = {}
+    old_cols, new_cols = old["columns"], new["columns"]
+    for name in sorted(set(old_cols) | set(new_cols)):
+        a, b = old_cols.get(name), new_cols.get(name)
+        if a is None or b is None:
+            changes[name] = {"column": ["absent" if a is None else "present",
+                                        "absent" if b is None else "present"]}
+            continue
+
+        flat_a = {**a, **{f"quantiles.{k}": v for k, v in a.get("quantiles", {}).items()}}
+        flat_b = {**b, **{f"quantiles.{k}": v for k, v in b.get("quantiles", {}).items()}}
+        fields = {
+            field: [flat_a.get(field), flat_b.get(field)]
+            for field in sorted(set(flat_a) | set(flat_b))
+            if field != "quantiles" and flat_a.get(field) != flat_b.get(field)
+        }
+        if fields:
+            changes[name] = fields
+    return changes
+
+
+def plot_nulls(report, path):
+    # Headless: render straight to a file, never open a window
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    null_counts = pd.Series({name: c["nulls"] for name, c in report["columns"].items()})
+    plt.figure()
+    null_counts.plot(kind='bar')
+    plt.title("Null Values in Raw Exoplanet Dataset")
+    plt.xlabel("Features")
+    plt.ylabel("Number of Null Values")
+    plt.xticks(rotation=90)
+    plt.tight_layout()
+    plt.savefig(path)
+    plt.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Profile a catalog CSV")
+    parser.add_argument("data", nargs="?", default=DEFAULT_DATA)
+    parser.add_argument("--out", help="report path (reused when the data is unchanged)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk", type=int, default=50_000, help="rows per chunk")
+    parser.add_argument("--plot", help="save the null-count bar chart here")
+    parser.add_argument("--diff", help="compare against an earlier report")
+    args = parser.parse_args()
+
+    if args.out:
+        report, cached = profile_cached(args.data, args.out, args.chunk, args.workers)
+        print(("📋 Cached report: " if cached else "💾 Saved: ") + args.out, file=sys.stderr)
+    else:
+        report = profile(args.data, args.chunk, args.workers)
+
+    if args.plot:
+        plot_nulls(report, args.plot)
+        print("💾 Saved:", args.plot, file=sys.stderr)
+
+    if args.diff:
+        with open(args.diff) as f:
+            print(json.dumps(diff_reports(json.load(f), report), indent=2))
+    elif not args.out:
+        print(json.dumps(report, indent=2))
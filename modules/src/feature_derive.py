@@ -1,28 +1,235 @@
-import pandas as pd
+"""
+Physics-based derived features, fully vectorized with NumPy.
+
+Every function takes scalars or arrays (NumPy arrays, pandas Series) and
+broadcasts, so the same code derives features for the whole catalog during
+training and for a single planet at request time.
+
+Units follow the NASA Exoplanet Archive conventions:
+    stellar radius / mass / luminosity  → solar units
+    stellar temperature, T_eq           → Kelvin
+    semi-major axis                     → AU
+    orbital period                      → days
+    insolation flux                     → Earth flux (S⊕)
+    density                             → g/cm³
+
+Usage:
+    python feature_derive.py [catalog.csv]
+"""
+
+import sys
+
+import numpy as np
+
+T_SUN = 5772.0              # K, IAU nominal solar effective temperature
+R_SUN_AU = 0.00465047       # solar radius in AU
+DAYS_PER_YEAR = 365.25
+
+EARTH_DENSITY = 5.514       # g/cm³ (mass and radius in Earth units)
+JUPITER_DENSITY = 1.326     # g/cm³ (mass and radius in Jupiter units)
+EARTH_RADII_PER_JUPITER = 11.209
+EARTH_MASSES_PER_JUPITER = 317.83
+
+# Column names of the inputs and outputs, per dataset schema
+SERVING_COLUMNS = {
+    "planet_mass": "pl_bmasse",
+    "planet_radius": "pl_rade",
+    "star_radius": "st_rad",
+    "star_teff": "st_teff",
+    "star_mass": "st_mass",
+    "star_metallicity": "st_met",
+    "eccentricity": "pl_orbeccen",
+    "orbital_period": "pl_orbper",
+    "semi_major_axis": "pl_orbsmax",
+    "density": "pl_density",
+    "luminosity": "st_luminosity",
+    "insolation": "pl_insol",
+    "equilibrium_temp": "pl_eqt"
+}
+
+CATALOG_COLUMNS = {
+    "planet_mass": "PlanetaryMassJpt",
+    "planet_radius": "RadiusJpt",
+    "star_radius": "HostStarRadiusSlrRad",
+    "star_teff": "HostStarTempK",
+    "star_mass": "HostStarMassSlrMass",
+    "star_metallicity": "HostStarMetallicity",
+    "eccentricity": "Eccentricity",
+    "orbital_period": "PeriodDays",
+    "semi_major_axis": "SemiMajorAxisAU",
+    "density": "PlanetDensity",
+    "luminosity": "HostStarLuminosity",
+    "insolation": "InsolationFlux",
+    "equilibrium_temp": "EquilibriumTemp"
+}
+
+DERIVED_FEATURES = ["semi_major_axis", "density", "luminosity", "insolation", "equilibrium_temp"]
+
+
+# ===============================
+# Formulas
+# ===============================
+
+def planet_density(mass, radius, reference_density=EARTH_DENSITY):
+    """
+    ρ = ρ_ref · M / R³  (M and R in the units matching reference_density)
+    """
+    mass = np.asarray(mass, dtype=float)
+    radius = np.asarray(radius, dtype=float)
+    return reference_density * mass / radius ** 3
+
+
+def stellar_luminosity(star_radius, star_teff):
+    """
+    L / L☉ = (R / R☉)² · (T / T☉)⁴
+    """
+    star_radius = np.asarray(star_radius, dtype=float)
+    star_teff = np.asarray(star_teff, dtype=float)
+    return star_radius ** 2 * (star_teff / T_SUN) ** 4
+
+
+def semi_major_axis(orbital_period, star_mass):
+    """
+    Kepler's third law: a³ = M · P²  (a in AU, M in M☉, P in years)
+    """
+    period_years = np.asarray(orbital_period, dtype=float) / DAYS_PER_YEAR
+    star_mass = np.asarray(star_mass, dtype=float)
+    return np.cbrt(star_mass * period_years ** 2)
+
+
+def insolation_flux(luminosity, semi_major_axis):
+    """
+    S / S⊕ = (L / L☉) / a²
+    """
+    luminosity = np.asarray(luminosity, dtype=float)
+    semi_major_axis = np.asarray(semi_major_axis, dtype=float)
+    return luminosity / semi_major_axis ** 2
+
+
+def equilibrium_temperature(star_teff, star_radius, semi_major_axis, albedo=0.0):
+    """
+    T_eq = T★ · √(R★ / 2a) · (1 − A)^¼
+    """
+    star_teff = np.asarray(star_teff, dtype=float)
+    star_radius_au = np.asarray(star_radius, dtype=float) * R_SUN_AU
+    semi_major_axis = np.asarray(semi_major_axis, dtype=float)
+    return star_teff * np.sqrt(star_radius_au / (2 * semi_major_axis)) * (1 - albedo) ** 0.25
+
 
 # ===============================
-# 1️⃣ LOAD FINAL FEATURE DATASET
+# Table-level derivation
 # ===============================
-df = pd.read_csv("exoplanet_with_flux_teq.csv")
+
+def _column(data, name):
+    if name not in data:
+        return None
+    return np.asarray(data[name], dtype=float)
+
+
+def _fill(existing, derived):
+    """
+    Keep existing values, use the derived value only where they are missing.
+    """
+    if existing is None:
+        return derived
+    if derived is None:
+        return existing
+    return np.where(np.isnan(existing), derived, existing)
+
+
+def derive_features(data, columns=SERVING_COLUMNS, reference_density=EARTH_DENSITY, albedo=0.0):
+    """
+    Derive missing physical features from a mapping of columns.
+
+    `data` is anything indexable by column name (DataFrame, dict of arrays
+    or a single record of scalars). Values already present are kept; NaN
+    or absent values are filled from the formulas above. Returns a dict
+    {column name: ndarray} with one entry per derived feature that could
+    be computed.
+    """
+    c = {key: _column(data, name) for key, name in columns.items()}
+
+    def derive(func, *args, **kwargs):
+        if any(a is None for a in args):
+            return None
+        return func(*args, **kwargs)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        c["semi_major_axis"] = _fill(
+            c["semi_major_axis"],
+            derive(semi_major_axis, c["orbital_period"], c["star_mass"])
+        )
+        c["density"] = _fill(
+            c["density"],
+            derive(planet_density, c["planet_mass"], c["planet_radius"],
+                   reference_density=reference_density)
+        )
+        c["luminosity"] = _fill(
+            c["luminosity"],
+            derive(stellar_luminosity, c["star_radius"], c["star_teff"])
+        )
+        c["insolation"] = _fill(
+            c["insolation"],
+            derive(insolation_flux, c["luminosity"], c["semi_major_axis"])
+        )
+        c["equilibrium_temp"] = _fill(
+            c["equilibrium_temp"],
+            derive(equilibrium_temperature, c["star_teff"], c["star_radius"],
+                   c["semi_major_axis"], albedo=albedo)
+        )
+
+    return {
+        columns[key]: c[key]
+        for key in DERIVED_FEATURES
+        if c[key] is not None
+    }
+
+
+def rename_columns(df, source=CATALOG_COLUMNS, target=SERVING_COLUMNS):
+    """
+    Rename a DataFrame's columns from one schema to another.
+    """
+    return df.rename(columns={source[k]: target[k] for k in source if k in target})
+
+
+def derive_record(record, columns=SERVING_COLUMNS):
+    """
+    Per-request helper: return a copy of `record` with every derivable
+    feature that the client omitted filled in (as plain floats).
+    """
+    numeric = {}
+    for name in columns.values():
+        if record.get(name) is None:
+            continue
+        try:
+            numeric[name] = float(record[name])
+        except (TypeError, ValueError):
+            continue
+
+    out = dict(record)
+    for name, value in derive_features(numeric, columns).items():
+        if record.get(name) is None and np.isfinite(value):
+            out[name] = float(value)
+    return out
+
 
 # ===============================
-# 2️⃣ LIST OF DERIVED FEATURES
-# (As per your project pipeline)
+# Run on the catalog
 # ===============================
-derived_features = [
-    "PlanetDensity",        # From PlanetaryMassJpt & RadiusJpt
-    "HostStarLuminosity",   # From HostStarRadiusSlrRad & HostStarTempK
-    "InsolationFlux",       # From HostStarLuminosity & SemiMajorAxisAU
-    "EquilibriumTemp"      # From HostStarTempK, HostStarRadiusSlrRad & SemiMajorAxisAU
-]
-
-print("✅ DERIVED FEATURE STATUS:\n")
-
-for feature in derived_features:
-    if feature in df.columns:
-        print(f"✅ {feature} → PRESENT in dataset")
-    else:
-        print(f"❌ {feature} → MISSING from dataset")
-
-print("\n✅ SAMPLE VALUES OF DERIVED FEATURES:\n")
-print(df[derived_features].head())
+
+if __name__ == "__main__":
+    import pandas as pd
+
+    path = sys.argv[1] if len(sys.argv) > 1 else "../data/scrap/Exoplanet_dataset.csv"
+    df = pd.read_csv(path)
+
+    derived = derive_features(df, CATALOG_COLUMNS, reference_density=JUPITER_DENSITY)
+    for name, values in derived.items():
+        df[name] = values
+
+    print("✅ DERIVED FEATURE STATUS:\n")
+    for name, values in derived.items():
+        print(f"✅ {name:20s} → {np.isfinite(values).sum()} / {len(values)} rows")
+
+    print("\n✅ SAMPLE VALUES OF DERIVED FEATURES:\n")
+    print(df[list(derived)].head())
@@ -1,26 +1,300 @@
-import pandas as pd
+"""
+Median imputation fitted once and persisted as a small JSON artifact.
 
-df = pd.read_csv("exoplanet_imputed.csv")
+The artifact holds one median per column and, optionally, one median per
+column for each spectral class (O, B, A, F, G, K, M). Training fits it
+once; afterwards both batch data and single requests are filled from the
+stored values, so no stage has to re-read the training data.
 
-print("✅ Before Final Imputation:\n")
-print(df.isna().sum())
+Artifact layout:
+    {
+        "columns": [...],
+        "medians": {column: value},
+        "group_by": "spectral_class" | null,
+        "group_medians": {"G": {column: value}, ...},
+        "data_sha256": ...          (optional: the file it was fitted on)
+    }
 
-final_impute_cols = [
-    "RadiusJpt",
-    "PeriodDays",
-    "HostStarMassSlrMass",
-    "HostStarRadiusSlrRad",
-    "HostStarMetallicity",
-    "HostStarTempK"
-]
+Usage:
+    python imputation.py [input.csv] [output.csv]   # notebook dataset
+    python imputation.py serving                    # backend/model/imputer.json
+    python imputation.py root                       # imputer.json of the root app
+"""
 
-for col in final_impute_cols:
-    df[col] = df[col].fillna(df[col].median())
+import json
+import os
+import sys
 
-print("\n✅ After Final Imputation:\n")
-print(df.isna().sum())
+import numpy as np
 
-df.to_csv("exoplanet_final_ml_ready.csv", index=False)
+SPECTRAL_CLASSES = ["O", "B", "A", "F", "G", "K", "M"]
 
-print("\n🎉 FINAL CLEAN DATASET SAVED!")
-print("✅ File: exoplanet_final_ml_ready.csv")
+# Lower Teff bound (K) of each class, used when no spectral type is given
+TEFF_CLASS_BOUNDS = [30000, 10000, 7500, 6000, 5200, 3700, 0]
+
+# Groups smaller than this fall back to the global median
+MIN_GROUP_SIZE = 20
+
+
+# ===============================
+# Spectral class
+# ===============================
+
+def spectral_class(spectype=None, teff=None):
+    """
+    Spectral class letter of one star, from its spectral type string
+    (e.g. "G2 V") or, failing that, from its effective temperature.
+    """
+    if isinstance(spectype, str):
+        letter = spectype.strip()[:1].upper()
+        if letter in SPECTRAL_CLASSES:
+            return letter
+
+    try:
+        teff = float(teff)
+    except (TypeError, ValueError):
+        return None
+    if np.isnan(teff):
+        return None
+
+    for letter, bound in zip(SPECTRAL_CLASSES, TEFF_CLASS_BOUNDS):
+        if teff >= bound:
+            return letter
+    return None
+
+
+def spectral_classes(df, spectype_col="st_spectype", teff_col="st_teff"):
+    """
+    Vectorized spectral_class() over a DataFrame; returns an object array.
+    """
+    n = len(df)
+    out = np.full(n, None, dtype=object)
+
+    if teff_col in df:
+        teff = df[teff_col].to_numpy(dtype=float)
+        known = ~np.isnan(teff)
+        # First class whose lower bound is <= teff (bounds are descending)
+        idx = np.searchsorted(-np.array(TEFF_CLASS_BOUNDS), -teff, side="left")
+        out[known] = np.array(SPECTRAL_CLASSES, dtype=object)[np.clip(idx[known], 0, 6)]
+
+    if spectype_col in df:
+        letters = df[spectype_col].astype("string").str.strip().str[:1].str.upper()
+        valid = letters.isin(SPECTRAL_CLASSES).fillna(False).to_numpy(dtype=bool)
+        out[valid] = letters.to_numpy(dtype=object)[valid]
+
+    return out
+
+
+# ===============================
+# Fit / persist
+# ===============================
+
+def fit_imputer(df, columns, group_by=None, min_group_size=MIN_GROUP_SIZE):
+    """
+    Compute the medians of `columns` once.
+
+    group_by="spectral_class" additionally stores per-class medians for
+    every class with at least `min_group_size` rows.
+    """
+    columns = list(columns)
+    medians = df[columns].median()
+
+    imputer = {
+        "columns": columns,
+        "medians": {c: float(medians[c]) for c in columns if not np.isnan(medians[c])},
+        "group_by": group_by,
+        "group_medians": {}
+    }
+
+    if group_by == "spectral_class":
+        groups = spectral_classes(df)
+        for letter in SPECTRAL_CLASSES:
+            rows = groups == letter
+            if rows.sum() < min_group_size:
+                continue
+            group = df.loc[rows, columns].median()
+            imputer["group_medians"][letter] = {
+                c: float(group[c]) for c in columns if not np.isnan(group[c])
+            }
+    elif group_by is not None:
+        raise ValueError(f"Unknown group_by: {group_by}")
+
+    return imputer
+
+
+def imputer_from_sketches(columns, sketches, group_by=None, group_sketches=None,
+                          group_rows=None, min_group_size=MIN_GROUP_SIZE):
+    """
+    fit_imputer() from streamed quantile sketches (modules/src/sketch.py)
+    instead of a loaded frame: {column: sketch} of the raw values and, for
+    group_by="spectral_class", {class: {column: sketch}} and {class: rows}.
+    Medians are exact up to the sketch size, within its rank error above.
+    """
+    def medians(by_column):
+        return {
+            c: float(by_column[c].quantile(0.5)) for c in columns
+            if c in by_column and by_column[c].n
+        }
+
+    imputer = {
+        "columns": list(columns),
+        "medians": medians(sketches),
+        "group_by": group_by,
+        "group_medians": {}
+    }
+
+    if group_by == "spectral_class":
+        for letter in SPECTRAL_CLASSES:
+            if group_rows.get(letter, 0) < min_group_size:
+                continue
+            imputer["group_medians"][letter] = medians(group_sketches[letter])
+    elif group_by is not None:
+        raise ValueError(f"Unknown group_by: {group_by}")
+
+    return imputer
+
+
+def save_imputer(imputer, path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(imputer, f, indent=2)
+
+
+def load_imputer(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+# ===============================
+# Apply
+# ===============================
+
+def _is_missing(value):
+    if value is None:
+        return True
+    try:
+        return np.isnan(float(value))
+    except (TypeError, ValueError):
+        # Invalid, not missing: left for input validation to reject
+        return False
+
+
+def impute_record(record, imputer):
+    """
+    Fill the missing (absent, None or NaN) features of one record. O(features): one dict lookup per column.
+
+    Returns (filled_record, imputed_columns).
+    """
+    values = imputer["medians"]
+
+    if imputer["group_by"] == "spectral_class":
+        letter = spectral_class(record.get("st_spectype"), record.get("st_teff"))
+        values = {**values, **imputer["group_medians"].get(letter, {})}
+
+    out = dict(record)
+    imputed = []
+    for col in imputer["columns"]:
+        if _is_missing(out.get(col)) and col in values:
+            out[col] = values[col]
+            imputed.append(col)
+
+    return out, imputed
+
+
+def impute_frame(df, imputer):
+    """
+    Vectorized impute_record() for a whole DataFrame (returns a copy).
+    """
+    df = df.copy()
+    columns = [c for c in imputer["columns"] if c in df]
+
+    if imputer["group_by"] == "spectral_class" and imputer["group_medians"]:
+        groups = spectral_classes(df)
+        for letter, medians in imputer["group_medians"].items():
+            rows = groups == letter
+            df.loc[rows, columns] = df.loc[rows, columns].fillna(medians)
+
+    df[columns] = df[columns].fillna(imputer["medians"])
+    return df
+
+
+# ===============================
+# Run
+# ===============================
+
+def _fit_serving(target):
+    """
+    Fit a serving imputer on the catalog, in the serving schema: the
+    backend's (MODEL_FEATURES) or the root app's (model_features.pkl).
+    """
+    import pandas as pd
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    root = os.path.join(here, "..", "..")
+    sys.path.insert(0, root)
+
+    from modules.src.feature_derive import (
+        CATALOG_COLUMNS, EARTH_MASSES_PER_JUPITER, EARTH_RADII_PER_JUPITER,
+        derive_features, rename_columns
+    )
+
+    if target == "serving":
+        from backend.config import MODEL_FEATURES as features
+        path = os.path.join(root, "backend", "model", "imputer.json")
+    else:
+        import joblib
+        features = list(joblib.load(os.path.join(root, "model_features.pkl")))
+        path = os.path.join(root, "imputer.json")
+
+    catalog = pd.read_csv(os.path.join(here, "..", "data", "scrap", "Exoplanet_dataset.csv"))
+    # The catalog has planet mass / radius in Jupiter units, serving in Earth units
+    catalog[CATALOG_COLUMNS["planet_mass"]] *= EARTH_MASSES_PER_JUPITER
+    catalog[CATALOG_COLUMNS["planet_radius"]] *= EARTH_RADII_PER_JUPITER
+    for name, values in derive_features(catalog, CATALOG_COLUMNS).items():
+        catalog[name] = values
+    catalog = rename_columns(catalog)
+
+    imputer = fit_imputer(catalog, features, group_by="spectral_class")
+    save_imputer(imputer, path)
+
+    print("✅ Serving imputer fitted on", len(catalog), "catalog rows")
+    print("📋 Groups:", sorted(imputer["group_medians"]))
+    print("💾 Saved:", os.path.normpath(path))
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] in (["serving"], ["root"]):
+        _fit_serving(sys.argv[1])
+        sys.exit()
+
+    import pandas as pd
+
+    input_path = sys.argv[1] if len(sys.argv) > 1 else "exoplanet_imputed.csv"
+    output_path = sys.argv[2] if len(sys.argv) > 2 else "exoplanet_final_ml_ready.csv"
+
+    df = pd.read_csv(input_path)
+
+    print("✅ Before Final Imputation:\n")
+    print(df.isna().sum())
+
+    final_impute_cols = [
+        "RadiusJpt",
+        "PeriodDays",
+        "HostStarMassSlrMass",
+        "HostStarRadiusSlrRad",
+        "HostStarMetallicity",
+        "HostStarTempK"
+    ]
+
+    imputer = fit_imputer(df, final_impute_cols)
+    save_imputer(imputer, "imputer.json")
+    df = impute_frame(df, imputer)
+
+    print("\n✅ After Final Imputation:\n")
+    print(df.isna().sum())
+
+    df.to_csv(output_path, index=False)
+
+    print("\n🎉 FINAL CLEAN DATASET SAVED!")
+    print(f"✅ File: {output_path}")
+    print("✅ Imputer: imputer.json")
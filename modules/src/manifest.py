@@ -0,0 +1,137 @@
+"""
+Sidecar manifests for model artifacts.
+
+Every trained artifact (model/habitability_model.pkl, backend/model/*.ubj)
+can carry a `<stem>.manifest.json` next to it that records what it was
+trained on:
+
+    {
+        "version": "habitability_model-3f9c0a1b2c4d",
+        "artifact": "habitability_model.pkl",
+        "artifact_sha256": ...,
+        "data": {"path": ..., "sha256": ..., "rows": ..., "bytes": ...},
+        "features": [...],              # model input order
+        "threshold": 0.65,
+        "params": {...},
+        "metrics": {"cv": {...}, "test": {...}},
+        "libraries": {"sklearn": ..., ...},
+        "training_seconds": 4.2,
+        "trained_at": "2026-01-01T00:00:00+00:00"
+    }
+
+`version` is derived from the artifact and data hashes plus the training
+inputs (features, threshold, params, library versions), never from
+timestamps, so an identical retrain keeps its id. Both hashes are taken
+once when the manifest is written; serving code reads the id and keys
+caches, ETags and reloads on it without hashing the pickle.
+
+Usage:
+    python manifest.py <artifact> [data.csv]   # print (or write) a manifest
+"""
+
+import hashlib
+import json
+import os
+import sys
+import time
+
+_cache = {}
+
+
+def fingerprint(path, block_size=1 << 20):
+    """
+    SHA-256 of a file, streamed in blocks. Returns (hexdigest, n_bytes).
+    """
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+            size += len(block)
+    return digest.hexdigest(), size
+
+
+def data_section(path, rows=None):
+    sha256, size = fingerprint(path)
+    return {"path": os.path.basename(path), "sha256": sha256, "rows": rows, "bytes": size}
+
+
+def manifest_path(artifact_path):
+    return os.path.splitext(artifact_path)[0] + ".manifest.json"
+
+
+def _version(artifact_path, manifest):
+    stem = os.path.splitext(os.path.basename(artifact_path))[0]
+    key = {
+        k: manifest.get(k)
+        for k in ("artifact_sha256", "data", "features", "threshold", "params", "libraries")
+    }
+    if key["data"]:
+        key["data"] = key["data"].get("sha256")
+    digest = hashlib.sha256(json.dumps(key, sort_keys=True, default=str).encode())
+    return f"{stem}-{digest.hexdigest()[:12]}"
+
+
+def write_manifest(artifact_path, **fields):
+    """
+    Write `<stem>.manifest.json` beside the artifact and return it.
+    """
+    manifest = {
+        "artifact": os.path.basename(artifact_path),
+        # Hashed once here, at training time, never by the serving code
+        "artifact_sha256": fingerprint(artifact_path)[0],
+        **fields
+    }
+    manifest.setdefault("trained_at", time.strftime("%Y-%m-%dT%H:%M:%S%z"))
+    manifest["version"] = _version(artifact_path, manifest)
+
+    with open(manifest_path(artifact_path), "w") as f:
+        json.dump(manifest, f, indent=2, default=float)
+    return manifest
+
+
+def read_manifest(artifact_path):
+    """
+    Manifest of an artifact, or None if it has none. Cached per file mtime,
+    so repeated calls cost one stat().
+    """
+    path = manifest_path(artifact_path)
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+    cached = _cache.get(path)
+    if cached is None or cached[0] != mtime:
+        with open(path) as f:
+            cached = (mtime, json.load(f))
+        _cache[path] = cached
+    return cached[1]
+
+
+def artifact_version(artifact_path):
+    """
+    Manifest version of an artifact, falling back to size + mtime when the
+    artifact has no manifest (still no hashing).
+    """
+    manifest = read_manifest(artifact_path)
+    if manifest is not None:
+        return manifest["version"]
+
+    stem = os.path.splitext(os.path.basename(artifact_path))[0]
+    stat = os.stat(artifact_path)
+    return f"{stem}-{stat.st_size:x}-{int(stat.st_mtime):x}"
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+
+    artifact = sys.argv[1]
+    if len(sys.argv) > 2:
+        manifest = write_manifest(artifact, data=data_section(sys.argv[2]))
+        print("💾 Saved:", manifest_path(artifact))
+    else:
+        manifest = read_manifest(artifact)
+    print(json.dumps(manifest, indent=2))
@@ -1,46 +1,249 @@
+"""
+Merge the habitable and non-habitable exoplanet catalogs into one shuffled,
+labelled, ML-ready CSV, in bounded memory.
+
+Both inputs are streamed in chunks of `chunk_rows` rows, read as text so
+values are written back exactly as they came in. Shuffling is a two-pass
+bucket shuffle:
+
+    pass 1  every row is labelled, rendered to a CSV record and appended
+            to one of K temporary bucket files chosen uniformly at random
+    pass 2  each bucket's records are read back as plain strings (no CSV
+            parsing), optionally de-duplicated, permuted in memory and
+            appended to the output, or dealt round-robin across `shards`
+            output files
+
+Random scatter followed by a full permutation of each bucket gives a
+uniformly random order of the rows while holding at most one chunk or one
+bucket in memory. K is picked from the input size so a bucket stays under
+`memory_limit` bytes; small catalogs end up with K = 1 (one in-memory
+shuffle, as before).
+
+With dedup, pass 1 routes a row by its (salted) content hash instead of at
+random, so identical rows always land in the same bucket, and pass 2 drops
+repeats inside each bucket. The set of seen hashes then never outgrows one
+bucket; no global set is kept.
+
+Usage:
+    python merge.py [--shards N] [--memory-limit MB] [--dedup]
+"""
+
+import argparse
+import math
+import os
+import shutil
+import tempfile
+
+import numpy as np
 import pandas as pd
 
-def merge_exoplanet_datasets(habitable_path, non_habitable_path, output_path):
+LABEL = "Habitable"
+
+# Bytes of memory a bucket takes per byte of CSV once loaded as a list of
+# record strings (~60 bytes of object overhead on ~100-200 byte records)
+BUCKET_EXPANSION = 2
+
+
+def _columns(habitable_path, non_habitable_path):
+    """
+    Output columns: what pd.concat of the two frames would give (habitable
+    columns first, then the extra non-habitable ones), plus the label.
+    """
+    columns = list(pd.read_csv(habitable_path, nrows=0).columns)
+    for c in pd.read_csv(non_habitable_path, nrows=0).columns:
+        if c not in columns:
+            columns.append(c)
+    if LABEL not in columns:
+        columns.append(LABEL)
+    return columns
+
+
+def _row_keys(chunk):
+    """
+    64-bit hash of every row's values, label excluded: the same planet in
+    both catalogs is a duplicate too, and its first (habitable) copy wins.
+    """
+    return pd.util.hash_pandas_object(chunk.drop(columns=LABEL), index=False).to_numpy()
+
+
+def _records(lines):
+    """
+    Whole CSV records from physical lines: a quoted field may span lines,
+    and a record is complete once its quote count is even.
+    """
+    pending = None
+    for line in lines:
+        if pending is not None:
+            pending += line
+            if pending.count('"') % 2 == 0:
+                yield pending
+                pending = None
+        elif line.count('"') % 2:
+            pending = line
+        else:
+            yield line
+    if pending is not None:
+        yield pending
+
+
+def _dedup_bucket(records):
+    """
+    Keep the first record of every key in a hash-routed bucket (written in
+    input order, so the habitable copy wins) and strip the key prefix.
+    Returns (records, {label: rows dropped}).
+    """
+    seen = set()
+    kept = []
+    dropped = {1: 0, 0: 0}
+    for record in records:
+        key = record[:16]
+        if key in seen:
+            dropped[int(record[16])] += 1
+        else:
+            seen.add(key)
+            kept.append(record[18:])
+    return kept, dropped
+
+
+def _shard_paths(output_path, shards):
+    if shards <= 1:
+        return [output_path]
+    root, ext = os.path.splitext(output_path)
+    return [f"{root}-{i:03d}-of-{shards:03d}{ext}" for i in range(shards)]
+
+
+def merge_exoplanet_datasets(habitable_path, non_habitable_path, output_path,
+                             chunk_rows=100_000, memory_limit=256 << 20,
+                             shards=1, dedup=False, random_state=42):
     """
     Merge habitable and non-habitable exoplanet datasets
-    and save as a single ML-ready CSV file.
+    and save as a single ML-ready CSV file (or `shards` files).
+    Returns a summary dict.
     """
+    rng = np.random.default_rng(random_state)
+    columns = _columns(habitable_path, non_habitable_path)
+
+    input_bytes = os.path.getsize(habitable_path) + os.path.getsize(non_habitable_path)
+    n_buckets = max(1, math.ceil(input_bytes * BUCKET_EXPANSION / memory_limit))
+
+    print("🔄 Streaming datasets...")
+    print(f"   {input_bytes / 2**20:.1f} MiB in, {n_buckets} bucket(s), chunks of {chunk_rows:,d} rows")
+
+    counts = {1: 0, 0: 0}
+    duplicates = 0
+    # Hash routing (dedup): salted so the bucket split still follows the seed
+    salt = np.uint64(rng.integers(2**63)) if dedup else None
 
-    print("🔄 Loading datasets...")
+    tmp_dir = tempfile.mkdtemp(prefix="merge-", dir=os.path.dirname(os.path.abspath(output_path)))
+    bucket_paths = [os.path.join(tmp_dir, f"bucket-{b:05d}.csv") for b in range(n_buckets)]
+    try:
+        # ---------- pass 1: label, dedup, scatter ----------
+        buckets = [open(p, "w", newline="") for p in bucket_paths]
+        try:
+            for path, label in ((habitable_path, 1), (non_habitable_path, 0)):
+                for chunk in pd.read_csv(path, dtype=str, keep_default_na=False,
+                                         chunksize=chunk_rows):
+                    # Ensure correct labels
+                    chunk[LABEL] = str(label)
+                    chunk = chunk.reindex(columns=columns, fill_value="")
 
-    # Load files
-    df_hab = pd.read_csv(habitable_path)
-    df_non = pd.read_csv(non_habitable_path)
+                    counts[label] += len(chunk)
+                    records = list(_records(
+                        chunk.to_csv(header=False, index=False).splitlines(keepends=True)
+                    ))
 
-    print(f"✅ Habitable dataset loaded: {df_hab.shape[0]} rows")
-    print(f"✅ Non-Habitable dataset loaded: {df_non.shape[0]} rows")
+                    if dedup:
+                        # "<16 hex key><label>," in front of each record for pass 2
+                        keys = _row_keys(chunk)
+                        records = [f"{k:016x}{label}," + r for k, r in zip(keys.tolist(), records)]
+                        ids = ((keys ^ salt) % np.uint64(n_buckets)).astype(np.int64)
+                    else:
+                        ids = rng.integers(n_buckets, size=len(records))
 
-    # Ensure correct labels
-    df_hab["Habitable"] = 1
-    df_non["Habitable"] = 0
+                    # Group the records by bucket with one sort
+                    order = np.argsort(ids, kind="stable")
+                    bounds = np.searchsorted(ids[order], np.arange(n_buckets + 1))
+                    for b in range(n_buckets):
+                        lo, hi = bounds[b], bounds[b + 1]
+                        if hi > lo:
+                            buckets[b].writelines([records[i] for i in order[lo:hi]])
+        finally:
+            for f in buckets:
+                f.close()
 
-    # Combine datasets
-    df_combined = pd.concat([df_hab, df_non], ignore_index=True)
+        # ---------- pass 2: permute each bucket, write ----------
+        paths = _shard_paths(output_path, shards)
+        outputs = [open(p, "w", newline="") for p in paths]
+        try:
+            header = pd.DataFrame(columns=columns).to_csv(index=False)
+            for f in outputs:
+                f.write(header)
 
-    # Shuffle for ML fairness
-    df_combined = df_combined.sample(frac=1, random_state=42).reset_index(drop=True)
+            written = 0
+            for path in bucket_paths:
+                with open(path, newline="") as f:
+                    records = list(_records(f))
+                if dedup:
+                    records, dropped = _dedup_bucket(records)
+                    duplicates += sum(dropped.values())
+                    for label, n in dropped.items():
+                        counts[label] -= n
+                perm = rng.permutation(len(records))
+
+                # Round-robin over the shuffled records: shards stay within
+                # one row of each other and each is a random sample
+                for s, f in enumerate(outputs):
+                    start = (s - written) % len(outputs)
+                    f.writelines([records[i] for i in perm[start::len(outputs)]])
+                written += len(records)
+                del records
+        finally:
+            for f in outputs:
+                f.close()
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    total = counts[1] + counts[0]
+    print(f"✅ Habitable rows: {counts[1]}")
+    print(f"✅ Non-Habitable rows: {counts[0]}")
+    if dedup:
+        print(f"🧹 Duplicate rows dropped: {duplicates}")
 
     print("\n📊 Final Dataset Summary:")
-    print(df_combined["Habitable"].value_counts())
-    print(f"Total Rows: {df_combined.shape[0]}")
-    print(f"Total Columns: {df_combined.shape[1]}")
+    print(f"Total Rows: {total}")
+    print(f"Total Columns: {len(columns)}")
 
-    # Save output
-    df_combined.to_csv(output_path, index=False)
-    print(f"\n💾 Merged dataset saved as: {output_path}")
+    for path in paths:
+        print(f"💾 Merged dataset saved as: {path}")
+
+    return {
+        "rows": total,
+        "habitable": counts[1],
+        "non_habitable": counts[0],
+        "duplicates": duplicates,
+        "buckets": n_buckets,
+        "outputs": paths
+    }
 
 
 # ---------------------------------------------
 # Run the function
 # ---------------------------------------------
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Merge the exoplanet catalogs")
+    parser.add_argument("--shards", type=int, default=1)
+    parser.add_argument("--memory-limit", type=int, default=256, help="MiB per bucket")
+    parser.add_argument("--chunk", type=int, default=100_000, help="rows per read chunk")
+    parser.add_argument("--dedup", action="store_true",
+                        help="drop exact duplicate rows (memory stays within one bucket)")
+    args = parser.parse_args()
+
     merge_exoplanet_datasets(
         habitable_path="data/Exo-planets(habitable).csv",
         non_habitable_path="data/Exo-planets(Non-habitable).csv",
-        output_path="data/merged/merged_exoplanet_dataset.csv"
+        output_path="data/merged/merged_exoplanet_dataset.csv",
+        chunk_rows=args.chunk,
+        memory_limit=args.memory_limit << 20,
+        shards=args.shards,
+        dedup=args.dedup
     )
@@ -0,0 +1,195 @@
+"""
+Declarative habitability rules, compiled to vectorized NumPy.
+
+Two kinds of rule, both plain JSON-compatible dicts:
+
+    label rules   column -> [min, max]           (inclusive, None = open)
+                  a row is labelled 1 when every column is inside its range,
+                  like chained Series.between(); NaN is never inside.
+
+    score rules   column -> {"target": t, "weight": w}
+                  score = Σ w / (1 + |x - t|), the closeness terms used by
+                  module2's HSI and SCI; NaN in any term gives NaN.
+
+compile_label() / compile_score() turn a rule into a function over any
+mapping of columns (DataFrame, dict of arrays, or one record of scalars).
+The function walks the rows in cache-sized blocks with in-place ufuncs, so
+millions of rows are processed in one pass without a temporary per term.
+The same compiled rule runs in module3 (labels), module2 (indices) and the
+backend (a physics score next to the model score).
+
+Usage:
+    python rules.py [rules.json]    # print the compiled rule set
+"""
+
+import json
+import sys
+
+import numpy as np
+
+# Rows per block: keeps each column slice and the scratch buffer in cache
+BLOCK_ROWS = 1 << 14
+
+# module3_target_creation.py: conservative habitable-zone label
+LABEL_RULES = {
+    "habitability": {
+        "pl_eqt": [180, 300],
+        "pl_rade": [None, 2.0],
+        "pl_insol": [0.25, 2.0]
+    }
+}
+
+# module2_data_cleaning.py: Habitability Score Index and Stellar Compatibility Index
+SCORE_RULES = {
+    "habitability_score": {
+        "pl_rade": {"target": 1, "weight": 0.25},
+        "pl_eqt": {"target": 288, "weight": 0.25},
+        "pl_insol": {"target": 1, "weight": 0.25},
+        "pl_orbeccen": {"target": 0, "weight": 0.25}
+    },
+    "stellar_compatibility": {
+        "st_teff": {"target": 5778, "weight": 0.6},
+        "st_mass": {"target": 1, "weight": 0.4}
+    }
+}
+
+
+def load_rules(path):
+    """
+    Read {"labels": {...}, "scores": {...}} from a JSON file.
+    """
+    with open(path) as f:
+        rules = json.load(f)
+    return rules.get("labels", {}), rules.get("scores", {})
+
+
+_SCALARS = (int, float, np.integer, np.floating, type(None))
+
+
+def _record(data, names):
+    """
+    Values of a single record as floats (None -> NaN), or None when `data`
+    holds columns. Serving evaluates one record in plain Python instead of
+    paying NumPy's per-call overhead on 1-element arrays.
+    """
+    values = [data[name] for name in names]
+    if not all(isinstance(v, _SCALARS) for v in values):
+        return None
+    return [float("nan") if v is None else float(v) for v in values]
+
+
+def compile_label(ranges):
+    """
+    Compile column -> [min, max] into f(data) -> int8 array (1 = inside all).
+    """
+    names = list(ranges)
+    bounds = []
+    for name in names:
+        lo, hi = ranges[name]
+        bounds.append((
+            None if lo is None else float(lo),
+            None if hi is None else float(hi)
+        ))
+
+    def label(data):
+        record = _record(data, names)
+        if record is not None:
+            # NaN fails every comparison, as in the vectorized path
+            return int(all(
+                (lo is None or x >= lo) and (hi is None or x <= hi)
+                for x, (lo, hi) in zip(record, bounds)
+            ))
+
+        columns = [np.atleast_1d(np.asarray(data[name], dtype=float)) for name in names]
+        n = len(columns[0]) if columns else 0
+        out = np.ones(n, dtype=bool)
+        scratch = np.empty(min(n, BLOCK_ROWS), dtype=bool)
+
+        for start in range(0, n, BLOCK_ROWS):
+            block = out[start:start + BLOCK_ROWS]
+            tmp = scratch[:len(block)]
+            for column, (lo, hi) in zip(columns, bounds):
+                values = column[start:start + BLOCK_ROWS]
+                if lo is not None:
+                    np.greater_equal(values, lo, out=tmp)
+                    block &= tmp
+                if hi is not None:
+                    np.less_equal(values, hi, out=tmp)
+                    block &= tmp
+
+        return out.astype(np.int8)
+
+    label.columns = names
+    return label
+
+
+def compile_score(terms):
+    """
+    Compile column -> {target, weight} into f(data) -> float64 array of
+    Σ weight / (1 + |x - target|).
+    """
+    names = list(terms)
+    params = [(float(terms[n]["target"]), float(terms[n]["weight"])) for n in names]
+
+    def score(data):
+        record = _record(data, names)
+        if record is not None:
+            return sum(w / (1.0 + abs(x - t)) for x, (t, w) in zip(record, params))
+
+        columns = [np.atleast_1d(np.asarray(data[name], dtype=float)) for name in names]
+        n = len(columns[0]) if columns else 0
+        out = np.zeros(n)
+        scratch = np.empty(min(n, BLOCK_ROWS))
+
+        for start in range(0, n, BLOCK_ROWS):
+            block = out[start:start + BLOCK_ROWS]
+            tmp = scratch[:len(block)]
+            for column, (target, weight) in zip(columns, params):
+                np.subtract(column[start:start + BLOCK_ROWS], target, out=tmp)
+                np.abs(tmp, out=tmp)
+                tmp += 1.0
+                np.divide(weight, tmp, out=tmp)
+                block += tmp
+
+        return out
+
+    score.columns = names
+    return score
+
+
+def compile_rules(label_rules=LABEL_RULES, score_rules=SCORE_RULES):
+    """
+    Compile a whole rule set into {output column: function}.
+    """
+    compiled = {name: compile_label(r) for name, r in label_rules.items()}
+    compiled.update({name: compile_score(r) for name, r in score_rules.items()})
+    return compiled
+
+
+def apply_rules(data, compiled):
+    """
+    Evaluate every compiled rule whose input columns are all present.
+    Returns {output column: array or scalar}.
+    """
+    return {
+        name: rule(data)
+        for name, rule in compiled.items()
+        if all(c in data for c in rule.columns)
+    }
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        label_rules, score_rules = load_rules(sys.argv[1])
+    else:
+        label_rules, score_rules = LABEL_RULES, SCORE_RULES
+
+    print("✅ LABEL RULES")
+    for name, ranges in label_rules.items():
+        print(f"   {name}: " + " & ".join(f"{c} in {r}" for c, r in ranges.items()))
+
+    print("\n✅ SCORE RULES")
+    for name, terms in score_rules.items():
+        print(f"   {name}: " + " + ".join(
+            f"{t['weight']}/(1+|{c}-{t['target']}|)" for c, t in terms.items()
+        ))
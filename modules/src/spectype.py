@@ -0,0 +1,135 @@
+"""
+Spectral types normalized to class + subclass and one-hot encoded sparsely.
+
+Raw NASA st_spectype strings ("G2 V", "K1.5 IV-V", "M3.5Ve", "F8/G0 V",
+...) have hundreds of spellings. pd.get_dummies gives one dense column per
+spelling. Here each string is reduced to a canonical code, the class
+letter plus the integer subclass ("G2", "K1", "M3"; just "G" when no
+subclass is given; None when there is no O-M class), and encoded as at
+most two ones per row in a scipy.sparse CSR matrix:
+
+    spectral_class_O .. spectral_class_M       7 columns
+    spectral_subclass_<code>                    one per subclass seen
+
+The vocabulary (which classes / subclasses get a column) is fitted once,
+persisted as JSON and reused, so training and later runs agree on the
+column layout. Unknown codes encode as all zeros.
+
+Usage:
+    python spectype.py data.csv [vocabulary.json]   # fit and save a vocabulary
+"""
+
+import json
+import sys
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.base import BaseEstimator, TransformerMixin
+
+from modules.src.imputation import SPECTRAL_CLASSES
+
+# Class letter, then an optional subclass digit ("K1.5" -> "K", "1")
+SPECTYPE_PATTERN = r"^\s*([OBAFGKMobafgkm])\s*(\d)?"
+
+
+def normalize_spectypes(values):
+    """
+    Canonical class/subclass code of every spectral type string, as an
+    object array ("G2", "K", None).
+    """
+    parts = pd.Series(np.asarray(values, dtype=object).ravel(), dtype="string").str.extract(
+        SPECTYPE_PATTERN
+    )
+    letters = parts[0].str.upper()
+    codes = letters.str.cat(parts[1].fillna(""))
+    return codes.astype(object).where(letters.notna(), None).to_numpy()
+
+
+def normalize_spectype(value):
+    return normalize_spectypes([value])[0]
+
+
+def fit_vocabulary(codes, min_count=1):
+    """
+    Classes and subclasses to encode. Subclasses seen fewer than
+    `min_count` times get no column of their own (their class still does).
+    """
+    codes = pd.Series(codes, dtype=object).dropna()
+    subclass_counts = codes[codes.str.len() > 1].value_counts()
+    return {
+        "classes": list(SPECTRAL_CLASSES),
+        "subclasses": sorted(subclass_counts[subclass_counts >= min_count].index)
+    }
+
+
+def save_vocabulary(vocabulary, path):
+    with open(path, "w") as f:
+        json.dump(vocabulary, f, indent=2)
+
+
+def load_vocabulary(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+class SpectypeEncoder(BaseEstimator, TransformerMixin):
+    """
+    Raw or normalized spectral types (one column) -> sparse class and
+    subclass indicators. Fits a vocabulary unless one is given.
+    """
+
+    def __init__(self, vocabulary=None, min_count=1):
+        self.vocabulary = vocabulary
+        self.min_count = min_count
+
+    @staticmethod
+    def _codes(X):
+        if isinstance(X, pd.DataFrame):
+            X = X.iloc[:, 0]
+        return normalize_spectypes(np.asarray(X, dtype=object).reshape(-1))
+
+    def fit(self, X, y=None):
+        self.vocabulary_ = self.vocabulary or fit_vocabulary(self._codes(X), self.min_count)
+        names = ([f"spectral_class_{c}" for c in self.vocabulary_["classes"]]
+                 + [f"spectral_subclass_{s}" for s in self.vocabulary_["subclasses"]])
+        self.feature_names_ = np.array(names, dtype=object)
+        self.index_ = {name.split("_", 2)[2]: i for i, name in enumerate(names)}
+        return self
+
+    def transform(self, X):
+        codes = pd.Series(self._codes(X), dtype=object)
+        n = len(codes)
+
+        # Class column from the letter, subclass column from the full code;
+        # codes absent from the vocabulary map to NaN and are dropped
+        class_cols = codes.str[:1].map(self.index_)
+        subclass_cols = codes.where(codes.str.len() > 1).map(self.index_)
+
+        rows = np.r_[np.arange(n), np.arange(n)]
+        cols = np.r_[class_cols.to_numpy(dtype=float), subclass_cols.to_numpy(dtype=float)]
+        keep = ~np.isnan(cols)
+
+        return sparse.csr_matrix(
+            (np.ones(keep.sum()), (rows[keep], cols[keep].astype(np.intp))),
+            shape=(n, len(self.feature_names_))
+        )
+
+    def get_feature_names_out(self, input_features=None):
+        return self.feature_names_
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+
+    df = pd.read_csv(sys.argv[1], usecols=["st_spectype"])
+    codes = normalize_spectypes(df["st_spectype"])
+    vocabulary = fit_vocabulary(codes)
+
+    print(f"📋 {df['st_spectype'].nunique()} raw spellings -> "
+          f"{len(vocabulary['classes'])} classes + {len(vocabulary['subclasses'])} subclasses")
+    if len(sys.argv) > 2:
+        save_vocabulary(vocabulary, sys.argv[2])
+        print("💾 Saved:", sys.argv[2])
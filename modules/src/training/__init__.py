@@ -0,0 +1,51 @@
+"""
+Training for the serving models (backend/model), as importable functions.
+
+The XGBoost classifier, the StandardScaler used by /similar and
+the serving imputer used to come out of a notebook. Here every step is a
+function over NumPy arrays, timed per phase, with XGBoost threads
+(nthread), cross-validation processes (n_jobs) and early stopping under
+the caller's control, so the whole run can be benchmarked and reproduced:
+the same data, seed and parameters give byte-identical model files.
+
+    data.py       load a labelled catalog into (X, y) in MODEL_FEATURES order
+    model.py      train_booster(), cross_validate_booster(), evaluate(), fit_scaler()
+    timing.py     PhaseTimer: per-phase wall time with hooks
+    pipeline.py   run(): the full reproducible run, writing the artifacts
+    arrays.py     save_matrix() / open_matrix(): memory-mappable matrices
+    incremental.py  out-of-core fits over row blocks (partial_fit, XGBoost
+                  external memory) and an in-memory parity report
+    cache.py      prepared-dataset cache keyed on data hash + preprocessing config
+
+incremental and cache are command-line modules as well and are imported
+from their own paths (not re-exported here, so `python -m` runs them
+without a second copy in sys.modules).
+
+Usage:
+    python -m modules.src.training [--data CSV] [--out DIR] [--nthread N] ...
+    python -m modules.src.training.incremental [--dir DATASET] [--block-rows N]
+    python -m modules.src.training.cache [list | clear]
+"""
+
+from modules.src.training.arrays import open_matrix, save_matrix
+from modules.src.training.data import FEATURES, load_dataset
+from modules.src.training.model import (
+    DEFAULT_PARAMS, cross_validate_booster, evaluate, fit_scaler, train_booster
+)
+from modules.src.training.pipeline import run
+from modules.src.training.timing import PhaseTimer, print_hook
+
+__all__ = [
+    "DEFAULT_PARAMS",
+    "FEATURES",
+    "PhaseTimer",
+    "cross_validate_booster",
+    "evaluate",
+    "fit_scaler",
+    "load_dataset",
+    "open_matrix",
+    "print_hook",
+    "run",
+    "save_matrix",
+    "train_booster"
+]
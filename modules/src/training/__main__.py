@@ -0,0 +1,58 @@
+"""
+python -m modules.src.training [options]
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from modules.src.training.model import NUM_BOOST_ROUND
+from modules.src.training.pipeline import run
+from modules.src.training.timing import print_hook
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DATA = os.path.normpath(os.path.join(HERE, "..", "..", "data", "raw", "Exopl-habit.csv"))
+DEFAULT_OUT = os.path.join("outputs", "training")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m modules.src.training",
+                                     description="Train the serving models")
+    parser.add_argument("--data", default=DEFAULT_DATA, help="labelled catalog CSV")
+    parser.add_argument("--schema", default="habit", choices=["habit", "serving"])
+    parser.add_argument("--out", default=DEFAULT_OUT,
+                        help="artifact directory (backend/model to deploy)")
+    parser.add_argument("--rounds", type=int, default=NUM_BOOST_ROUND)
+    parser.add_argument("--early-stopping", type=int, default=0,
+                        help="rounds without validation improvement (0 = off, the default)")
+    parser.add_argument("--nthread", type=int, default=None, help="XGBoost threads")
+    parser.add_argument("--n-jobs", type=int, default=1, help="cross-validation processes")
+    parser.add_argument("--cv", type=int, default=0, help="cross-validation folds (0 = skip)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--timings", help="write the summary (with phase timings) as JSON")
+    args = parser.parse_args(argv)
+
+    print("📌 Training serving models from", args.data)
+    summary = run(
+        args.data, args.out, schema=args.schema, num_boost_round=args.rounds,
+        early_stopping_rounds=args.early_stopping or None, nthread=args.nthread,
+        n_jobs=args.n_jobs, cv_folds=args.cv, seed=args.seed, hooks=[print_hook]
+    )
+
+    print(f"\n📊 {summary['rows']} rows, {summary['positives']} positive")
+    for name, metrics in summary["metrics"]["test"].items():
+        print(f"   {name:10s} rounds={summary['rounds'][name]:3d} " + " ".join(
+            f"{k}={v:.3f}" for k, v in metrics.items() if v is not None
+        ))
+    for name, path in summary["artifacts"].items():
+        print("💾 Saved:", path)
+
+    if args.timings:
+        with open(args.timings, "w") as f:
+            json.dump(summary, f, indent=2)
+    return summary
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
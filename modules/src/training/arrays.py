@@ -0,0 +1,97 @@
+"""
+Feature matrices on disk that can be read back memory-mapped.
+
+    X.npy           dense matrix, np.load(mmap_mode="r")
+    X.csr/          CSR matrix as three plain .npy files (data, indices,
+                    indptr) plus shape.npy, each memory-mapped
+
+np.savez / scipy.sparse.save_npz write zip archives, which np.load always
+reads fully into memory; plain .npy files can be mapped, so training can
+walk a matrix larger than RAM one block of rows at a time and only that
+block is paged in.
+"""
+
+import os
+
+import numpy as np
+from scipy import sparse
+
+CSR_SUFFIX = ".csr"
+CSR_PARTS = ("data", "indices", "indptr", "shape")
+
+
+class MappedCSR:
+    """
+    Read-only CSR matrix over memory-mapped parts. rows(start, stop)
+    materializes just that row range as a scipy CSR matrix.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        parts = {name: np.load(os.path.join(directory, name + ".npy"), mmap_mode="r")
+                 for name in CSR_PARTS}
+        self.data, self.indices, self.indptr = parts["data"], parts["indices"], parts["indptr"]
+        self.shape = tuple(int(n) for n in parts["shape"])
+
+    def __len__(self):
+        return self.shape[0]
+
+    def rows(self, start, stop):
+        lo, hi = int(self.indptr[start]), int(self.indptr[stop])
+        return sparse.csr_matrix(
+            (np.array(self.data[lo:hi]), np.array(self.indices[lo:hi]),
+             np.asarray(self.indptr[start:stop + 1]) - lo),
+            shape=(stop - start, self.shape[1])
+        )
+
+
+def save_matrix(matrix, path):
+    """
+    Save a dense array to `path` (.npy) or a sparse matrix to a `.csr`
+    directory next to it. Returns the path written.
+    """
+    if sparse.issparse(matrix):
+        matrix = sparse.csr_matrix(matrix)
+        directory = os.path.splitext(path)[0] + CSR_SUFFIX
+        os.makedirs(directory, exist_ok=True)
+        for name, values in (("data", matrix.data), ("indices", matrix.indices),
+                             ("indptr", matrix.indptr), ("shape", np.array(matrix.shape))):
+            np.save(os.path.join(directory, name + ".npy"), values)
+        return directory
+
+    np.save(path, np.asarray(matrix))
+    return path
+
+
+def open_matrix(path):
+    """
+    Memory-mapped view of a matrix written by save_matrix(): an np.memmap
+    for .npy, a MappedCSR for a .csr directory (given directly or as the
+    .npy path it replaced).
+    """
+    directory = path if path.endswith(CSR_SUFFIX) else os.path.splitext(path)[0] + CSR_SUFFIX
+    if os.path.isdir(directory):
+        return MappedCSR(directory)
+    return np.load(path, mmap_mode="r")
+
+
+def read_rows(X, start, stop):
+    """
+    In-memory copy of rows [start, stop) of an in-memory, memory-mapped or
+    MappedCSR matrix.
+    """
+    if isinstance(X, MappedCSR):
+        return X.rows(start, stop)
+    if sparse.issparse(X):
+        return X[start:stop]
+    return np.array(X[start:stop])
+
+
+def row_blocks(X, block_rows):
+    """
+    Yield (start, stop, block) over the rows of X, block_rows at a time.
+    """
+    n = X.shape[0]
+    for start in range(0, n, block_rows):
+        stop = min(start + block_rows, n)
+        yield start, stop, read_rows(X, start, stop)
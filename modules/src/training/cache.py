@@ -0,0 +1,177 @@
+"""
+Cache of prepared (preprocessed) datasets, keyed on the source data and
+the preprocessing config.
+
+    dataset, hit = cached_dataset("outputs/merged_with_target.csv", CONFIG, prepare)
+
+On a miss, prepare(data_path, config) parses and preprocesses and returns
+
+    {"arrays": {"X_train": ..., "y_train": ..., ...},   # dense or sparse
+     "preprocessor": <fitted transformer>,              # optional
+     "frame": <DataFrame>,                              # optional
+     "info": {...}}                                     # JSON-able extras
+
+which is written to CACHE_DIR/<key>/ (matrices through arrays.save_matrix,
+the preprocessor with joblib, the frame as a pickle, dataset.json last).
+Hit or miss, the dataset comes back from disk: every array memory-mapped
+(arrays.open_matrix), so training code sees the same thing either way and
+a repeated run skips parsing and preprocessing entirely.
+
+The key is a hash of the source file's SHA-256 (manifest.fingerprint), the
+config as canonical JSON, CACHE_FORMAT and the numpy / scikit-learn
+versions the preprocessor was pickled with.
+
+Usage:
+    python -m modules.src.training.cache [list | clear]
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+
+import numpy as np
+
+from modules.src.manifest import fingerprint
+from modules.src.training.arrays import open_matrix, save_matrix
+
+CACHE_DIR = os.getenv("DATASET_CACHE_DIR", os.path.join("outputs", "dataset_cache"))
+# Bump when the on-disk layout changes
+CACHE_FORMAT = 1
+META_FILE = "dataset.json"
+PREPROCESSOR_FILE = "preprocessor.joblib"
+FRAME_FILE = "frame.pkl"
+
+
+def _libraries():
+    import sklearn
+
+    return {"numpy": np.__version__, "sklearn": sklearn.__version__}
+
+
+def cache_key(data_sha256, config):
+    key = {"data": data_sha256, "config": config, "format": CACHE_FORMAT,
+           "libraries": _libraries()}
+    return hashlib.sha256(json.dumps(key, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def save_dataset(directory, prepared, meta):
+    """
+    Write a prepared dataset into `directory` atomically: everything goes
+    to a temporary sibling that is renamed into place once complete.
+    """
+    tmp = f"{directory}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+
+    arrays = {}
+    for name, values in prepared["arrays"].items():
+        path = save_matrix(values, os.path.join(tmp, name + ".npy"))
+        arrays[name] = os.path.basename(path)
+
+    if prepared.get("preprocessor") is not None:
+        import joblib
+
+        joblib.dump(prepared["preprocessor"], os.path.join(tmp, PREPROCESSOR_FILE))
+    if prepared.get("frame") is not None:
+        prepared["frame"].to_pickle(os.path.join(tmp, FRAME_FILE))
+
+    meta = {**meta, "arrays": arrays, "info": prepared.get("info", {})}
+    with open(os.path.join(tmp, META_FILE), "w") as f:
+        json.dump(meta, f, indent=2, default=str)
+
+    shutil.rmtree(directory, ignore_errors=True)
+    os.replace(tmp, directory)
+
+
+def open_dataset(directory):
+    """
+    A cached dataset: {"arrays": {name: memory-mapped array}, "preprocessor",
+    "frame" (None if not cached), "info", "meta", "path"}.
+    """
+    with open(os.path.join(directory, META_FILE)) as f:
+        meta = json.load(f)
+
+    arrays = {name: open_matrix(os.path.join(directory, file))
+              for name, file in meta["arrays"].items()}
+
+    preprocessor = None
+    if os.path.exists(os.path.join(directory, PREPROCESSOR_FILE)):
+        import joblib
+
+        preprocessor = joblib.load(os.path.join(directory, PREPROCESSOR_FILE))
+
+    frame = None
+    if os.path.exists(os.path.join(directory, FRAME_FILE)):
+        import pandas as pd
+
+        frame = pd.read_pickle(os.path.join(directory, FRAME_FILE))
+
+    return {"arrays": arrays, "preprocessor": preprocessor, "frame": frame,
+            "info": meta["info"], "meta": meta, "path": directory}
+
+
+def cached_dataset(data_path, config, prepare, cache_dir=CACHE_DIR):
+    """
+    The prepared dataset for (data_path, config) from the cache, or from
+    prepare(data_path, config) stored into it. Returns (dataset, hit).
+    """
+    data_sha256, size = fingerprint(data_path)
+    key = cache_key(data_sha256, config)
+    directory = os.path.join(cache_dir, key)
+
+    if os.path.exists(os.path.join(directory, META_FILE)):
+        return open_dataset(directory), True
+
+    start = time.perf_counter()
+    prepared = prepare(data_path, config)
+    os.makedirs(cache_dir, exist_ok=True)
+    save_dataset(directory, prepared, {
+        "key": key,
+        "data": {"path": os.path.basename(data_path), "sha256": data_sha256, "bytes": size},
+        "config": config,
+        "libraries": _libraries(),
+        "prepare_seconds": round(time.perf_counter() - start, 3),
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z")
+    })
+    return open_dataset(directory), False
+
+
+def cache_entries(cache_dir=CACHE_DIR):
+    """
+    Metadata of every complete entry, newest first.
+    """
+    entries = []
+    if os.path.isdir(cache_dir):
+        for key in os.listdir(cache_dir):
+            path = os.path.join(cache_dir, key, META_FILE)
+            if os.path.exists(path):
+                with open(path) as f:
+                    entries.append({**json.load(f), "path": os.path.dirname(path),
+                                    "mtime": os.path.getmtime(path)})
+    return sorted(entries, key=lambda e: e["mtime"], reverse=True)
+
+
+def _entry_bytes(directory):
+    return sum(os.path.getsize(os.path.join(root, f))
+               for root, _, files in os.walk(directory) for f in files)
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "list"
+    if command == "list":
+        for entry in cache_entries():
+            shapes = ", ".join(
+                f"{name} {tuple(open_matrix(os.path.join(entry['path'], file)).shape)}"
+                for name, file in entry["arrays"].items()
+            )
+            print(f"📦 {entry['key']}  {entry['data']['path']}  {entry['created_at']}  "
+                  f"{_entry_bytes(entry['path']) / 2**20:.1f} MiB\n   {shapes}")
+    elif command == "clear":
+        shutil.rmtree(CACHE_DIR, ignore_errors=True)
+        print("🗑️  Cleared:", CACHE_DIR)
+    else:
+        print(__doc__)
+        sys.exit(1)
@@ -0,0 +1,58 @@
+"""
+Labelled catalogs -> (X, y) arrays in the serving feature order.
+"""
+
+import numpy as np
+import pandas as pd
+
+from backend.config import MODEL_FEATURES
+from modules.src.feature_derive import derive_features
+
+FEATURES = list(MODEL_FEATURES)
+TARGET = "habitable"
+
+# modules/data/raw/Exopl-habit.csv -> serving names
+HABIT_COLUMNS = {
+    "Effective_temp": "st_teff",
+    "Stellar_radius": "st_rad",
+    "Stellar_mass": "st_mass",
+    "Stellar_luminosity": "st_luminosity",
+    "Orbit_period": "pl_orbper",
+    "Eccentricity": "pl_orbeccen",
+    "Insolation_flux": "pl_insol",
+    "Semi_major_axis": "pl_orbsmax",
+    "Mass (EU)": "pl_bmasse",
+    "Radius (EU)": "pl_rade",
+    "Eqilibrium_temp": "pl_eqt",
+    "Habitable": TARGET
+}
+
+
+def _habit_frame(df):
+    df = df.rename(columns=HABIT_COLUMNS)
+    # This catalog stores log10(L / L☉); serving uses L / L☉
+    df["st_luminosity"] = 10.0 ** df["st_luminosity"]
+    return df
+
+
+SCHEMAS = {
+    "habit": _habit_frame,
+    "serving": lambda df: df
+}
+
+
+def load_dataset(path, schema="habit", target=TARGET):
+    """
+    Read a labelled CSV and return (frame, X, y): X float32 in FEATURES
+    order (NaN where unknown; derivable features filled from the physics
+    formulas), y int8. Columns the file does not have stay all-NaN.
+    """
+    df = SCHEMAS[schema](pd.read_csv(path))
+
+    for name, values in derive_features(df).items():
+        df[name] = values
+
+    frame = df.reindex(columns=FEATURES + [target])
+    X = np.ascontiguousarray(frame[FEATURES].to_numpy(dtype=np.float32))
+    y = frame[target].to_numpy(dtype=np.int8)
+    return frame, X, y
@@ -0,0 +1,216 @@
+"""
+Out-of-core training: models fitted one block of rows at a time.
+
+The prepared matrices from module3 (a dataset cache entry: X_train.csr/,
+y_train.npy, ...) are opened memory-mapped (arrays.open_matrix) and streamed in blocks of
+`block_rows`, so memory is bounded by a block rather than the catalog:
+
+    fit_incremental()          SGDClassifier.partial_fit, logistic loss,
+                               regularized like module4's
+                               LogisticRegression(C=0.1, class_weight=...)
+    train_booster_external()   XGBoost external memory: an xgb.DataIter
+                               over the blocks into ExtMemQuantileDMatrix,
+                               pages cached on disk
+
+parity_report() trains both the in-memory and the incremental variant on
+the same split and reports their test metrics side by side.
+
+Usage:
+    python -m modules.src.training.incremental [--dir DATASET] [--block-rows N] [--epochs N]
+"""
+
+import argparse
+import os
+import tempfile
+
+import numpy as np
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+
+from modules.src.training.arrays import open_matrix, read_rows, row_blocks
+from modules.src.training.cache import cache_entries
+from modules.src.training.model import DEFAULT_PARAMS, NUM_BOOST_ROUND, scores, train_booster
+
+BLOCK_ROWS = 50_000
+EPOCHS = 5
+# module4's primary model
+C = 0.1
+CLASS_WEIGHT = {0: 1, 1: 15}
+
+
+def logistic_sgd(n_rows, C=C, class_weight=CLASS_WEIGHT, seed=42):
+    """
+    SGDClassifier with the objective of LogisticRegression(C): the L2 term
+    1 / (2C) ||w||² over n_rows samples is alpha = 1 / (C n_rows) per sample.
+    Averaged SGD: with alpha that small the plain iterates keep jumping
+    between blocks, the running average settles near the batch optimum.
+    """
+    return SGDClassifier(
+        loss="log_loss", penalty="l2", alpha=1.0 / (C * n_rows),
+        class_weight=class_weight, average=True, random_state=seed
+    )
+
+
+def fit_incremental(X, y, estimator=None, block_rows=BLOCK_ROWS, epochs=EPOCHS, seed=42):
+    """
+    Fit a partial_fit estimator over row blocks of X (memory-mapped or
+    MappedCSR). Every epoch visits the blocks in a new random order and
+    shuffles the rows inside each block.
+    """
+    estimator = estimator or logistic_sgd(X.shape[0], seed=seed)
+    classes = np.unique(np.asarray(y))
+    starts = np.arange(0, X.shape[0], block_rows)
+    rng = np.random.default_rng(seed)
+
+    for _ in range(epochs):
+        for start in rng.permutation(starts):
+            stop = min(start + block_rows, X.shape[0])
+            block = read_rows(X, start, stop)
+            order = rng.permutation(stop - start)
+            estimator.partial_fit(block[order], np.asarray(y[start:stop])[order], classes=classes)
+    return estimator
+
+
+def predict_blocks(model, X, block_rows=BLOCK_ROWS):
+    """
+    Positive-class probabilities of a fitted estimator or XGBoost booster,
+    computed block by block.
+    """
+    out = np.empty(X.shape[0], dtype=float)
+    for start, stop, block in row_blocks(X, block_rows):
+        if hasattr(model, "predict_proba"):
+            out[start:stop] = model.predict_proba(block)[:, 1]
+        else:
+            out[start:stop] = model.inplace_predict(block)
+    return out
+
+
+def _block_iter(X, y, block_rows, cache_prefix):
+    import xgboost as xgb
+
+    class BlockIter(xgb.DataIter):
+        """
+        Hands XGBoost one block of rows per next() call; blocks are read
+        again from the memory map on every pass.
+        """
+
+        def __init__(self):
+            self._starts = range(0, X.shape[0], block_rows)
+            self._i = 0
+            super().__init__(cache_prefix=cache_prefix)
+
+        def next(self, input_data):
+            if self._i == len(self._starts):
+                return False
+            start = self._starts[self._i]
+            stop = min(start + block_rows, X.shape[0])
+            input_data(data=read_rows(X, start, stop), label=np.asarray(y[start:stop]))
+            self._i += 1
+            return True
+
+        def reset(self):
+            self._i = 0
+
+    return BlockIter()
+
+
+def train_booster_external(X, y, params=None, num_boost_round=NUM_BOOST_ROUND,
+                           block_rows=BLOCK_ROWS, nthread=None, cache_dir=None):
+    """
+    XGBoost over an external-memory DMatrix built from row blocks of X.
+    Quantized pages are cached under `cache_dir` (a temporary directory by
+    default) instead of being held in memory.
+    """
+    import xgboost as xgb
+
+    params = {**DEFAULT_PARAMS, **(params or {}), "tree_method": "hist"}
+    if nthread is not None:
+        params["nthread"] = nthread
+
+    with tempfile.TemporaryDirectory(dir=cache_dir) as cache:
+        dtrain = xgb.ExtMemQuantileDMatrix(
+            _block_iter(X, y, block_rows, os.path.join(cache, "cache")), nthread=nthread
+        )
+        booster = xgb.train(params, dtrain, num_boost_round=num_boost_round)
+        # The booster keeps its training DMatrix (and so the cache files)
+        # alive; a copy carries only the model, so the cache can go
+        model = booster.copy()
+        del booster, dtrain
+    return model
+
+
+def parity_report(X_train, y_train, X_test, y_test, block_rows=BLOCK_ROWS, epochs=EPOCHS,
+                  num_boost_round=NUM_BOOST_ROUND, nthread=None, seed=42):
+    """
+    Test metrics of each model trained in memory and incrementally:
+    {model: {"in_memory": {...}, "incremental": {...}}}.
+    """
+    y_train, y_test = np.asarray(y_train), np.asarray(y_test)
+    X_full = read_rows(X_train, 0, X_train.shape[0])
+
+    logistic = LogisticRegression(C=C, max_iter=1000, class_weight=CLASS_WEIGHT,
+                                  solver="liblinear").fit(X_full, y_train)
+    sgd = fit_incremental(X_train, y_train, block_rows=block_rows, epochs=epochs, seed=seed)
+
+    params = {"seed": seed}
+    booster, _ = train_booster(X_full, y_train, params, num_boost_round, nthread=nthread)
+    external = train_booster_external(X_train, y_train, params, num_boost_round,
+                                      block_rows=block_rows, nthread=nthread)
+    del X_full
+
+    return {
+        "logistic": {
+            "in_memory": scores(y_test, predict_blocks(logistic, X_test, block_rows)),
+            "incremental": scores(y_test, predict_blocks(sgd, X_test, block_rows))
+        },
+        "xgboost": {
+            "in_memory": scores(y_test, predict_blocks(booster, X_test, block_rows)),
+            "incremental": scores(y_test, predict_blocks(external, X_test, block_rows))
+        }
+    }
+
+
+def print_report(report):
+    print(f"{'':10s} {'metric':10s} {'in memory':>10s} {'incremental':>12s} {'delta':>8s}")
+    for model, pair in report.items():
+        for metric, value in pair["in_memory"].items():
+            other = pair["incremental"][metric]
+            if value is None or other is None:
+                continue
+            print(f"{model:10s} {metric:10s} {value:10.4f} {other:12.4f} {other - value:+8.4f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m modules.src.training.incremental",
+                                     description="Out-of-core training on module3's arrays")
+    parser.add_argument("--dir", help="prepared dataset with X_train / y_train ... "
+                                      "(default: the newest entry of the dataset cache)")
+    parser.add_argument("--block-rows", type=int, default=BLOCK_ROWS)
+    parser.add_argument("--epochs", type=int, default=EPOCHS)
+    parser.add_argument("--rounds", type=int, default=NUM_BOOST_ROUND)
+    parser.add_argument("--nthread", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    if args.dir is None:
+        entries = cache_entries()
+        if not entries:
+            parser.error("no prepared dataset cached yet: run module3 or pass --dir")
+        args.dir = entries[0]["path"]
+
+    def path(name):
+        return os.path.join(args.dir, name)
+
+    X_train, X_test = open_matrix(path("X_train.npy")), open_matrix(path("X_test.npy"))
+    y_train = np.load(path("y_train.npy"), mmap_mode="r")
+    y_test = np.load(path("y_test.npy"), mmap_mode="r")
+    print("📦", args.dir)
+    print(f"📌 {X_train.shape[0]:,d} training rows × {X_train.shape[1]} features, "
+          f"blocks of {args.block_rows:,d}\n")
+
+    report = parity_report(X_train, y_train, X_test, y_test, args.block_rows, args.epochs,
+                           args.rounds, args.nthread)
+    print_report(report)
+    return report
+
+
+if __name__ == "__main__":
+    main()
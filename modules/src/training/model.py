@@ -0,0 +1,107 @@
+"""
+XGBoost training, cross-validation and evaluation over NumPy arrays.
+"""
+
+import numpy as np
+from sklearn.metrics import accuracy_score, f1_score, precision_score, recall_score, roc_auc_score
+from sklearn.model_selection import StratifiedKFold
+from sklearn.preprocessing import StandardScaler
+
+# Parameters of the shipped backend/model/xgboost_classifier.ubj
+DEFAULT_PARAMS = {
+    "objective": "binary:logistic",
+    "eval_metric": "logloss",
+    "tree_method": "hist",
+    "eta": 0.3,
+    "max_depth": 6,
+    "seed": 42
+}
+NUM_BOOST_ROUND = 300
+
+
+def train_booster(X, y, params=None, num_boost_round=NUM_BOOST_ROUND, X_val=None, y_val=None,
+                  early_stopping_rounds=None, nthread=None, feature_names=None):
+    """
+    Train one booster on arrays. With a validation set and
+    early_stopping_rounds, training stops once the validation metric has
+    not improved for that many rounds and the returned booster is cut at
+    the best round. nthread=None lets XGBoost use every core.
+
+    Returns (booster, info) with info = {"rounds", "best_iteration"}.
+    """
+    import xgboost as xgb
+
+    params = {**DEFAULT_PARAMS, **(params or {})}
+    if nthread is not None:
+        params["nthread"] = nthread
+
+    dtrain = xgb.DMatrix(X, label=y, feature_names=feature_names, nthread=nthread or -1)
+    evals = []
+    if X_val is not None:
+        evals = [(xgb.DMatrix(X_val, label=y_val, feature_names=feature_names,
+                              nthread=nthread or -1), "validation")]
+
+    booster = xgb.train(
+        params, dtrain, num_boost_round=num_boost_round, evals=evals,
+        early_stopping_rounds=early_stopping_rounds if evals else None,
+        verbose_eval=False
+    )
+
+    best = getattr(booster, "best_iteration", None) if evals and early_stopping_rounds else None
+    if best is not None:
+        booster = booster[:best + 1]
+    return booster, {"rounds": booster.num_boosted_rounds(), "best_iteration": best}
+
+
+def predict(booster, X):
+    return booster.inplace_predict(np.ascontiguousarray(X, dtype=np.float32))
+
+
+def evaluate(booster, X, y, threshold=0.5):
+    return scores(y, predict(booster, X), threshold)
+
+
+def scores(y, proba, threshold=0.5):
+    """
+    Test metrics from positive-class probabilities.
+    """
+    pred = (proba >= threshold).astype(int)
+    return {
+        "accuracy": float(accuracy_score(y, pred)),
+        "precision": float(precision_score(y, pred, zero_division=0)),
+        "recall": float(recall_score(y, pred, zero_division=0)),
+        "f1": float(f1_score(y, pred, zero_division=0)),
+        "roc_auc": float(roc_auc_score(y, proba)) if len(np.unique(y)) > 1 else None
+    }
+
+
+def _fold(X, y, train_idx, test_idx, params, num_boost_round, nthread):
+    booster, _ = train_booster(X[train_idx], y[train_idx], params, num_boost_round, nthread=nthread)
+    return evaluate(booster, X[test_idx], y[test_idx])
+
+
+def cross_validate_booster(X, y, folds=5, params=None, num_boost_round=NUM_BOOST_ROUND,
+                           n_jobs=1, nthread=None, seed=42):
+    """
+    Stratified k-fold metrics (mean over folds). Folds run in n_jobs
+    processes; give each one nthread threads so n_jobs × nthread does not
+    oversubscribe the cores.
+    """
+    from joblib import Parallel, delayed
+
+    splits = StratifiedKFold(n_splits=folds, shuffle=True, random_state=seed).split(X, y)
+    results = Parallel(n_jobs=n_jobs)(
+        delayed(_fold)(X, y, train_idx, test_idx, params, num_boost_round, nthread)
+        for train_idx, test_idx in splits
+    )
+    return {
+        metric: float(np.mean([r[metric] for r in results if r[metric] is not None]))
+        for metric in results[0]
+    }
+
+
+def fit_scaler(X):
+    """
+    StandardScaler over imputed features (the /similar space).
+    """
+    return StandardScaler().fit(X)
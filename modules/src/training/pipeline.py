@@ -0,0 +1,139 @@
+"""
+The full training run: data -> imputer -> scaler -> classifier ->
+evaluation -> artifacts with manifests.
+
+The regressor served next to the classifier (backend/model/xgboost_reg)
+is not retrained here: the labelled catalogs only have the binary
+`habitable` label, and a regressor fitted to 0/1 is just a second
+classifier.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import train_test_split
+
+from modules.src.imputation import fit_imputer, impute_frame, save_imputer
+from modules.src.manifest import data_section, write_manifest
+from modules.src.training.data import FEATURES, load_dataset
+from modules.src.training.model import (
+    DEFAULT_PARAMS, NUM_BOOST_ROUND, cross_validate_booster, evaluate, fit_scaler, train_booster
+)
+from modules.src.training.timing import PhaseTimer
+
+# File names the backend loads (backend/config.py MODEL_FILES, SCALER_PATH)
+ARTIFACTS = {
+    "classifier": "xgboost_classifier.ubj",
+    "scaler": "scaler (2).pkl",
+    "imputer": "imputer.json"
+}
+
+
+def run(data_path, out_dir, schema="habit", params=None, num_boost_round=NUM_BOOST_ROUND,
+        early_stopping_rounds=None, validation_fraction=0.25, test_fraction=0.2,
+        nthread=None, n_jobs=1, cv_folds=0, seed=42, hooks=()):
+    """
+    Train and write every serving artifact into `out_dir`.
+
+    Early stopping is opt-in: the catalog has few positives (49 of 3918 in
+    Exopl-habit.csv), so a held-out validation split has only a handful
+    and stops far too early. Without it the booster trains on the whole
+    training split for num_boost_round rounds, like the shipped model.
+
+    Returns a summary dict (metrics, rounds, per-phase timings, paths).
+    """
+    import joblib
+    import sklearn
+    import xgboost
+
+    timer = PhaseTimer(hooks)
+    params = {**DEFAULT_PARAMS, **(params or {}), "seed": seed}
+
+    with timer.phase("load"):
+        frame, X, y = load_dataset(data_path, schema)
+
+    with timer.phase("split"):
+        idx = np.arange(len(y))
+        train_idx, test_idx = train_test_split(
+            idx, test_size=test_fraction, stratify=y, random_state=seed
+        )
+        fit_idx, val_idx = train_idx, None
+        if early_stopping_rounds:
+            fit_idx, val_idx = train_test_split(
+                train_idx, test_size=validation_fraction, stratify=y[train_idx], random_state=seed
+            )
+
+    with timer.phase("impute"):
+        # Serving fills missing inputs from imputer.json before predicting,
+        # so the models are trained on the same filled values
+        imputer = fit_imputer(frame.iloc[train_idx], FEATURES, group_by="spectral_class")
+        X = np.ascontiguousarray(
+            impute_frame(frame[FEATURES], imputer).to_numpy(dtype=np.float32)
+        )
+
+    with timer.phase("scale"):
+        # The backend standardizes all FEATURES (/similar); a column the
+        # data never has (st_met in Exopl-habit.csv) scales as identity
+        scaler = fit_scaler(pd.DataFrame(X[train_idx], columns=FEATURES).fillna(0.0))
+
+    cv_metrics = None
+    if cv_folds:
+        with timer.phase("cross_validate"):
+            cv_metrics = cross_validate_booster(
+                X[train_idx], y[train_idx], cv_folds, params, num_boost_round,
+                n_jobs=n_jobs, nthread=nthread, seed=seed
+            )
+
+    objectives = {"classifier": "binary:logistic"}
+    boosters, info = {}, {}
+    for name, objective in objectives.items():
+        with timer.phase(f"train_{name}"):
+            boosters[name], info[name] = train_booster(
+                X[fit_idx], y[fit_idx], {**params, "objective": objective}, num_boost_round,
+                X_val=None if val_idx is None else X[val_idx],
+                y_val=None if val_idx is None else y[val_idx],
+                early_stopping_rounds=early_stopping_rounds, nthread=nthread,
+                feature_names=FEATURES
+            )
+
+    with timer.phase("evaluate"):
+        test_metrics = {name: evaluate(b, X[test_idx], y[test_idx]) for name, b in boosters.items()}
+
+    with timer.phase("save"):
+        os.makedirs(out_dir, exist_ok=True)
+        paths = {name: os.path.join(out_dir, file) for name, file in ARTIFACTS.items()}
+
+        save_imputer(imputer, paths["imputer"])
+        joblib.dump(scaler, paths["scaler"])
+
+        data = data_section(data_path, rows=len(y))
+        libraries = {"xgboost": xgboost.__version__, "sklearn": sklearn.__version__,
+                     "numpy": np.__version__}
+        manifests = {}
+        for name, booster in boosters.items():
+            booster.save_model(paths[name])
+            manifests[name] = write_manifest(
+                paths[name],
+                data=data,
+                features=FEATURES,
+                target="habitable",
+                threshold=0.5,
+                params={**params, "objective": objectives[name],
+                        "num_boost_round": num_boost_round,
+                        "early_stopping_rounds": early_stopping_rounds, **info[name]},
+                metrics={"cv": cv_metrics if name == "classifier" else None,
+                         "test": test_metrics[name]},
+                libraries=libraries,
+                training_seconds=round(timer.total, 3)
+            )
+
+    return {
+        "rows": int(len(y)),
+        "positives": int(y.sum()),
+        "rounds": {name: i["rounds"] for name, i in info.items()},
+        "metrics": {"cv": cv_metrics, "test": test_metrics},
+        "timings": {name: round(s, 4) for name, s in timer.timings.items()},
+        "versions": {name: m["version"] for name, m in manifests.items()},
+        "artifacts": paths
+    }
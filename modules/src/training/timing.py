@@ -0,0 +1,38 @@
+"""
+Per-phase wall-clock timing with hooks.
+"""
+
+import time
+from contextlib import contextmanager
+
+
+class PhaseTimer:
+    """
+    with timer.phase("train"): ...
+
+    Accumulates seconds per phase name in `timings` (insertion order) and
+    calls every hook(name, seconds) as each phase ends.
+    """
+
+    def __init__(self, hooks=()):
+        self.hooks = list(hooks)
+        self.timings = {}
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            self.timings[name] = self.timings.get(name, 0.0) + seconds
+            for hook in self.hooks:
+                hook(name, seconds)
+
+    @property
+    def total(self):
+        return sum(self.timings.values())
+
+
+def print_hook(name, seconds):
+    print(f"⏱️  {name:16s} {seconds * 1e3:9.1f} ms")
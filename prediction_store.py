@@ -0,0 +1,302 @@
+"""
+Local SQLite mirror of the Supabase `predictions` table.
+
+Every prediction is written to the local table and pushed to Supabase by
+a background thread that the write wakes; /ranking reads only the local
+table (indexed on confidence_score), so neither path waits on the network
+and rankings keep working offline. The same thread pulls rows written by
+other instances, from a pull cursor kept in predictions_meta
+that only the pull advances (our own pushes get remote ids too, so the
+highest remote_id we hold says nothing about what we have pulled).
+
+A row is pushed only by whoever claims it: `synced` goes 0 -> 2 in one
+conditional UPDATE, so the sync threads of the gunicorn workers sharing
+the file never push the same row twice. A failed push releases the claim
+(back to 0); a claim left by a process that died mid-push is taken over
+after CLAIM_TIMEOUT seconds.
+
+The remote is any object with the supabase-py query-builder surface used
+here (`table().insert().execute()`, `table().select().gt().order().limit()
+.execute()`), which keeps the store testable against a local fake client.
+"""
+
+import sqlite3
+import threading
+import time
+
+PREDICTION_FIELDS = ["pl_name", "prediction_type", "prediction_value", "confidence_score"]
+
+# synced states
+UNSYNCED, SYNCED, CLAIMED = 0, 1, 2
+# Seconds after which a claim is considered abandoned
+CLAIM_TIMEOUT = 300
+
+SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS predictions (
+        local_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        remote_id INTEGER UNIQUE,
+        pl_name TEXT,
+        prediction_type TEXT,
+        prediction_value TEXT,
+        confidence_score REAL,
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        synced INTEGER NOT NULL DEFAULT 0,
+        claimed_at REAL
+    )""",
+    """CREATE INDEX IF NOT EXISTS idx_predictions_confidence
+       ON predictions (confidence_score DESC)""",
+    """CREATE INDEX IF NOT EXISTS idx_predictions_unsynced
+       ON predictions (synced) WHERE synced != 1""",
+    # Bumped by triggers on every change /ranking can see (not on sync
+    # claims), so all processes sharing the file agree on it
+    """CREATE TABLE IF NOT EXISTS predictions_meta (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        version INTEGER NOT NULL,
+        last_pulled INTEGER NOT NULL DEFAULT 0
+    )""",
+    "INSERT OR IGNORE INTO predictions_meta (id, version, last_pulled) VALUES (1, 0, 0)",
+    *[
+        f"""CREATE TRIGGER IF NOT EXISTS predictions_version_{name}
+            AFTER {event} ON predictions
+            BEGIN UPDATE predictions_meta SET version = version + 1 WHERE id = 1; END"""
+        for name, event in (
+            ("insert", "INSERT"),
+            ("update", f"UPDATE OF remote_id, {', '.join(PREDICTION_FIELDS)}, created_at"),
+            ("delete", "DELETE")
+        )
+    ]
+]
+
+
+class PredictionStore:
+
+    def __init__(self, path, remote=None, pull_batch=1000):
+        self.path = path
+        self.remote = remote
+        self.pull_batch = pull_batch
+
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._sync_thread = None
+
+        conn = self._connect()
+        columns = {r[1] for r in conn.execute("PRAGMA table_info(predictions)")}
+        if columns and "claimed_at" not in columns:
+            # Mirrors created before claims existed
+            conn.execute("ALTER TABLE predictions ADD COLUMN claimed_at REAL")
+            conn.execute("DROP INDEX IF EXISTS idx_predictions_unsynced")
+        meta_columns = {r[1] for r in conn.execute("PRAGMA table_info(predictions_meta)")}
+        if meta_columns and "last_pulled" not in meta_columns:
+            # Mirrors created before the pull cursor: pull everything again,
+            # rows already held are ignored on remote_id
+            conn.execute("ALTER TABLE predictions_meta ADD COLUMN last_pulled INTEGER NOT NULL DEFAULT 0")
+        for ddl in SCHEMA:
+            conn.execute(ddl)
+        conn.commit()
+        conn.close()
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=10)
+
+    # ---------- writes ----------
+
+    def record(self, row):
+        """
+        Insert locally and wake the background sync to push it; nothing
+        here waits on Supabase.
+        """
+        return self.record_many([row])[0]
+
+    def record_many(self, rows):
+        """
+        record() for a batch: one local executemany, pushed by the sync
+        thread in one bulk remote insert. Returns the local ids in order.
+        """
+        rows = [{f: row.get(f) for f in PREDICTION_FIELDS} for row in rows]
+        if not rows:
+            return []
+
+        with self._lock:
+            conn = self._connect()
+            conn.executemany(
+                f"INSERT INTO predictions ({', '.join(PREDICTION_FIELDS)}) "
+                f"VALUES ({', '.join('?' * len(PREDICTION_FIELDS))})",
+                [tuple(row.values()) for row in rows]
+            )
+            # One transaction holds the write lock, so the AUTOINCREMENT ids
+            # are consecutive and end at the last one inserted
+            last = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+            conn.commit()
+            conn.close()
+        self._wake.set()
+        return list(range(last - len(rows) + 1, last + 1))
+
+    def _claim(self, local_id):
+        """
+        Atomically take an unsynced (or abandoned) row; True if this caller
+        now owns its push.
+        """
+        now = time.time()
+        conn = self._connect()
+        cur = conn.execute(
+            "UPDATE predictions SET synced = ?, claimed_at = ? WHERE local_id = ? "
+            "AND (synced = ? OR (synced = ? AND claimed_at < ?))",
+            (CLAIMED, now, local_id, UNSYNCED, CLAIMED, now - CLAIM_TIMEOUT)
+        )
+        conn.commit()
+        conn.close()
+        return cur.rowcount == 1
+
+    def _push_claimed(self, local_ids, rows):
+        """
+        Push claimed rows in one remote insert; on failure release them.
+        Returns the number pushed.
+        """
+        try:
+            self._push(local_ids, rows)
+            return len(local_ids)
+        except Exception as e:
+            print("⚠️ Supabase insert failed (will retry):", e)
+            conn = self._connect()
+            conn.executemany(
+                "UPDATE predictions SET synced = ?, claimed_at = NULL "
+                "WHERE local_id = ? AND synced = ?",
+                [(UNSYNCED, local_id, CLAIMED) for local_id in local_ids]
+            )
+            conn.commit()
+            conn.close()
+            return 0
+
+    def _push(self, local_ids, rows):
+        response = self.remote.table("predictions").insert(rows).execute()
+        # PostgREST returns the inserted rows in request order
+        remote_ids = [r.get("id") for r in response.data or []]
+        remote_ids += [None] * (len(local_ids) - len(remote_ids))
+
+        conn = self._connect()
+        try:
+            # Another worker's sync may have pulled these rows back already
+            conn.executemany(
+                "DELETE FROM predictions WHERE remote_id = ? AND local_id != ?",
+                zip(remote_ids, local_ids)
+            )
+            conn.executemany(
+                "UPDATE predictions SET synced = ?, remote_id = ?, claimed_at = NULL WHERE local_id = ?",
+                [(SYNCED, remote_id, local_id) for remote_id, local_id in zip(remote_ids, local_ids)]
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+    # ---------- reads ----------
+
+    def version(self):
+        """
+        Change counter of the mirror file; /ranking derives its ETag from it.
+        """
+        conn = self._connect()
+        version = conn.execute("SELECT version FROM predictions_meta WHERE id = 1").fetchone()[0]
+        conn.close()
+        return version
+
+    def top(self, limit=100):
+        conn = self._connect()
+        conn.row_factory = sqlite3.Row
+        rows = conn.execute(
+            f"SELECT remote_id AS id, {', '.join(PREDICTION_FIELDS)}, created_at "
+            f"FROM predictions ORDER BY confidence_score DESC LIMIT ?",
+            (limit,)
+        ).fetchall()
+        conn.close()
+        return [dict(r) for r in rows]
+
+    # ---------- sync ----------
+
+    def sync(self):
+        """
+        Push unsynced local rows, then pull remote rows we have not seen.
+        Returns (pushed, pulled).
+        """
+        if self.remote is None:
+            return 0, 0
+
+        conn = self._connect()
+        pending = conn.execute(
+            f"SELECT local_id, {', '.join(PREDICTION_FIELDS)} FROM predictions "
+            f"WHERE synced = ? OR (synced = ? AND claimed_at < ?)",
+            (UNSYNCED, CLAIMED, time.time() - CLAIM_TIMEOUT)
+        ).fetchall()
+        last_pulled = conn.execute("SELECT last_pulled FROM predictions_meta WHERE id = 1").fetchone()[0]
+        conn.close()
+
+        # Rows a request or another worker got to first are skipped
+        claimed = [
+            (local_id, dict(zip(PREDICTION_FIELDS, values)))
+            for local_id, *values in pending if self._claim(local_id)
+        ]
+        pushed = 0
+        for start in range(0, len(claimed), self.pull_batch):
+            local_ids, rows = zip(*claimed[start:start + self.pull_batch])
+            pushed += self._push_claimed(list(local_ids), list(rows))
+
+        pulled = 0
+        while True:
+            response = (
+                self.remote
+                .table("predictions")
+                .select("*")
+                .gt("id", last_pulled)
+                .order("id")
+                .limit(self.pull_batch)
+                .execute()
+            )
+            rows = response.data or []
+            if not rows:
+                break
+
+            with self._lock:
+                conn = self._connect()
+                cur = conn.executemany(
+                    f"INSERT OR IGNORE INTO predictions "
+                    f"(remote_id, {', '.join(PREDICTION_FIELDS)}, created_at, synced) "
+                    f"VALUES (?, {', '.join('?' * len(PREDICTION_FIELDS))}, ?, 1)",
+                    [
+                        (r["id"], *[r.get(f) for f in PREDICTION_FIELDS], r.get("created_at"))
+                        for r in rows
+                    ]
+                )
+                pulled += cur.rowcount
+                last_pulled = max(r["id"] for r in rows)
+                # Same transaction as the rows, and never moved backwards by
+                # a concurrent sync that read an older cursor
+                conn.execute(
+                    "UPDATE predictions_meta SET last_pulled = MAX(last_pulled, ?) WHERE id = 1",
+                    (last_pulled,)
+                )
+                conn.commit()
+                conn.close()
+
+            if len(rows) < self.pull_batch:
+                break
+
+        return pushed, pulled
+
+    def start_background_sync(self, interval):
+        """
+        Sync now, then every `interval` seconds or as soon as a write
+        wakes the thread.
+        """
+        if self.remote is None or self._sync_thread is not None:
+            return
+
+        def loop():
+            while True:
+                try:
+                    self.sync()
+                except Exception as e:
+                    print("⚠️ Supabase sync failed:", e)
+                self._wake.wait(interval)
+                self._wake.clear()
+
+        self._sync_thread = threading.Thread(target=loop, daemon=True)
+        self._sync_thread.start()
@@ -0,0 +1,245 @@
+"""
+Compiled request schema for /predict.
+
+Built once when the model is loaded: every accepted spelling of a feature
+(model column name, frontend label from KEY_MAP, and their lower-cased
+forms) maps straight to the column index in training order. A payload is
+then parsed, validated, derived and imputed in one pass into a float row,
+with no per-request key normalization or per-column float() loop.
+
+Batch payloads are columnar, one list per key:
+
+    {"pl_name": ["a", "b"], "pl_rade": [1.0, 2.1], "st_teff": [5778, 4100], ...}
+
+Errors are returned as a list of dicts:
+
+    {"field": <key as sent>, "column": <model column>, "code": "missing" | "invalid",
+     "row": <index, batch only>, "value": <offending value, invalid only>}
+
+A row with too few real (given or derived) features gets one
+{"code": "too_few", "given": <count>, "required": <minimum>} error instead.
+"""
+
+import math
+
+import numpy as np
+
+from modules.src.feature_derive import DERIVED_FEATURES, SERVING_COLUMNS, derive_features
+from modules.src.imputation import spectral_class
+
+
+class RequestSchema:
+
+    def __init__(self, feature_cols, key_map=None, imputer=None):
+        self.columns = list(feature_cols)
+        self.index = {c: i for i, c in enumerate(self.columns)}
+
+        # alias -> column index (features) or canonical name (anything else)
+        self.aliases = {}
+        for alias, name in {**(key_map or {}), **{c: c for c in self.columns}}.items():
+            target = self.index.get(name, name)
+            self.aliases[alias] = target
+            self.aliases.setdefault(alias.lower(), target)
+
+        # Derivation reads and writes only model columns, by index
+        self.derived = [
+            (name, self.index[name]) for name in SERVING_COLUMNS.values()
+            if name in self.index
+        ]
+        self.derived_outputs = [
+            self.index[SERVING_COLUMNS[key]] for key in DERIVED_FEATURES
+            if SERVING_COLUMNS[key] in self.index
+        ]
+
+        self.imputer = imputer
+        self.medians = None
+        self.group_medians = {}
+        if imputer is not None:
+            self.medians = self._median_row(imputer["medians"])
+            if imputer["group_by"] == "spectral_class":
+                self.group_medians = {
+                    letter: self._median_row({**imputer["medians"], **values})
+                    for letter, values in imputer["group_medians"].items()
+                }
+
+    def _median_row(self, values):
+        return np.array([values.get(c, np.nan) for c in self.columns], dtype=float)
+
+    def _resolve(self, key):
+        target = self.aliases.get(key)
+        if target is None:
+            # Unusual spelling (case, padding): normalize only on a miss
+            norm = str(key).lower().strip()
+            target = self.aliases.get(norm, norm)
+        return target
+
+    # ---------- parsing ----------
+
+    def parse(self, data):
+        """
+        One record → (row, extras, errors). `row` is a float array in
+        training order with NaN for absent values; `extras` holds the
+        non-feature keys (pl_name, st_spectype, ...) by canonical name.
+        """
+        row = np.full(len(self.columns), np.nan)
+        extras = {}
+        errors = []
+
+        for key, value in data.items():
+            target = self._resolve(key)
+            if type(target) is not int:
+                extras[target] = value
+                continue
+            if value is None:
+                continue
+            try:
+                row[target] = float(value)
+            except (TypeError, ValueError):
+                errors.append({
+                    "field": key, "column": self.columns[target],
+                    "code": "invalid", "value": value
+                })
+
+        return row, extras, errors
+
+    def parse_batch(self, data):
+        """
+        Columnar payload → (X, extras, errors) with X of shape
+        (n_rows, n_features). Every list must have the same length.
+        """
+        lengths = {len(v) for v in data.values() if isinstance(v, list)}
+        if len(lengths) != 1:
+            return None, {}, [{"field": None, "column": None, "code": "length_mismatch"}]
+
+        n = lengths.pop()
+        X = np.full((n, len(self.columns)), np.nan)
+        extras = {}
+        errors = []
+
+        for key, values in data.items():
+            target = self._resolve(key)
+            if not isinstance(values, list):
+                # Scalars broadcast to every row
+                values = [values] * n
+            if type(target) is not int:
+                extras[target] = values
+                continue
+            try:
+                X[:, target] = np.array(values, dtype=float)
+                continue
+            except (TypeError, ValueError):
+                pass
+
+            # Slow path only to locate the bad cells
+            for i, value in enumerate(values):
+                if value is None:
+                    continue
+                try:
+                    X[i, target] = float(value)
+                except (TypeError, ValueError):
+                    errors.append({
+                        "field": key, "column": self.columns[target],
+                        "code": "invalid", "row": i, "value": value
+                    })
+
+        return X, extras, errors
+
+    # ---------- completion ----------
+
+    def complete(self, X, spectypes=None):
+        """
+        Fill missing cells of X (2-D, in place): derived features first,
+        then the imputer's medians. Returns a boolean mask of imputed cells.
+        """
+        if len(X) == 1:
+            return self._complete_row(X, spectypes[0] if spectypes else None)
+
+        # Derive only when a derivable column is actually missing
+        if self.derived_outputs and np.isnan(X[:, self.derived_outputs]).any():
+            columns = {name: X[:, i] for name, i in self.derived}
+            for name, values in derive_features(columns).items():
+                col = X[:, self.index[name]]
+                fill = np.isnan(col) & np.isfinite(values)
+                col[fill] = values[fill]
+
+        missing = np.isnan(X)
+        if self.medians is None or not missing.any():
+            return np.zeros_like(missing)
+
+        fill = np.broadcast_to(self.medians, X.shape).copy()
+        if self.group_medians:
+            teff_i = self.index.get("st_teff")
+            for r in np.flatnonzero(missing.any(axis=1)):
+                letter = spectral_class(
+                    spectypes[r] if spectypes is not None else None,
+                    X[r, teff_i] if teff_i is not None else None
+                )
+                if letter in self.group_medians:
+                    fill[r] = self.group_medians[letter]
+
+        X[missing] = fill[missing]
+        return missing & ~np.isnan(X)
+
+    def _complete_row(self, X, spectype=None):
+        """
+        complete() for a single request, on a plain list: per-call numpy
+        overhead would dominate a 12-value row.
+        """
+        row = X[0].tolist()
+        imputed = [False] * len(row)
+
+        if any(row[i] != row[i] for i in self.derived_outputs):
+            # Known scalars only, like derive_record(): absent inputs
+            # short-circuit their formulas instead of computing NaN
+            known = {name: row[i] for name, i in self.derived if row[i] == row[i]}
+            for name, value in derive_features(known).items():
+                i = self.index[name]
+                if row[i] != row[i] and math.isfinite(value):
+                    row[i] = float(value)
+
+        if self.medians is not None and any(v != v for v in row):
+            fill = self.medians
+            if self.group_medians:
+                teff_i = self.index.get("st_teff")
+                letter = spectral_class(spectype, row[teff_i] if teff_i is not None else None)
+                fill = self.group_medians.get(letter, fill)
+
+            for i, value in enumerate(fill.tolist()):
+                if row[i] != row[i] and value == value:
+                    row[i] = value
+                    imputed[i] = True
+
+        X[0] = row
+        return np.array([imputed])
+
+    def sparse_errors(self, X, imputed, minimum, batch=False):
+        """
+        "too_few" errors for rows with fewer than `minimum` features that
+        were given or derived, i.e. rows that would be mostly medians.
+        """
+        real = (~imputed & ~np.isnan(X)).sum(axis=1)
+
+        errors = []
+        for r in np.flatnonzero(real < minimum):
+            error = {"field": None, "column": None, "code": "too_few",
+                     "given": int(real[r]), "required": minimum}
+            if batch:
+                error["row"] = int(r)
+            errors.append(error)
+        return errors
+
+    def missing_errors(self, X, batch=False):
+        """
+        Structured "missing" errors for cells that are still NaN.
+        """
+        missing = np.isnan(X)
+        if not missing.any():
+            return []
+
+        errors = []
+        for r, c in zip(*np.nonzero(missing)):
+            error = {"field": self.columns[c], "column": self.columns[c], "code": "missing"}
+            if batch:
+                error["row"] = int(r)
+            errors.append(error)
+        return errors
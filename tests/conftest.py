@@ -0,0 +1,6 @@
+import os
+import sys
+
+# Root modules (app.py, prediction_store.py) are imported as top-level
+# modules, the way gunicorn and Vercel load them
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,78 @@
+"""
+In-memory stand-in for the supabase-py client, covering the query-builder
+calls prediction_store.py makes. Several PredictionStores can share one
+FakeSupabase to act as separate app instances writing to one remote.
+"""
+
+
+class FakeResponse:
+
+    def __init__(self, data):
+        self.data = data
+
+
+class FakeQuery:
+
+    def __init__(self, client, table):
+        self.client = client
+        self.table = table
+        self.rows = None
+        self.filters = []
+        self.order_by = None
+        self.row_limit = None
+
+    def insert(self, rows):
+        self.rows = rows if isinstance(rows, list) else [rows]
+        return self
+
+    def select(self, *columns):
+        return self
+
+    def gt(self, column, value):
+        self.filters.append(lambda r: r[column] > value)
+        return self
+
+    def order(self, column, desc=False):
+        self.order_by = (column, desc)
+        return self
+
+    def limit(self, n):
+        self.row_limit = n
+        return self
+
+    def execute(self):
+        if self.client.offline:
+            raise ConnectionError("fake Supabase is offline")
+
+        table = self.client.tables.setdefault(self.table, [])
+        if self.rows is not None:
+            inserted = []
+            for row in self.rows:
+                self.client.next_id += 1
+                inserted.append({**row, "id": self.client.next_id})
+            table.extend(inserted)
+            self.client.inserts += 1
+            return FakeResponse([dict(r) for r in inserted])
+
+        rows = [r for r in table if all(f(r) for f in self.filters)]
+        if self.order_by is not None:
+            column, desc = self.order_by
+            rows.sort(key=lambda r: r[column], reverse=desc)
+        if self.row_limit is not None:
+            rows = rows[:self.row_limit]
+        return FakeResponse([dict(r) for r in rows])
+
+
+class FakeSupabase:
+
+    def __init__(self):
+        self.tables = {}
+        self.next_id = 0
+        self.inserts = 0
+        self.offline = False
+
+    def table(self, name):
+        return FakeQuery(self, name)
+
+    def rows(self, table="predictions"):
+        return self.tables.get(table, [])
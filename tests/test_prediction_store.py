@@ -0,0 +1,217 @@
+import sqlite3
+import threading
+
+import pytest
+
+import prediction_store
+from prediction_store import PredictionStore, SYNCED, UNSYNCED
+from fake_supabase import FakeSupabase
+
+
+def planet(name, score):
+    return {
+        "pl_name": name,
+        "prediction_type": "habitability",
+        "prediction_value": "Habitable" if score >= 0.5 else "Not Habitable",
+        "confidence_score": score
+    }
+
+
+def states(path):
+    conn = sqlite3.connect(path)
+    rows = conn.execute("SELECT pl_name, remote_id, synced FROM predictions ORDER BY local_id").fetchall()
+    conn.close()
+    return rows
+
+
+@pytest.fixture
+def remote():
+    return FakeSupabase()
+
+
+# ---------- write-through ----------
+
+def test_record_is_local_until_sync_pushes(tmp_path, remote):
+    path = str(tmp_path / "mirror.db")
+    store = PredictionStore(path, remote=remote)
+
+    store.record_many([planet("a", 0.2), planet("b", 0.9)])
+
+    # Readable immediately, before anything reached the remote
+    assert [r["pl_name"] for r in store.top()] == ["b", "a"]
+    assert remote.rows() == []
+
+    assert store.sync() == (2, 0)
+    assert remote.inserts == 1
+    assert [r["pl_name"] for r in remote.rows()] == ["a", "b"]
+    assert states(path) == [("a", 1, SYNCED), ("b", 2, SYNCED)]
+    assert [r["id"] for r in store.top()] == [2, 1]
+
+
+def test_background_sync_is_woken_by_a_write(tmp_path, remote):
+    store = PredictionStore(str(tmp_path / "mirror.db"), remote=remote)
+    store.start_background_sync(interval=3600)
+
+    pushed = threading.Event()
+    sync = store.sync
+
+    def watched_sync():
+        result = sync()
+        if remote.rows():
+            pushed.set()
+        return result
+
+    store.sync = watched_sync
+    store.record(planet("a", 0.7))
+    assert pushed.wait(5)
+
+
+# ---------- claim / push ----------
+
+def test_failed_push_releases_the_claim(tmp_path, remote):
+    path = str(tmp_path / "mirror.db")
+    store = PredictionStore(path, remote=remote)
+    store.record(planet("a", 0.7))
+
+    remote.offline = True
+    with pytest.raises(ConnectionError):
+        store.sync()
+    assert states(path) == [("a", None, UNSYNCED)]
+
+    remote.offline = False
+    assert store.sync() == (1, 0)
+    assert states(path) == [("a", 1, SYNCED)]
+
+
+def test_a_claimed_row_is_pushed_by_its_owner_only(tmp_path, remote):
+    path = str(tmp_path / "mirror.db")
+    owner = PredictionStore(path, remote=remote)
+    other = PredictionStore(path, remote=remote)
+    local_id = owner.record(planet("a", 0.7))
+
+    assert owner._claim(local_id)
+    assert not other._claim(local_id)
+    assert other.sync() == (0, 0)
+
+    assert owner._push_claimed([local_id], [planet("a", 0.7)]) == 1
+    assert other.sync() == (0, 0)
+    assert len(remote.rows()) == 1
+
+
+def test_abandoned_claim_is_taken_over(tmp_path, remote, monkeypatch):
+    path = str(tmp_path / "mirror.db")
+    store = PredictionStore(path, remote=remote)
+    local_id = store.record(planet("a", 0.7))
+    assert store._claim(local_id)
+
+    monkeypatch.setattr(prediction_store, "CLAIM_TIMEOUT", -1)
+    assert store.sync() == (1, 0)
+    assert len(remote.rows()) == 1
+
+
+def test_workers_sharing_a_file_push_each_row_once(tmp_path, remote):
+    path = str(tmp_path / "mirror.db")
+    writer = PredictionStore(path, remote=remote)
+    workers = [PredictionStore(path, remote=remote) for _ in range(3)]
+
+    def write():
+        for i in range(30):
+            writer.record(planet(f"p{i}", i / 30))
+
+    def sync(store):
+        for _ in range(20):
+            store.sync()
+
+    threads = [threading.Thread(target=write)]
+    threads += [threading.Thread(target=sync, args=(w,)) for w in workers]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    workers[0].sync()
+
+    names = [r["pl_name"] for r in remote.rows()]
+    assert sorted(names) == sorted(f"p{i}" for i in range(30))
+    assert all(synced == SYNCED for _, _, synced in states(path))
+    assert len(states(path)) == 30
+
+
+# ---------- pull ----------
+
+def test_pull_sees_rows_other_instances_wrote_before_our_push(tmp_path, remote):
+    a = PredictionStore(str(tmp_path / "a.db"), remote=remote)
+    b = PredictionStore(str(tmp_path / "b.db"), remote=remote)
+
+    b.record(planet("from-b", 0.9))
+    b.sync()
+    a.record(planet("from-a", 0.5))
+
+    # a's own push gets remote id 2; b's row (id 1) must still be pulled
+    assert a.sync() == (1, 1)
+    assert [(r["id"], r["pl_name"]) for r in a.top()] == [(1, "from-b"), (2, "from-a")]
+
+    assert b.sync() == (0, 1)
+    assert [r["pl_name"] for r in b.top()] == ["from-b", "from-a"]
+    assert a.sync() == (0, 0)
+
+
+def test_pull_cursor_survives_a_restart(tmp_path, remote):
+    path = str(tmp_path / "mirror.db")
+    other = PredictionStore(str(tmp_path / "other.db"), remote=remote, pull_batch=2)
+    other.record_many([planet(f"p{i}", i / 5) for i in range(5)])
+    other.sync()
+
+    assert PredictionStore(path, remote=remote, pull_batch=2).sync() == (0, 5)
+    assert PredictionStore(path, remote=remote, pull_batch=2).sync() == (0, 0)
+
+
+def test_version_moves_on_visible_changes_only(tmp_path, remote):
+    store = PredictionStore(str(tmp_path / "mirror.db"), remote=remote)
+    v0 = store.version()
+    local_id = store.record(planet("a", 0.7))
+    v1 = store.version()
+    assert v1 > v0
+
+    store._claim(local_id)
+    assert store.version() == v1
+
+    store._push_claimed([local_id], [planet("a", 0.7)])
+    assert store.version() > v1
+
+
+# ---------- /ranking offline ----------
+
+@pytest.fixture
+def offline_app(tmp_path, monkeypatch):
+    monkeypatch.setenv("PREDICTIONS_DB", str(tmp_path / "predictions.db"))
+    monkeypatch.delenv("SUPABASE_URL", raising=False)
+    monkeypatch.delenv("SUPABASE_KEY", raising=False)
+    monkeypatch.delenv("VERCEL", raising=False)
+
+    import app as root_app
+
+    root_app.get_supabase.cache_clear()
+    root_app.get_prediction_store.cache_clear()
+    monkeypatch.setitem(root_app._ranking_cache, "body", None)
+    yield root_app
+    root_app.get_prediction_store.cache_clear()
+
+
+def test_ranking_is_served_offline(offline_app):
+    client = offline_app.app.test_client()
+    store = offline_app.get_prediction_store()
+    assert store.remote is None
+
+    store.record_many([planet("low", 0.1), planet("high", 0.95), planet("mid", 0.5)])
+
+    resp = client.get("/ranking")
+    assert resp.status_code == 200
+    assert [r["pl_name"] for r in resp.get_json()["rankings"]] == ["high", "mid", "low"]
+
+    etag = resp.headers["ETag"]
+    assert client.get("/ranking", headers={"If-None-Match": etag}).status_code == 304
+
+    store.record(planet("top", 0.99))
+    resp = client.get("/ranking", headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+    assert resp.get_json()["rankings"][0]["pl_name"] == "top"
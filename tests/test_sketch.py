@@ -0,0 +1,123 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.src.sketch import QuantileSketch, sketch_columns
+
+ERROR = 0.01
+QS = np.linspace(0.01, 0.99, 99)
+
+
+def rank_error(sketch, values, qs=QS):
+    """
+    Worst normalized rank distance between the sketch's q-quantiles and q;
+    any rank a tied value occupies counts as exact.
+    """
+    values = np.sort(values)
+    estimates = sketch.quantile(qs)
+    low = np.searchsorted(values, estimates, side="left") / len(values)
+    high = np.searchsorted(values, estimates, side="right") / len(values)
+    return float(np.max(np.maximum(0, np.maximum(qs - high, low - qs))))
+
+
+def distributions(n=200_000):
+    rng = np.random.default_rng(7)
+    return {
+        "normal": rng.normal(size=n),
+        "lognormal": rng.lognormal(0, 2, size=n),
+        "bimodal": np.concatenate([rng.normal(-5, 1, n // 2), rng.normal(5, 0.1, n - n // 2)]),
+        "ties": rng.integers(0, 50, size=n).astype(float),
+        "sorted": np.arange(n, dtype=float)
+    }
+
+
+@pytest.mark.parametrize("name", list(distributions(10)))
+def test_rank_error_within_bound(name):
+    values = distributions()[name]
+    sketch = QuantileSketch(error=ERROR).update(values)
+
+    assert sketch.n == len(values)
+    assert len(sketch) < len(values) / 10
+    assert rank_error(sketch, values) <= ERROR
+    assert sketch.quantile(0) == values.min()
+    assert sketch.quantile(1) == values.max()
+
+
+def test_exact_below_k():
+    values = np.random.default_rng(1).normal(size=500)
+    sketch = QuantileSketch(k=1000).update(values)
+    assert np.array_equal(sketch.quantile(QS), np.quantile(values, QS))
+    assert sketch.quantile(0.5) == pd.Series(values).median()
+
+
+def test_nan_ignored():
+    values = np.random.default_rng(2).normal(size=1000)
+    sketch = QuantileSketch(k=2000).update(np.append(values, [np.nan] * 100))
+    assert sketch.n == 1000
+    assert sketch.quantile(0.5) == np.median(values)
+
+
+@pytest.mark.parametrize("name", ["normal", "ties"])
+def test_merged_chunks_within_bound(name):
+    values = distributions()[name]
+    merged = QuantileSketch(error=ERROR)
+    for i, chunk in enumerate(np.array_split(values, 16)):
+        merged.merge(QuantileSketch(error=ERROR, seed=i).update(chunk))
+
+    assert merged.n == len(values)
+    assert rank_error(merged, values) <= ERROR
+
+
+def test_update_repeated_equals_materialized_copies():
+    rng = np.random.default_rng(3)
+    values = rng.normal(size=100_000)
+    missing = 60_000
+
+    sketch = QuantileSketch(error=ERROR).update(values).update_repeated(0.25, missing)
+    filled = np.append(values, np.full(missing, 0.25))
+
+    assert sketch.n == len(filled)
+    assert rank_error(sketch, filled) <= ERROR
+
+    small = QuantileSketch(k=1000).update(values[:100]).update_repeated(0.25, 50)
+    assert np.array_equal(small.quantile(QS), np.quantile(filled[:100].tolist() + [0.25] * 50, QS))
+
+
+def frame(n=120_000):
+    rng = np.random.default_rng(4)
+    return pd.DataFrame({
+        "a": rng.normal(size=n),
+        "b": np.where(rng.random(n) < 0.2, np.nan, rng.exponential(size=n)),
+        "c": rng.integers(0, 10, size=n)
+    })
+
+
+def chunks(df, rows=10_000):
+    return (df.iloc[i:i + rows] for i in range(0, len(df), rows))
+
+
+def test_sketch_columns_same_across_processes():
+    df = frame()
+    local = sketch_columns(chunks(df), df.columns, error=ERROR, workers=1)
+    pooled = sketch_columns(chunks(df), df.columns, error=ERROR, workers=2)
+
+    for name in df.columns:
+        assert local[name].n == pooled[name].n == df[name].notna().sum()
+        assert np.array_equal(local[name].quantile(QS), pooled[name].quantile(QS))
+        assert rank_error(local[name], df[name].dropna().to_numpy(dtype=float)) <= ERROR
+
+
+def test_deterministic_under_seed():
+    values = distributions()["lognormal"]
+
+    def sketch(seed):
+        return QuantileSketch(error=ERROR, seed=seed).update(values)
+
+    assert np.array_equal(sketch(0).quantile(QS), sketch(0).quantile(QS))
+    assert not np.array_equal(sketch(0).quantile(QS), sketch(1).quantile(QS))
+
+    df = frame()
+    first = sketch_columns(chunks(df), df.columns, error=ERROR)
+    second = sketch_columns(chunks(df), df.columns, error=ERROR)
+    for name in df.columns:
+        assert np.array_equal(first[name].quantile(QS), second[name].quantile(QS))
@@ -0,0 +1,144 @@
+import os
+import sys
+import tempfile
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# backend/ modules import each other as top-level modules; appended, so the
+# root app.py keeps precedence over backend/app.py
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
+# Never touch the tracked catalog: config reads this on import
+os.environ.setdefault("EXOPLANETS_DB", os.path.join(tempfile.mkdtemp(), "exoplanets.db"))
+
+import store as planet_store  # noqa: E402
+from config import MODEL_FEATURES, SCORE_OFFSET  # noqa: E402
+from db import get_db, insert_planet  # noqa: E402
+from store import PlanetStore, get_store, load_store, record_insert  # noqa: E402
+
+# backend/store.py documents ~115 bytes per planet and allows 150
+BYTES_PER_PLANET_BUDGET = 150
+
+
+def catalog(n, seed=0):
+    rng = np.random.default_rng(seed)
+    names = [f"KOI-{i:07d} b" for i in range(n)]
+    sources = rng.choice(["dataset", "prediction", "user"], n).tolist()
+    X = rng.uniform(0, 1000, (n, len(MODEL_FEATURES))).astype(np.float32)
+    # Distinct scores: the DataFrame path orders ties arbitrarily
+    confidence = (rng.permutation(n) / n).astype(np.float32)
+    return names, sources, X, confidence
+
+
+def load(names, sources, X, confidence, chunk=10000):
+    store = PlanetStore()
+    for start in range(0, len(names), chunk):
+        end = start + chunk
+        store.extend(names[start:end], sources[start:end], X[start:end], confidence[start:end])
+    store._name_index = None  # as load_store()
+    return store
+
+
+def test_bytes_per_planet_at_1m_rows():
+    n = 1_000_000
+    _, sources, X, confidence = catalog(n)
+
+    # Names are created under tracemalloc, as when read from SQLite; only
+    # what the store keeps alive is left at the end
+    tracemalloc.start()
+    names = [f"KOI-{i:07d} b" for i in range(n)]
+    store = load(names, sources, X, confidence)
+    del names
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert len(store) == n
+    assert store.nbytes() == 41 * n
+    assert held / n <= BYTES_PER_PLANET_BUDGET
+
+
+def rank_dataframe(df, top_n):
+    # backend/app.py rank() minus the model call
+    return (
+        df[["planet_name", "confidence"]]
+        .drop_duplicates()
+        .sort_values("confidence", ascending=False)
+        .head(top_n)
+    )
+
+
+def test_top_and_stats_match_the_dataframe_path():
+    names, sources, X, confidence = catalog(20_000, seed=1)
+    # Exact duplicate rows (same name and score) are ranked once, as by
+    # drop_duplicates(); a rescored duplicate is a distinct entry
+    dup = list(range(0, 20_000, 7))
+    names += [names[i] for i in dup] * 2
+    sources += [sources[i] for i in dup] * 2
+    X = np.concatenate([X, X[dup], X[dup]])
+    rescored = (confidence[dup] + np.float32(0.5 / 20_000)).astype(np.float32)
+    confidence = np.concatenate([confidence, confidence[dup], rescored])
+
+    store = load(names, sources, X, confidence)
+    df = pd.DataFrame({"planet_name": names, "confidence": confidence})
+
+    for top_n in (1, 10, 500, 50_000):
+        expected = rank_dataframe(df, top_n)
+        assert store.top(top_n) == list(zip(expected["planet_name"], expected["confidence"].astype(float)))
+
+    stats = store.stats()
+    assert stats["total_count"] == len(df)
+    assert stats["habitable_count"] == int((df["confidence"] >= 0.5).sum())
+    assert stats["average_score"] == pytest.approx(df["confidence"].astype(float).mean() - SCORE_OFFSET)
+
+
+def test_empty_store():
+    store = PlanetStore()
+    assert store.top(10) == []
+    assert store.stats() == {"total_count": 0, "habitable_count": 0, "average_score": 0.0}
+
+
+@pytest.fixture
+def conn():
+    conn = get_db()
+    conn.execute("DELETE FROM planets")
+    conn.commit()
+    planet_store._store = None
+    yield conn
+    conn.close()
+    planet_store._store = None
+
+
+def features(i):
+    return {f: float(i + j) for j, f in enumerate(MODEL_FEATURES)}
+
+
+def test_append_then_reload(conn):
+    for i in range(50):
+        insert_planet(conn, f"P{i}", features(i), "dataset", i / 50)
+
+    store = get_store(conn)
+    assert len(store) == 50
+
+    # A write through this process is appended in place
+    insert_planet(conn, "New", features(99), "user", 0.995)
+    record_insert(conn, "New", features(99), "user", 0.995)
+    assert get_store(conn) is store
+    assert len(store) == 51
+    assert store.top(1) == [("New", pytest.approx(0.995))]
+
+    # ...and matches what a fresh load sees
+    fresh = load_store(conn)
+    assert fresh.version == store.version
+    assert fresh.top(51) == store.top(51)
+    assert fresh.stats() == store.stats()
+
+    # A write the store was not told about (another worker) reloads it
+    other = get_db()
+    insert_planet(other, "Elsewhere", features(7), "user", 0.999)
+    other.close()
+    reloaded = get_store(conn)
+    assert reloaded is not store
+    assert len(reloaded) == 52
+    assert reloaded.top(1)[0][0] == "Elsewhere"